@@ -6,6 +6,7 @@ from jose import JWTError, jwt
 from backend.core.config import settings
 from backend.models.user import UserModel, TokenData
 from backend.database.mongodb import get_user_by_id
+from backend.core.auth_cache import user_cache, token_claims_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/users/login")
 
@@ -15,7 +16,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": datetime.utcnow()})
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
@@ -25,18 +26,30 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> UserModel:
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
+    payload = token_claims_cache.get(token)
+    if payload is None:
+        try:
+            payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+        except JWTError:
             raise credentials_exception
-        token_data = TokenData(user_id=user_id)
-    except JWTError:
+        token_claims_cache.set(token, payload)
+    
+    user_id: str = payload.get("sub")
+    if user_id is None:
         raise credentials_exception
-        
-    user = await get_user_by_id(token_data.user_id)
-    if user is None:
+    token_data = TokenData(user_id=user_id)
+    
+    issued_at = payload.get("iat")
+    user = user_cache.get(token_data.user_id, issued_at)
+    if user is not None:
+        return user
+    
+    generation = user_cache.generation(token_data.user_id)
+    user_dict = await get_user_by_id(token_data.user_id)
+    if user_dict is None:
         raise credentials_exception
         
     # Convert dict to UserModel
-    return UserModel(**user)
+    user = UserModel(**user_dict)
+    user_cache.set(token_data.user_id, issued_at, user, generation)
+    return user
@@ -0,0 +1,51 @@
+"""
+Field selection for list endpoints.
+
+Lets callers ask for view=summary or an explicit fields= list so that only the
+requested fields are read from MongoDB and the full models are never built.
+"""
+
+from typing import Any, Dict, List, Optional, Type
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from ..utils.pagination import encode_cursor
+
+def parse_field_selection(fields: Optional[str], view: str, model: Type[BaseModel], summary_model: Type[BaseModel]) -> Optional[List[str]]:
+    """
+    Resolve fields/view query parameters into a list of fields to project
+
+    Returns None when the caller wants the full model.
+    """
+    if fields:
+        selected = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in selected if field not in model.model_fields]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}"
+            )
+        return selected
+    if view == "summary":
+        return list(summary_model.model_fields)
+    if view != "full":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="view must be 'full' or 'summary'"
+        )
+    return None
+
+def projected_response(items: List[Dict[str, Any]], limit: int, sort_field: str, summary_model: Optional[Type[BaseModel]] = None) -> JSONResponse:
+    """
+    Build a list response from projected documents, with the next page cursor
+    """
+    next_cursor = None
+    if items and len(items) == limit:
+        next_cursor = encode_cursor(items[-1][sort_field], items[-1]["id"])
+    if summary_model is not None:
+        items = [summary_model(**item) for item in items]
+    response = JSONResponse(content=jsonable_encoder(items))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
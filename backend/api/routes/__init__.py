@@ -11,8 +11,10 @@ router = APIRouter()
 from .workflow_routes import router as workflow_router
 from .user_routes import router as user_router
 from .execution_routes import router as execution_router
+from .event_routes import router as event_router
 
 # Include all routers
 router.include_router(workflow_router, prefix="/workflows", tags=["workflows"])
 router.include_router(user_router, prefix="/users", tags=["users"])
-router.include_router(execution_router, prefix="/execute", tags=["execution"]) 
\ No newline at end of file
+router.include_router(execution_router, prefix="/execute", tags=["execution"])
+router.include_router(event_router, prefix="/events", tags=["events"]) 
\ No newline at end of file
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Dict, Any
+import asyncio
+from ...services.event_bus import event_bus, RESERVED_EVENT_PREFIX
+from ..deps import get_current_user
+from ...models.user import UserModel
+
+router = APIRouter()
+
+@router.post("/{event_name}", status_code=status.HTTP_202_ACCEPTED)
+async def publish_event(
+    event_name: str,
+    payload: Dict[str, Any] = {},
+    current_user: UserModel = Depends(get_current_user)
+):
+    """
+    Publish an event to the current user's event-triggered workflows
+    """
+    if event_name.startswith(RESERVED_EVENT_PREFIX):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Events starting with {RESERVED_EVENT_PREFIX} are published by the system"
+        )
+    try:
+        event_id = event_bus.publish(current_user.id, event_name, payload)
+    except (asyncio.QueueFull, RuntimeError):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Event bus is unavailable, try again later"
+        )
+    return {"status": "accepted", "event_id": event_id}
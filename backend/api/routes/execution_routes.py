@@ -1,35 +1,141 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import Dict, Any, List
-from ...services.workflow_service import execute_workflow, get_workflow_execution, get_workflow_executions
-from ...models.workflow import WorkflowExecution
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Request, Query
+from fastapi.responses import StreamingResponse
+from typing import Dict, Any, List, Optional
+import asyncio
+import json
+from ...core.config import settings
+from ...services.workflow_service import (
+    get_workflow_by_id,
+    get_workflow_execution,
+    get_workflow_execution_output,
+    get_workflow_execution_status,
+    get_workflow_id_of_execution,
+    get_workflow_executions,
+    get_workflow_execution_fields,
+    get_workflow_execution_logs
+)
+from ...services.execution_queue import execution_queue
+from ...services.execution_events import execution_events, TERMINAL_STATUSES
+from ...services.batch_service import batch_runner, read_batch_inputs
+from ...models.workflow import WorkflowExecution, WorkflowBatch, ExecutionSummary, ExecutionLogEntry
 from ..deps import get_current_user
+from ..projection import parse_field_selection, projected_response
 from ...models.user import UserModel
+from ...utils.pagination import encode_cursor, decode_cursor
 
 router = APIRouter()
 
-@router.post("/{workflow_id}", response_model=WorkflowExecution)
+async def _check_workflow_access(workflow_id: str, current_user: UserModel, detail: str):
+    """
+    Raise 404 if the workflow does not exist and 403 unless the current user owns it or is an admin
+    """
+    workflow = await get_workflow_by_id(workflow_id)
+    if not workflow:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Workflow not found"
+        )
+    if workflow.created_by != current_user.id and not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=detail
+        )
+
+async def _check_execution_access(execution_id: str, current_user: UserModel):
+    """
+    Raise 404 if the execution does not exist and 403 unless the current user owns its workflow or is an admin
+    """
+    workflow_id = await get_workflow_id_of_execution(execution_id)
+    if workflow_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Execution not found"
+        )
+    await _check_workflow_access(workflow_id, current_user, "Not authorized to access this execution")
+
+@router.post("/{workflow_id}", response_model=WorkflowExecution, status_code=status.HTTP_202_ACCEPTED)
 async def trigger_workflow(
     workflow_id: str,
     input_data: Dict[str, Any] = {},
     current_user: UserModel = Depends(get_current_user)
 ):
     """
-    Trigger a workflow execution
+    Queue a workflow execution and return the pending execution record
     """
     try:
-        execution = await execute_workflow(workflow_id, input_data)
+        execution = await execution_queue.enqueue(workflow_id, input_data)
         return execution
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e)
         )
+    except (asyncio.QueueFull, RuntimeError):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Execution queue is unavailable, try again later"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
 
+@router.post("/{workflow_id}/batch", response_model=WorkflowBatch, status_code=status.HTTP_202_ACCEPTED)
+async def trigger_workflow_batch(
+    workflow_id: str,
+    request: Request,
+    concurrency: Optional[int] = Query(None, ge=1),
+    current_user: UserModel = Depends(get_current_user)
+):
+    """
+    Queue one execution of a workflow per input and return the batch
+    
+    The body is a JSON array of input objects, or NDJSON with one input object
+    per line. Poll /batch/{batch_id} for progress.
+    """
+    await _check_workflow_access(workflow_id, current_user, "Not authorized to run this workflow")
+    try:
+        inputs = await read_batch_inputs(request.stream())
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    try:
+        return await batch_runner.submit(workflow_id, current_user.id, inputs, concurrency)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"{str(e)}, try again later"
+        )
+
+@router.get("/batch/{batch_id}", response_model=WorkflowBatch)
+async def get_batch_progress(
+    batch_id: str,
+    current_user: UserModel = Depends(get_current_user)
+):
+    """
+    Get a batch with the number of its executions in each status
+    """
+    batch = await batch_runner.get_progress(batch_id)
+    if not batch:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Batch not found"
+        )
+    if batch.created_by != current_user.id and not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this batch"
+        )
+    return batch
+
 @router.get("/{execution_id}", response_model=WorkflowExecution)
 async def get_execution_status(
     execution_id: str,
@@ -46,14 +152,138 @@ async def get_execution_status(
         )
     return execution
 
+@router.get("/{execution_id}/outputs/{key}")
+async def get_execution_output(
+    execution_id: str,
+    key: str,
+    current_user: UserModel = Depends(get_current_user)
+):
+    """
+    Get one value of an execution's output_data as JSON
+
+    Large values are stored in output_data as {"$blob": ref}, this returns the value itself.
+    """
+    execution = await get_workflow_execution(execution_id)
+    if not execution:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Execution not found"
+        )
+    await _check_workflow_access(execution.workflow_id, current_user, "Not authorized to access this execution")
+    try:
+        data = await get_workflow_execution_output(execution, key)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    return Response(content=data, media_type="application/json")
+
+def _sse(event_type: str, data: Dict[str, Any]) -> str:
+    return f"event: {event_type}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@router.get("/{execution_id}/events")
+async def stream_execution_events(
+    execution_id: str,
+    request: Request,
+    current_user: UserModel = Depends(get_current_user)
+):
+    """
+    Stream live progress of a workflow execution as Server-Sent Events
+
+    Sends the current status first, then action_started, action_output
+    (chunks of streamed AI output), action_completed, action_failed and status
+    events as they happen, and ends after the execution completes or fails. While the stream is idle the status is
+    re-checked every EXECUTION_EVENTS_KEEPALIVE seconds, which also covers
+    executions running in another backend process.
+    """
+    await _check_execution_access(execution_id, current_user)
+
+    # Subscribe before reading the status so no event falls in between
+    queue = execution_events.subscribe(execution_id)
+    current_status = await get_workflow_execution_status(execution_id)
+    if current_status is None:
+        execution_events.unsubscribe(execution_id, queue)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Execution not found"
+        )
+
+    async def event_stream():
+        try:
+            yield _sse("status", {"type": "status", "execution_id": execution_id, "status": current_status})
+            if current_status in TERMINAL_STATUSES:
+                return
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.EXECUTION_EVENTS_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    latest_status = await get_workflow_execution_status(execution_id)
+                    if latest_status is None or latest_status in TERMINAL_STATUSES:
+                        yield _sse("status", {"type": "status", "execution_id": execution_id, "status": latest_status})
+                        return
+                    yield ": keepalive\n\n"
+                    continue
+                yield _sse(event["type"], event)
+                if event["type"] == "status" and event["status"] in TERMINAL_STATUSES:
+                    return
+        finally:
+            execution_events.unsubscribe(execution_id, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/{execution_id}/logs", response_model=List[ExecutionLogEntry])
+async def get_execution_logs(
+    execution_id: str,
+    after_seq: int = -1,
+    limit: int = 100,
+    current_user: UserModel = Depends(get_current_user)
+):
+    """
+    Page through the log entries of a workflow execution
+    
+    Pass the seq of the last entry received as after_seq to fetch the next page.
+    """
+    await _check_execution_access(execution_id, current_user)
+    return await get_workflow_execution_logs(execution_id, after_seq, limit)
+
 @router.get("/workflow/{workflow_id}", response_model=List[WorkflowExecution])
 async def list_workflow_executions(
     workflow_id: str,
+    response: Response,
     skip: int = 0,
     limit: int = 20,
+    cursor: Optional[str] = None,
+    view: str = "full",
+    fields: Optional[str] = None,
     current_user: UserModel = Depends(get_current_user)
 ):
     """
     List executions for a specific workflow
+    
+    Pass the X-Next-Cursor response header back as cursor to fetch the next page.
+    Use view=summary or fields=a,b to return only the listed fields.
     """
-    return await get_workflow_executions(workflow_id, skip, limit)
+    try:
+        after = decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    selected = parse_field_selection(fields, view, WorkflowExecution, ExecutionSummary)
+    if selected is not None:
+        items = await get_workflow_execution_fields(workflow_id, selected, skip, limit, after)
+        return projected_response(items, limit, "started_at", None if fields else ExecutionSummary)
+    
+    executions = await get_workflow_executions(workflow_id, skip, limit, after)
+    if executions and len(executions) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(executions[-1].started_at, executions[-1].id)
+    return executions
@@ -4,13 +4,20 @@ from typing import List
 from datetime import timedelta
 
 from backend.models.user import UserModel, UserCreate, UserResponse, Token
-from backend.core.security import get_password_hash, verify_password
+from backend.core.security import get_password_hash_async, verify_password_async, PasswordPoolSaturated
 from backend.core.config import settings
 from backend.database.mongodb import create_user, get_user_by_email
 from backend.api.deps import create_access_token, get_current_user
 
 router = APIRouter()
 
+def too_many_requests() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many authentication requests, try again shortly",
+        headers={"Retry-After": "1"},
+    )
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register(user: UserCreate):
     # Check if user exists
@@ -22,7 +29,10 @@ async def register(user: UserCreate):
     
     # Create user
     user_data = user.dict()
-    hashed_password = get_password_hash(user_data.pop("password"))
+    try:
+        hashed_password = await get_password_hash_async(user_data.pop("password"))
+    except PasswordPoolSaturated:
+        raise too_many_requests()
     user_model = UserModel(
         **user_data,
         hashed_password=hashed_password
@@ -43,7 +53,11 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
         )
     
     user = UserModel(**user_dict)
-    if not verify_password(form_data.password, user.hashed_password):
+    try:
+        password_valid = await verify_password_async(form_data.password, user.hashed_password)
+    except PasswordPoolSaturated:
+        raise too_many_requests()
+    if not password_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
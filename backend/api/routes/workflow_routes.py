@@ -1,20 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Response
 from typing import List, Optional
 from datetime import datetime
-from backend.models.workflow import WorkflowModel, WorkflowExecution
+from backend.models.workflow import WorkflowModel, WorkflowExecution, WorkflowSummary, ExecutionSummary
 from backend.services.workflow_service import (
     create_new_workflow,
     get_workflow_by_id,
     get_user_workflows,
+    get_user_workflow_fields,
     update_existing_workflow,
     delete_workflow_by_id,
-    execute_workflow,
     get_workflow_execution,
-    get_workflow_executions
+    get_workflow_executions,
+    get_workflow_execution_fields
 )
+from backend.services.execution_queue import execution_queue
+from backend.services.webhook_service import webhook_router
 from backend.services.ai_service import generate_workflow_from_description
 from backend.api.deps import get_current_user
+from backend.api.projection import parse_field_selection, projected_response
+from backend.utils.pagination import encode_cursor, decode_cursor
 from backend.models.user import UserModel
+import asyncio
 import os
 import logging
 
@@ -28,7 +34,10 @@ async def create_workflow(
     workflow.created_by = current_user.id
     workflow.created_at = datetime.now()
     workflow.updated_at = datetime.now()
-    created_workflow = await create_new_workflow(workflow)
+    try:
+        created_workflow = await create_new_workflow(workflow)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return created_workflow
 
 @router.post("/generate", response_model=WorkflowModel, status_code=status.HTTP_201_CREATED)
@@ -38,16 +47,36 @@ async def generate_workflow(
 ):
     workflow = await generate_workflow_from_description(description, current_user.id)
     # Save the generated workflow to the database
-    created_workflow = await create_new_workflow(workflow)
+    try:
+        created_workflow = await create_new_workflow(workflow)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return created_workflow
 
 @router.get("/", response_model=List[WorkflowModel])
 async def get_workflows(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    view: str = "full",
+    fields: Optional[str] = None,
     current_user: UserModel = Depends(get_current_user)
 ):
-    workflows = await get_user_workflows(current_user.id, skip, limit)
+    try:
+        after = decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # view=summary or fields= skip loading and validating full workflows
+    selected = parse_field_selection(fields, view, WorkflowModel, WorkflowSummary)
+    if selected is not None:
+        items = await get_user_workflow_fields(current_user.id, selected, skip, limit, after)
+        return projected_response(items, limit, "updated_at", None if fields else WorkflowSummary)
+    
+    workflows = await get_user_workflows(current_user.id, skip, limit, after)
+    if workflows and len(workflows) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(workflows[-1].updated_at, workflows[-1].id)
     return workflows
 
 @router.get("/{workflow_id}", response_model=WorkflowModel)
@@ -75,7 +104,10 @@ async def update_workflow(
         raise HTTPException(status_code=403, detail="Not authorized to update this workflow")
     
     workflow_data.updated_at = datetime.now()
-    updated_workflow = await update_existing_workflow(workflow_id, workflow_data)
+    try:
+        updated_workflow = await update_existing_workflow(workflow_id, workflow_data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return updated_workflow
 
 @router.delete("/{workflow_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -94,24 +126,29 @@ async def delete_workflow(
         raise HTTPException(status_code=500, detail="Failed to delete workflow")
     return None
 
-@router.post("/{workflow_id}/execute", response_model=WorkflowExecution)
+@router.post("/{workflow_id}/execute", response_model=WorkflowExecution, status_code=status.HTTP_202_ACCEPTED)
 async def execute_workflow_endpoint(
     workflow_id: str,
     input_data: dict = Body(...),
     current_user: UserModel = Depends(get_current_user)
 ):
-    workflow = await get_workflow_by_id(workflow_id)
-    if not workflow:
+    try:
+        execution = await execution_queue.enqueue(workflow_id, input_data)
+    except ValueError:
         raise HTTPException(status_code=404, detail="Workflow not found")
-    
-    execution_result = await execute_workflow(workflow_id, input_data)
-    return execution_result
+    except (asyncio.QueueFull, RuntimeError):
+        raise HTTPException(status_code=503, detail="Execution queue is unavailable, try again later")
+    return execution
 
 @router.get("/{workflow_id}/executions", response_model=List[WorkflowExecution])
 async def get_workflow_executions_endpoint(
     workflow_id: str,
+    response: Response,
     skip: int = 0,
     limit: int = 20,
+    cursor: Optional[str] = None,
+    view: str = "full",
+    fields: Optional[str] = None,
     current_user: UserModel = Depends(get_current_user)
 ):
     workflow = await get_workflow_by_id(workflow_id)
@@ -120,7 +157,19 @@ async def get_workflow_executions_endpoint(
     if workflow.created_by != current_user.id and not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Not authorized to access this workflow")
     
-    executions = await get_workflow_executions(workflow_id, skip, limit)
+    try:
+        after = decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    selected = parse_field_selection(fields, view, WorkflowExecution, ExecutionSummary)
+    if selected is not None:
+        items = await get_workflow_execution_fields(workflow_id, selected, skip, limit, after)
+        return projected_response(items, limit, "started_at", None if fields else ExecutionSummary)
+    
+    executions = await get_workflow_executions(workflow_id, skip, limit, after)
+    if executions and len(executions) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(executions[-1].started_at, executions[-1].id)
     return executions
 
 @router.get("/{workflow_id}/executions/{execution_id}", response_model=WorkflowExecution)
@@ -141,12 +190,20 @@ async def get_execution_endpoint(
     
     return execution
 
-@router.post("/webhook/{webhook_id}")
+@router.post("/webhook/{webhook_id}", status_code=status.HTTP_202_ACCEPTED)
 async def webhook_trigger(
     webhook_id: str,
     payload: dict = Body(...)
 ):
-    # Find workflow with this webhook ID
-    # Execute workflow with the payload
+    # Resolve the workflow from the in-memory index instead of scanning trigger configs
+    workflow_id = webhook_router.resolve(webhook_id)
+    if workflow_id is not None:
+        try:
+            await execution_queue.enqueue(workflow_id, payload)
+        except ValueError:
+            # Deleted since the index was last refreshed
+            pass
+        except (asyncio.QueueFull, RuntimeError):
+            raise HTTPException(status_code=503, detail="Execution queue is unavailable, try again later")
     # Return minimal response to avoid information leakage
     return {"status": "received"}
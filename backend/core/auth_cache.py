@@ -0,0 +1,80 @@
+from typing import Dict, Any, Optional
+from datetime import datetime, timezone
+from cachetools import TTLCache
+from .config import settings
+
+class UserCache:
+    """
+    Short-lived cache of authenticated users keyed by (user_id, token iat)
+    
+    Entries are dropped for a user whenever the user document changes. A
+    per-user generation counter stops a lookup that started before the change
+    from re-populating the cache with stale data.
+    """
+    
+    def __init__(self):
+        self._users = TTLCache(maxsize=settings.AUTH_USER_CACHE_MAX_SIZE, ttl=settings.AUTH_USER_CACHE_TTL)
+        self._generations: Dict[str, int] = {}
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+    
+    def generation(self, user_id: str) -> int:
+        return self._generations.get(user_id, 0)
+    
+    def get(self, user_id: str, issued_at: Optional[int]):
+        user = self._users.get((user_id, issued_at))
+        if user is None:
+            self._stats["misses"] += 1
+        else:
+            self._stats["hits"] += 1
+        return user
+    
+    def set(self, user_id: str, issued_at: Optional[int], user, generation: int):
+        if generation == self.generation(user_id):
+            self._users[(user_id, issued_at)] = user
+    
+    def invalidate(self, user_id: str):
+        self._generations[user_id] = self.generation(user_id) + 1
+        for key in [key for key in list(self._users.keys()) if key[0] == user_id]:
+            self._users.pop(key, None)
+        self._stats["invalidations"] += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "size": len(self._users),
+            "hit_rate": self._stats["hits"] / lookups if lookups else 0.0
+        }
+
+class TokenClaimsCache:
+    """
+    Cache of decoded JWT claims keyed by the raw token
+    
+    Expiry is checked on every hit since cached claims outlive the decode that
+    validated them.
+    """
+    
+    def __init__(self):
+        self._claims = TTLCache(maxsize=settings.AUTH_TOKEN_CACHE_MAX_SIZE, ttl=settings.AUTH_TOKEN_CACHE_TTL)
+        self._stats = {"hits": 0, "misses": 0}
+    
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        claims = self._claims.get(token)
+        if claims is not None:
+            expires = claims.get("exp")
+            if expires is None or expires > datetime.now(timezone.utc).timestamp():
+                self._stats["hits"] += 1
+                return claims
+            self._claims.pop(token, None)
+        self._stats["misses"] += 1
+        return None
+    
+    def set(self, token: str, claims: Dict[str, Any]):
+        self._claims[token] = claims
+    
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "size": len(self._claims)}
+
+# Create singleton instances
+user_cache = UserCache()
+token_claims_cache = TokenClaimsCache()
@@ -15,6 +15,9 @@ class Settings(BaseSettings):
     API_PORT: int = 8000
     MONGODB_URI: str = "mongodb://localhost:27017"
     MONGODB_DB_NAME: str = "workflow_automation"
+    MONGODB_QUERY_PLAN_CHECK: bool = True
+    BLOB_BUCKET: str = "blobs"
+    BLOB_TTL_DAYS: int = 7
     TELEGRAM_BOT_TOKEN: Optional[str] = None
     DEBUG: bool = True
     
@@ -23,6 +26,68 @@ class Settings(BaseSettings):
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    AUTH_USER_CACHE_TTL: int = 30
+    AUTH_USER_CACHE_MAX_SIZE: int = 10000
+    AUTH_TOKEN_CACHE_TTL: int = 300
+    AUTH_TOKEN_CACHE_MAX_SIZE: int = 10000
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+
+    # Execution Configuration
+    WORKFLOW_MAX_CONCURRENCY: int = 8
+    EXECUTION_WORKERS: int = 4
+    EXECUTION_QUEUE_MAX_SIZE: int = 1000
+    EXECUTION_SHUTDOWN_TIMEOUT: float = 30.0
+    CONTEXT_SPILL_THRESHOLD_BYTES: int = 262144
+    BATCH_MAX_ITEMS: int = 10000
+    BATCH_MAX_ITEM_BYTES: int = 1048576
+    BATCH_INSERT_SIZE: int = 500
+    BATCH_CONCURRENCY: int = 4
+    BATCH_MAX_RUNNING: int = 4
+    EXECUTION_LOG_BATCH_SIZE: int = 20
+    EXECUTION_LOG_FLUSH_INTERVAL_MS: int = 500
+    EXECUTION_LOG_TTL_DAYS: int = 30
+    EXECUTION_HEARTBEAT_INTERVAL: float = 15.0
+    EXECUTION_ORPHAN_TIMEOUT: float = 60.0
+    EXECUTION_RECOVERY_INTERVAL: float = 60.0
+    EXECUTION_MAX_RECOVERIES: int = 3
+    EXECUTION_EVENTS_QUEUE_SIZE: int = 100
+    EXECUTION_EVENTS_KEEPALIVE: float = 15.0
+    TEMPLATE_CACHE_SIZE: int = 4096
+    TRIGGER_INDEX_REFRESH_INTERVAL: float = 60.0
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_LEASE_TTL: int = 30
+    SCHEDULER_MAX_CATCH_UP: int = 10
+    SCHEDULER_MIN_INTERVAL: int = 60
+    EVENT_BUS_QUEUE_MAX_SIZE: int = 10000
+    EVENT_DISPATCH_BATCH_SIZE: int = 50
+    EVENT_MAX_CHAIN_DEPTH: int = 8
+    JMESPATH_CACHE_SIZE: int = 1024
+
+    # HTTP Client Configuration
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 5.0
+    HTTP2_ENABLED: bool = False
+    HTTP_MAX_INLINE_RESPONSE_BYTES: int = 1048576
+    HTTP_MAX_RESPONSE_BYTES: int = 104857600
+    ACTION_RETRY_MAX_ATTEMPTS: int = 10
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_BREAKER_RESET_TIMEOUT: float = 30.0
+
+    # AI Configuration
+    AI_MODEL: str = "gemini-2.5-flash"
+    AI_MAX_CONCURRENCY: int = 8
+    AI_REQUEST_TIMEOUT: float = 60.0
+    AI_CACHE_ENABLED: bool = True
+    AI_CACHE_MAX_SIZE: int = 1024
+    AI_CACHE_TTL: int = 3600
+    AI_CACHE_MONGO_ENABLED: bool = False
+    WORKFLOW_CACHE_ENABLED: bool = True
+    WORKFLOW_CACHE_MAX_SIZE: int = 256
+    WORKFLOW_CACHE_TTL: int = 86400
+    WORKFLOW_CACHE_SIMILARITY_THRESHOLD: Optional[float] = None
 
 settings = Settings()
 print(settings.model_dump())
\ No newline at end of file
@@ -1,12 +1,54 @@
 from passlib.context import CryptContext
-from typing import Union, Any
+from typing import Union, Any, Callable, Dict
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import jwt
+from .config import settings
 
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 
+# argon2 releases the GIL, so a small thread pool keeps hashing off the event loop
+_password_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password")
+_password_stats = {"pending": 0, "completed": 0, "failed": 0, "rejected": 0}
+
+class PasswordPoolSaturated(Exception):
+    """
+    Raised when too many password operations are already waiting
+    """
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+async def _run_password_task(func: Callable, *args):
+    if _password_stats["pending"] >= settings.PASSWORD_HASH_MAX_PENDING:
+        _password_stats["rejected"] += 1
+        raise PasswordPoolSaturated()
+    
+    _password_stats["pending"] += 1
+    try:
+        result = await asyncio.get_running_loop().run_in_executor(_password_executor, func, *args)
+    except Exception:
+        _password_stats["failed"] += 1
+        raise
+    finally:
+        _password_stats["pending"] -= 1
+    _password_stats["completed"] += 1
+    return result
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_password_task(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_password_task(get_password_hash, password)
+
+def password_pool_stats() -> Dict[str, Any]:
+    return {
+        **_password_stats,
+        "queue_depth": max(0, _password_stats["pending"] - settings.PASSWORD_HASH_WORKERS),
+        "workers": settings.PASSWORD_HASH_WORKERS,
+        "max_pending": settings.PASSWORD_HASH_MAX_PENDING
+    }
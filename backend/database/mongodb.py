@@ -1,5 +1,12 @@
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorGridFSBucket
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError, OperationFailure, PyMongoError
 from ..core.config import settings
+from ..core.auth_cache import user_cache
+from ..utils.pagination import Cursor, keyset_filter
+from typing import List, Optional
+from datetime import datetime, timedelta
 import logging
 
 logger = logging.getLogger(__name__)
@@ -7,6 +14,7 @@ logger = logging.getLogger(__name__)
 class Database:
     client = None
     db = None
+    blobs = None
 
 db = Database()
 
@@ -14,6 +22,7 @@ async def init_db():
     logger.info("Connecting to MongoDB...")
     db.client = AsyncIOMotorClient(settings.MONGODB_URI)
     db.db = db.client[settings.MONGODB_DB_NAME]
+    db.blobs = AsyncIOMotorGridFSBucket(db.db, bucket_name=settings.BLOB_BUCKET)
     logger.info("Connected to MongoDB.")
     
     # Create collections if they don't exist
@@ -25,9 +34,106 @@ async def init_db():
             await db.db.create_collection("workflows")
         if "workflow_executions" not in await db.db.list_collection_names():
             await db.db.create_collection("workflow_executions")
+        if "execution_logs" not in await db.db.list_collection_names():
+            await db.db.create_collection("execution_logs")
+        if "execution_checkpoints" not in await db.db.list_collection_names():
+            await db.db.create_collection("execution_checkpoints")
+        if "workflow_batches" not in await db.db.list_collection_names():
+            await db.db.create_collection("workflow_batches")
+        if "workflow_schedules" not in await db.db.list_collection_names():
+            await db.db.create_collection("workflow_schedules")
+        if "ai_result_cache" not in await db.db.list_collection_names():
+            await db.db.create_collection("ai_result_cache")
     except Exception as e:
         logger.error(f"Error initializing database: {e}")
         raise
+    
+    await ensure_indexes()
+    if settings.MONGODB_QUERY_PLAN_CHECK:
+        await check_query_plans()
+
+# Indexes backing every hot query, as (collection, keys, options)
+INDEXES = [
+    ("users", [("id", ASCENDING)], {"unique": True}),
+    ("users", [("email", ASCENDING)], {"unique": True}),
+    ("workflows", [("id", ASCENDING)], {"unique": True}),
+    ("workflows", [("created_by", ASCENDING), ("updated_at", DESCENDING), ("id", DESCENDING)], {}),
+    ("workflows", [("trigger.type", ASCENDING), ("status", ASCENDING)], {}),
+    ("workflows", [("trigger.config.webhook_id", ASCENDING)], {"unique": True, "partialFilterExpression": {"trigger.config.webhook_id": {"$type": "string"}}}),
+    ("workflow_executions", [("id", ASCENDING)], {"unique": True}),
+    ("workflow_executions", [("workflow_id", ASCENDING), ("started_at", DESCENDING), ("id", DESCENDING)], {}),
+    ("execution_logs", [("execution_id", ASCENDING), ("seq", ASCENDING)], {"unique": True}),
+    ("workflow_executions", [("status", ASCENDING), ("heartbeat_at", ASCENDING)], {}),
+    ("workflow_executions", [("batch_id", ASCENDING), ("status", ASCENDING)], {}),
+    ("workflow_batches", [("id", ASCENDING)], {"unique": True}),
+    ("execution_logs", [("created_at", ASCENDING)], {"expireAfterSeconds": settings.EXECUTION_LOG_TTL_DAYS * 86400}),
+    ("execution_checkpoints", [("execution_id", ASCENDING), ("action_id", ASCENDING)], {"unique": True}),
+    ("execution_checkpoints", [("created_at", ASCENDING)], {"expireAfterSeconds": settings.EXECUTION_LOG_TTL_DAYS * 86400}),
+    ("workflow_schedules", [("workflow_id", ASCENDING)], {"unique": True}),
+    (f"{settings.BLOB_BUCKET}.files", [("uploadDate", ASCENDING)], {}),
+    ("ai_result_cache", [("key", ASCENDING)], {"unique": True}),
+    ("ai_result_cache", [("expires_at", ASCENDING)], {"expireAfterSeconds": 0}),
+]
+
+# Deterministic listing orders, matching the compound indexes above
+WORKFLOW_SORT = [("updated_at", DESCENDING), ("id", DESCENDING)]
+EXECUTION_SORT = [("started_at", DESCENDING), ("id", DESCENDING)]
+
+async def ensure_indexes():
+    """
+    Create all indexes, a no-op for indexes that already exist
+    """
+    for collection, keys, options in INDEXES:
+        try:
+            await db.db[collection].create_index(keys, **options)
+        except OperationFailure as e:
+            if e.code == 85 and "expireAfterSeconds" in options:
+                # The TTL setting changed, update it in place instead of rebuilding the index
+                await db.db.command({
+                    "collMod": collection,
+                    "index": {"keyPattern": dict(keys), "expireAfterSeconds": options["expireAfterSeconds"]}
+                })
+            else:
+                logger.error(f"Error creating index {keys} on {collection}: {e}")
+        except PyMongoError as e:
+            # e.g. duplicate values blocking a unique index; keep starting up
+            logger.error(f"Error creating index {keys} on {collection}: {e}")
+
+def _uses_collection_scan(plan) -> bool:
+    if isinstance(plan, dict):
+        if plan.get("stage") == "COLLSCAN":
+            return True
+        return any(_uses_collection_scan(value) for value in plan.values())
+    if isinstance(plan, list):
+        return any(_uses_collection_scan(value) for value in plan)
+    return False
+
+async def check_query_plans():
+    """
+    Explain every hot query and warn when one would scan a whole collection
+    """
+    queries = {
+        "get_user_by_id": db.db.users.find({"id": ""}),
+        "get_user_by_email": db.db.users.find({"email": ""}),
+        "get_workflow": db.db.workflows.find({"id": ""}),
+        "get_workflows_by_user": db.db.workflows.find({"created_by": ""}).sort(WORKFLOW_SORT),
+        "get_workflows_by_trigger": db.db.workflows.find({"trigger.type": "", "status": ""}),
+        "get_execution": db.db.workflow_executions.find({"id": ""}),
+        "get_executions_by_workflow": db.db.workflow_executions.find({"workflow_id": ""}).sort(EXECUTION_SORT),
+        "get_execution_logs": db.db.execution_logs.find({"execution_id": "", "seq": {"$gt": -1}}).sort("seq", ASCENDING),
+        "get_execution_checkpoints": db.db.execution_checkpoints.find({"execution_id": ""}),
+        "find_orphaned_executions": db.db.workflow_executions.find({"status": {"$in": ["pending", "running"]}, "heartbeat_at": {"$lt": datetime.utcnow()}}),
+        "find_legacy_executions": db.db.workflow_executions.find({"status": {"$in": ["pending", "running"]}, "heartbeat_at": None}),
+        "count_batch_executions": db.db.workflow_executions.find({"batch_id": ""}),
+    }
+    for name, cursor in queries.items():
+        try:
+            explanation = await cursor.explain()
+        except PyMongoError as e:
+            logger.warning(f"Could not explain query {name}: {e}")
+            continue
+        if _uses_collection_scan(explanation.get("queryPlanner", {}).get("winningPlan")):
+            logger.warning(f"Query {name} does not use an index and will scan the whole collection")
 
 async def close_db():
     if db.client:
@@ -51,27 +157,57 @@ async def update_user(user_id: str, user_data: dict):
         {"id": user_id},
         {"$set": user_data}
     )
+    # Profile and password changes must not be served from the auth cache
+    user_cache.invalidate(user_id)
     return result.modified_count > 0
 
 # Workflow collection operations
 async def create_workflow(workflow_data: dict):
-    result = await db.db.workflows.insert_one(workflow_data)
+    try:
+        result = await db.db.workflows.insert_one(workflow_data)
+    except DuplicateKeyError:
+        raise ValueError("Webhook ID is already used by another workflow")
     return result.inserted_id
 
 async def get_workflow(workflow_id: str):
     return await db.db.workflows.find_one({"id": workflow_id})
 
-async def get_workflows_by_user(user_id: str, skip: int = 0, limit: int = 100):
-    cursor = db.db.workflows.find({"created_by": user_id}).skip(skip).limit(limit)
+async def get_workflows_by_ids(workflow_ids: List[str]):
+    cursor = db.db.workflows.find({"id": {"$in": workflow_ids}})
+    return await cursor.to_list(length=None)
+
+async def get_workflows_by_user(user_id: str, skip: int = 0, limit: int = 100, after: Optional[Cursor] = None, projection: Optional[dict] = None):
+    query = {"created_by": user_id, **keyset_filter("updated_at", after)}
+    cursor = db.db.workflows.find(query, projection).sort(WORKFLOW_SORT)
+    if after is None and skip:
+        cursor = cursor.skip(skip)
+    cursor = cursor.limit(limit)
     return await cursor.to_list(length=limit)
 
+async def get_workflows_by_trigger(trigger_type: str, status: str, projection: Optional[dict] = None):
+    cursor = db.db.workflows.find({"trigger.type": trigger_type, "status": status}, projection)
+    return await cursor.to_list(length=None)
+
 async def update_workflow(workflow_id: str, workflow_data: dict):
-    result = await db.db.workflows.update_one(
-        {"id": workflow_id},
-        {"$set": workflow_data}
-    )
+    try:
+        result = await db.db.workflows.update_one(
+            {"id": workflow_id},
+            {"$set": workflow_data}
+        )
+    except DuplicateKeyError:
+        raise ValueError("Webhook ID is already used by another workflow")
     return result.modified_count > 0
 
+async def webhook_id_taken(webhook_id: str, workflow_id: str) -> bool:
+    """
+    Whether another workflow listens on webhook_id, including older workflows listening on their own ID
+    """
+    other = await db.db.workflows.find_one(
+        {"id": {"$ne": workflow_id}, "$or": [{"trigger.config.webhook_id": webhook_id}, {"id": webhook_id}]},
+        {"_id": 0, "id": 1}
+    )
+    return other is not None
+
 async def delete_workflow(workflow_id: str):
     result = await db.db.workflows.delete_one({"id": workflow_id})
     return result.deleted_count > 0
@@ -81,11 +217,24 @@ async def create_execution(execution_data: dict):
     result = await db.db.workflow_executions.insert_one(execution_data)
     return result.inserted_id
 
+async def create_executions(executions_data: List[dict]):
+    if not executions_data:
+        return
+    await db.db.workflow_executions.insert_many(executions_data, ordered=False)
+
 async def get_execution(execution_id: str):
-    return await db.db.workflow_executions.find_one({"id": execution_id})
+    # Logs live in execution_logs; skip any embedded by older versions
+    return await db.db.workflow_executions.find_one({"id": execution_id}, {"logs": 0})
+
+async def get_execution_status(execution_id: str):
+    return await db.db.workflow_executions.find_one({"id": execution_id}, {"_id": 0, "status": 1, "workflow_id": 1})
 
-async def get_executions_by_workflow(workflow_id: str, skip: int = 0, limit: int = 100):
-    cursor = db.db.workflow_executions.find({"workflow_id": workflow_id}).skip(skip).limit(limit)
+async def get_executions_by_workflow(workflow_id: str, skip: int = 0, limit: int = 100, after: Optional[Cursor] = None, projection: Optional[dict] = None):
+    query = {"workflow_id": workflow_id, **keyset_filter("started_at", after)}
+    cursor = db.db.workflow_executions.find(query, projection or {"logs": 0}).sort(EXECUTION_SORT)
+    if after is None and skip:
+        cursor = cursor.skip(skip)
+    cursor = cursor.limit(limit)
     return await cursor.to_list(length=limit)
 
 async def update_execution(execution_id: str, execution_data: dict):
@@ -93,4 +242,198 @@ async def update_execution(execution_id: str, execution_data: dict):
         {"id": execution_id},
         {"$set": execution_data}
     )
-    return result.modified_count > 0
\ No newline at end of file
+    return result.modified_count > 0
+
+async def touch_executions(execution_ids: List[str]):
+    """
+    Refresh the heartbeat of executions this process is queueing or running
+    """
+    if not execution_ids:
+        return
+    await db.db.workflow_executions.update_many(
+        {"id": {"$in": execution_ids}},
+        {"$set": {"heartbeat_at": datetime.utcnow()}}
+    )
+
+async def find_orphaned_executions(timeout_seconds: float, limit: int):
+    """
+    Pending or running executions whose process stopped sending heartbeats
+    """
+    query = {
+        "status": {"$in": ["pending", "running"]},
+        "heartbeat_at": {"$lt": datetime.utcnow() - timedelta(seconds=timeout_seconds)}
+    }
+    cursor = db.db.workflow_executions.find(query, {"logs": 0}).limit(limit)
+    return await cursor.to_list(length=limit)
+
+async def find_legacy_executions(timeout_seconds: float, limit: int):
+    """
+    Pending or running executions created before heartbeats existed
+    """
+    # started_at is local time
+    query = {
+        "status": {"$in": ["pending", "running"]},
+        "heartbeat_at": None,
+        "started_at": {"$lt": datetime.now() - timedelta(seconds=timeout_seconds)}
+    }
+    cursor = db.db.workflow_executions.find(query, {"logs": 0}).limit(limit)
+    return await cursor.to_list(length=limit)
+
+async def fail_legacy_execution(execution_id: str):
+    """
+    Mark an execution without heartbeat failed, returning False if it finished or was failed elsewhere first
+    """
+    result = await db.db.workflow_executions.update_one(
+        {"id": execution_id, "status": {"$in": ["pending", "running"]}, "heartbeat_at": None},
+        {"$set": {"status": "failed", "completed_at": datetime.now()}}
+    )
+    return result.modified_count > 0
+
+async def claim_orphaned_execution(execution_id: str, heartbeat_at: Optional[datetime]):
+    """
+    Take over an orphaned execution, returning None if another process claimed it first
+    """
+    return await db.db.workflow_executions.find_one_and_update(
+        {"id": execution_id, "status": {"$in": ["pending", "running"]}, "heartbeat_at": heartbeat_at},
+        {"$set": {"heartbeat_at": datetime.utcnow()}, "$inc": {"recovery_attempts": 1}},
+        projection={"logs": 0},
+        return_document=ReturnDocument.AFTER
+    )
+
+# Batch operations
+async def create_batch(batch_data: dict):
+    result = await db.db.workflow_batches.insert_one(batch_data)
+    return result.inserted_id
+
+async def get_batch(batch_id: str):
+    return await db.db.workflow_batches.find_one({"id": batch_id}, {"_id": 0})
+
+async def update_batch(batch_id: str, batch_data: dict):
+    result = await db.db.workflow_batches.update_one({"id": batch_id}, {"$set": batch_data})
+    return result.modified_count > 0
+
+async def count_batch_executions(batch_id: str):
+    """
+    Number of a batch's executions in each status
+    """
+    cursor = db.db.workflow_executions.aggregate([
+        {"$match": {"batch_id": batch_id}},
+        {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+    ])
+    return {group["_id"]: group["count"] async for group in cursor}
+
+async def touch_batch_executions(batch_ids: List[str]):
+    """
+    Refresh the heartbeat of every unfinished execution of the given batches
+    """
+    if not batch_ids:
+        return
+    await db.db.workflow_executions.update_many(
+        {"batch_id": {"$in": batch_ids}, "status": {"$in": ["pending", "running"]}},
+        {"$set": {"heartbeat_at": datetime.utcnow()}}
+    )
+
+# Execution checkpoint operations
+async def save_execution_checkpoint(execution_id: str, action_id: str, result: dict):
+    await db.db.execution_checkpoints.replace_one(
+        {"execution_id": execution_id, "action_id": action_id},
+        {"execution_id": execution_id, "action_id": action_id, "result": result, "created_at": datetime.utcnow()},
+        upsert=True
+    )
+
+async def get_execution_checkpoints(execution_id: str):
+    cursor = db.db.execution_checkpoints.find({"execution_id": execution_id}, {"_id": 0, "action_id": 1, "result": 1})
+    return {checkpoint["action_id"]: checkpoint["result"] for checkpoint in await cursor.to_list(length=None)}
+
+async def delete_execution_checkpoints(execution_id: str):
+    await db.db.execution_checkpoints.delete_many({"execution_id": execution_id})
+
+# Execution log operations
+async def append_execution_logs(log_entries: list):
+    result = await db.db.execution_logs.insert_many(log_entries)
+    return result.inserted_ids
+
+async def get_next_execution_log_seq(execution_id: str) -> int:
+    last = await db.db.execution_logs.find_one({"execution_id": execution_id}, {"seq": 1}, sort=[("seq", DESCENDING)])
+    return last["seq"] + 1 if last else 0
+
+async def get_execution_logs(execution_id: str, after_seq: int = -1, limit: int = 100):
+    cursor = db.db.execution_logs.find(
+        {"execution_id": execution_id, "seq": {"$gt": after_seq}},
+        {"_id": 0, "created_at": 0}
+    ).sort("seq", ASCENDING).limit(limit)
+    return await cursor.to_list(length=limit)
+
+# Blob operations
+def open_blob_upload(filename: str, metadata: dict):
+    return db.blobs.open_upload_stream(filename, metadata=metadata)
+
+async def read_blob(blob_id: str) -> bytes:
+    stream = await db.blobs.open_download_stream(ObjectId(blob_id))
+    return await stream.read()
+
+async def retain_blobs(blob_ids: List[str]):
+    """
+    Exclude blobs from expiry, for blobs referenced by stored data
+    """
+    if not blob_ids:
+        return
+    await db.db[f"{settings.BLOB_BUCKET}.files"].update_many(
+        {"_id": {"$in": [ObjectId(blob_id) for blob_id in blob_ids]}},
+        {"$set": {"metadata.retain": True}}
+    )
+
+async def delete_blobs_before(cutoff: datetime) -> int:
+    deleted = 0
+    async for blob in db.blobs.find({"uploadDate": {"$lt": cutoff}, "metadata.retain": {"$ne": True}}):
+        await db.blobs.delete(blob._id)
+        deleted += 1
+    return deleted
+
+# Scheduler operations
+async def get_schedule_states(workflow_ids: List[str]):
+    cursor = db.db.workflow_schedules.find({"workflow_id": {"$in": workflow_ids}}, {"_id": 0})
+    return await cursor.to_list(length=None)
+
+async def claim_scheduled_run(workflow_id: str, fire_at: datetime) -> bool:
+    """
+    Record a scheduled run, returning False if this or a later run was already recorded
+    """
+    try:
+        await db.db.workflow_schedules.update_one(
+            {"workflow_id": workflow_id, "last_run_at": {"$lt": fire_at}},
+            {"$set": {"last_run_at": fire_at}},
+            upsert=True
+        )
+        return True
+    except DuplicateKeyError:
+        return False
+
+async def acquire_lease(name: str, holder: str, ttl_seconds: int) -> bool:
+    """
+    Take or renew a named lease, returning False while another holder owns it
+    """
+    now = datetime.utcnow()
+    try:
+        await db.db.leases.update_one(
+            {"_id": name, "$or": [{"expires_at": {"$lt": now}}, {"holder": holder}]},
+            {"$set": {"holder": holder, "expires_at": now + timedelta(seconds=ttl_seconds)}},
+            upsert=True
+        )
+        return True
+    except DuplicateKeyError:
+        return False
+
+async def release_lease(name: str, holder: str):
+    await db.db.leases.delete_one({"_id": name, "holder": holder})
+
+# AI result cache operations
+async def get_ai_cache_entry(key: str):
+    return await db.db.ai_result_cache.find_one({"key": key})
+
+async def set_ai_cache_entry(key: str, entry_data: dict):
+    await db.db.ai_result_cache.update_one(
+        {"key": key},
+        {"$set": entry_data},
+        upsert=True
+    )
@@ -8,6 +8,18 @@ import os
 from .core.config import settings
 from .api import routes
 from .database.mongodb import init_db, close_db
+from .services.execution_queue import execution_queue
+from .services.batch_service import batch_runner
+from .services.tool_service import tool_service
+from .services.resilience import circuit_breakers
+from .services.blob_store import blob_store
+from .services.webhook_service import webhook_router
+from .services.scheduler_service import workflow_scheduler
+from .services.event_bus import event_bus
+from .services.execution_events import execution_events
+from .services.ai_cache import ai_result_cache, workflow_skeleton_cache
+from .core.auth_cache import user_cache, token_claims_cache
+from .core.security import password_pool_stats
 
 app = FastAPI(
     title="Workflow Automation API",
@@ -22,6 +34,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include routers
@@ -30,9 +43,26 @@ app.include_router(routes.router, prefix="/api")
 @app.on_event("startup")
 async def startup_event():
     await init_db()
+    await tool_service.startup()
+    await blob_store.start()
+    await execution_queue.start()
+    await batch_runner.start()
+    await webhook_router.start()
+    await event_bus.start(dispatch_many=execution_queue.enqueue_many)
+    if settings.SCHEDULER_ENABLED:
+        await workflow_scheduler.start(dispatch=execution_queue.enqueue)
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    await workflow_scheduler.stop()
+    await webhook_router.stop()
+    # Hand buffered events to the execution queue before it stops accepting jobs
+    await event_bus.stop()
+    # Let queued executions finish before the database goes away
+    await batch_runner.stop()
+    await execution_queue.shutdown()
+    await tool_service.shutdown()
+    await blob_store.stop()
     await close_db()
 
 @app.get("/")
@@ -47,5 +77,24 @@ async def health_check():
         "version": app.version
     }
 
+@app.get("/metrics")
+async def metrics():
+    return {
+        "http_pool": tool_service.http_pool_stats(),
+        "circuit_breakers": circuit_breakers.stats(),
+        "blob_store": blob_store.stats(),
+        "ai": tool_service.ai_stats(),
+        "ai_cache": ai_result_cache.stats(),
+        "workflow_cache": workflow_skeleton_cache.stats(),
+        "auth_user_cache": user_cache.stats(),
+        "auth_token_cache": token_claims_cache.stats(),
+        "password_pool": password_pool_stats(),
+        "execution_queue": execution_queue.stats(),
+        "batches": batch_runner.stats(),
+        "scheduler": workflow_scheduler.stats(),
+        "events": event_bus.stats(),
+        "execution_events": execution_events.stats()
+    }
+
 if __name__ == "__main__":
     uvicorn.run("backend.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
@@ -50,6 +50,8 @@ class WorkflowModel(BaseModel):
     actions: List[WorkflowAction] = []
     conditions: List[WorkflowCondition] = []
     edges: List[WorkflowEdge] = []
+    # Context keys stored as output_data, every key when not set
+    outputs: Optional[List[str]] = None
     created_by: str
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
@@ -82,6 +84,14 @@ class WorkflowModel(BaseModel):
             }
         }
 
+class WorkflowSummary(BaseModel):
+    id: str
+    name: str
+    description: Optional[str] = None
+    status: WorkflowStatus
+    created_at: datetime
+    updated_at: datetime
+
 class WorkflowExecution(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     workflow_id: str
@@ -90,6 +100,8 @@ class WorkflowExecution(BaseModel):
     completed_at: Optional[datetime] = None
     input_data: Dict[str, Any] = {}
     output_data: Dict[str, Any] = {}
+    peak_context_bytes: Optional[int] = None
+    batch_id: Optional[str] = None
     logs: List[Dict[str, Any]] = []
     
     class Config:
@@ -105,4 +117,28 @@ class WorkflowExecution(BaseModel):
                     {"timestamp": "2023-01-01T12:00:30", "action": "extract_text", "message": "Processing completed"}
                 ]
             }
-        }
\ No newline at end of file
+        }
+
+class ExecutionSummary(BaseModel):
+    id: str
+    workflow_id: str
+    status: str
+    started_at: datetime
+    completed_at: Optional[datetime] = None
+
+class WorkflowBatch(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    workflow_id: str
+    created_by: str
+    status: str = "running"
+    total: int = 0
+    # Number of executions in each status, filled in when progress is read
+    counts: Dict[str, int] = {}
+    created_at: datetime = Field(default_factory=datetime.now)
+    completed_at: Optional[datetime] = None
+
+class ExecutionLogEntry(BaseModel):
+    execution_id: str
+    seq: int
+    timestamp: str
+    message: str
@@ -0,0 +1,146 @@
+from typing import Dict, Any, Optional, Set
+from datetime import datetime, timedelta
+import copy
+import hashlib
+import json
+import logging
+import re
+from cachetools import TTLCache
+from ..core.config import settings
+from ..database.mongodb import get_ai_cache_entry, set_ai_cache_entry
+
+logger = logging.getLogger(__name__)
+
+# Articles and politeness filler only. Prepositions and direction words (from,
+# to, on, at), logical words (and, or, not) and frequency words (every, each)
+# change what a workflow does, so they are kept in the key.
+STOPWORDS = {
+    "a", "an", "the", "please", "kindly", "i", "you", "can", "could", "would", "want", "just"
+}
+
+def normalize_description(description: str) -> str:
+    """
+    Reduce a workflow description to lowercase words without punctuation or stopwords
+    """
+    words = re.findall(r"[a-z0-9]+", description.lower())
+    return " ".join(word for word in words if word not in STOPWORDS)
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class AIResultCache:
+    """
+    Content-addressed cache of AI task results
+    
+    Results live in an in-memory LRU with a TTL and, when AI_CACHE_MONGO_ENABLED
+    is set, in a Mongo collection shared by every backend process.
+    """
+    
+    def __init__(self):
+        self._memory = TTLCache(maxsize=settings.AI_CACHE_MAX_SIZE, ttl=settings.AI_CACHE_TTL)
+        self._stats = {"hits": 0, "mongo_hits": 0, "misses": 0}
+    
+    @staticmethod
+    def make_key(model: str, task_type: str, system_message: str, prompt: str, input_text: Any) -> str:
+        """
+        Hash everything that influences the model output into a cache key
+        """
+        payload = json.dumps([model, task_type, system_message, prompt, input_text], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    async def get(self, key: str) -> Optional[str]:
+        result = self._memory.get(key)
+        if result is not None:
+            self._stats["hits"] += 1
+            return result
+        
+        if settings.AI_CACHE_MONGO_ENABLED:
+            try:
+                entry = await get_ai_cache_entry(key)
+            except Exception as e:
+                logger.warning(f"Error reading AI cache entry: {str(e)}")
+                entry = None
+            # The TTL monitor only runs periodically, so check expiry here as well
+            if entry and entry["expires_at"] > datetime.utcnow():
+                self._stats["mongo_hits"] += 1
+                self._memory[key] = entry["result"]
+                return entry["result"]
+        
+        self._stats["misses"] += 1
+        return None
+    
+    async def set(self, key: str, result: str):
+        self._memory[key] = result
+        if settings.AI_CACHE_MONGO_ENABLED:
+            try:
+                await set_ai_cache_entry(key, {
+                    "key": key,
+                    "result": result,
+                    "expires_at": datetime.utcnow() + timedelta(seconds=settings.AI_CACHE_TTL)
+                })
+            except Exception as e:
+                logger.warning(f"Error writing AI cache entry: {str(e)}")
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._stats["hits"] + self._stats["mongo_hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "size": len(self._memory),
+            "hit_rate": (lookups - self._stats["misses"]) / lookups if lookups else 0.0
+        }
+
+class WorkflowSkeletonCache:
+    """
+    Cache of generated workflow skeletons keyed by normalized description
+    
+    Stores the parsed model output before IDs and ownership are assigned, so a
+    hit only has to build fresh node IDs. When WORKFLOW_CACHE_SIMILARITY_THRESHOLD
+    is set, a miss falls back to the cached description with the highest
+    character trigram Jaccard similarity above the threshold.
+    """
+    
+    def __init__(self):
+        self._entries = TTLCache(maxsize=settings.WORKFLOW_CACHE_MAX_SIZE, ttl=settings.WORKFLOW_CACHE_TTL)
+        self._stats = {"hits": 0, "similar_hits": 0, "misses": 0, "evictions": 0}
+    
+    def get(self, description: str) -> Optional[Dict[str, Any]]:
+        normalized = normalize_description(description)
+        entry = self._entries.get(normalized)
+        if entry is not None:
+            self._stats["hits"] += 1
+            return copy.deepcopy(entry[1])
+        
+        threshold = settings.WORKFLOW_CACHE_SIMILARITY_THRESHOLD
+        if threshold is not None and normalized:
+            match = self._most_similar(_trigrams(normalized), threshold)
+            if match is not None:
+                self._stats["similar_hits"] += 1
+                return copy.deepcopy(match)
+        
+        self._stats["misses"] += 1
+        return None
+    
+    def set(self, description: str, skeleton: Dict[str, Any]):
+        normalized = normalize_description(description)
+        if normalized not in self._entries and len(self._entries) >= self._entries.maxsize:
+            self._stats["evictions"] += 1
+        self._entries[normalized] = (_trigrams(normalized), copy.deepcopy(skeleton))
+    
+    def _most_similar(self, trigrams: Set[str], threshold: float) -> Optional[Dict[str, Any]]:
+        best_score, best_skeleton = threshold, None
+        for candidate, skeleton in list(self._entries.values()):
+            score = len(trigrams & candidate) / len(trigrams | candidate)
+            if score >= best_score:
+                best_score, best_skeleton = score, skeleton
+        return best_skeleton
+    
+    def clear(self):
+        self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "size": len(self._entries)}
+
+# Create singleton instances
+ai_result_cache = AIResultCache()
+workflow_skeleton_cache = WorkflowSkeletonCache()
@@ -5,6 +5,7 @@ import logging
 from google import genai
 from ..core.config import settings
 from ..models.workflow import WorkflowModel, WorkflowTrigger, WorkflowTriggerType, WorkflowAction, WorkflowCondition, WorkflowEdge, WorkflowStatus
+from .ai_cache import workflow_skeleton_cache
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +17,12 @@ async def generate_workflow_from_description(description: str, user_id: str) ->
     Generate a workflow based on a natural language description using AI
     """
     try:
+        # Reuse the skeleton of a previously generated workflow for the same intent
+        if settings.WORKFLOW_CACHE_ENABLED:
+            cached_json = workflow_skeleton_cache.get(description)
+            if cached_json is not None:
+                return _workflow_from_json(cached_json, description, user_id)
+        
         # For the hackathon, we'll use a simple prompt to generate a workflow
         # In a production system, you'd want to use a more sophisticated approach
         
@@ -83,6 +90,8 @@ async def generate_workflow_from_description(description: str, user_id: str) ->
         json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
         if json_match:
             workflow_json = json.loads(json_match.group(0))
+            if settings.WORKFLOW_CACHE_ENABLED:
+                workflow_skeleton_cache.set(description, workflow_json)
         else:
             # Fallback to a simple workflow if we can't parse the AI response
             workflow_json = {
@@ -101,89 +110,7 @@ async def generate_workflow_from_description(description: str, user_id: str) ->
                 "edges": []
             }
         
-        # Generate IDs for nodes
-        action_ids = {}
-        condition_ids = {}
-        
-        # Process actions
-        actions = []
-        for i, action_data in enumerate(workflow_json.get("actions", [])):
-            action_id = str(uuid.uuid4())
-            action_ids[i] = action_id
-            actions.append(
-                WorkflowAction(
-                    id=action_id,
-                    name=action_data.get("name", f"Action {i+1}"),
-                    type=action_data.get("type", "http_request"),
-                    config=action_data.get("config", {}),
-                    position=action_data.get("position", {"x": 100 * (i+1), "y": 100})
-                )
-            )
-        
-        # Process conditions
-        conditions = []
-        for i, condition_data in enumerate(workflow_json.get("conditions", [])):
-            condition_id = str(uuid.uuid4())
-            condition_ids[i] = condition_id
-            conditions.append(
-                WorkflowCondition(
-                    id=condition_id,
-                    name=condition_data.get("name", f"Condition {i+1}"),
-                    condition=condition_data.get("condition", "true"),
-                    true_path=condition_data.get("true_path", ""),
-                    false_path=condition_data.get("false_path", ""),
-                    position=condition_data.get("position", {"x": 100 * (i+1), "y": 200})
-                )
-            )
-        
-        # Process trigger
-        trigger_data = workflow_json.get("trigger", {"type": "manual", "config": {}})
-        trigger = WorkflowTrigger(
-            type=trigger_data.get("type", "manual"),
-            config=trigger_data.get("config", {})
-        )
-        
-        # Process edges
-        edges = []
-        for edge_data in workflow_json.get("edges", []):
-            # For hackathon simplicity, we'll just connect all actions in sequence
-            edge_id = str(uuid.uuid4())
-            edges.append(
-                WorkflowEdge(
-                    id=edge_id,
-                    source=edge_data.get("source", ""),
-                    target=edge_data.get("target", "")
-                )
-            )
-        
-        # If no edges and multiple actions, create sequential edges
-        if not edges and len(actions) > 1:
-            for i in range(len(actions) - 1):
-                edge_id = str(uuid.uuid4())
-                edges.append(
-                    WorkflowEdge(
-                        id=edge_id,
-                        source=actions[i].id,
-                        target=actions[i+1].id
-                    )
-                )
-        
-        # Create workflow model
-        workflow = WorkflowModel(
-            id=str(uuid.uuid4()),
-            name=workflow_json.get("name", "Generated Workflow"),
-            description=workflow_json.get("description", description),
-            status=WorkflowStatus.DRAFT,
-            trigger=trigger,
-            actions=actions,
-            conditions=conditions,
-            edges=edges,
-            created_by=user_id,
-            created_at=datetime.now(),
-            updated_at=datetime.now()
-        )
-        
-        return workflow
+        return _workflow_from_json(workflow_json, description, user_id)
         
     except Exception as e:
         logger.error(f"Error generating workflow: {str(e)}")
@@ -208,4 +135,109 @@ async def generate_workflow_from_description(description: str, user_id: str) ->
             created_by=user_id,
             created_at=datetime.now(),
             updated_at=datetime.now()
-        )
\ No newline at end of file
+        )
+
+def _add_node_refs(node_refs: Dict[str, str], node_data: Dict[str, Any], node_id: str):
+    for key in ("id", "name"):
+        if node_data.get(key) is not None:
+            node_refs.setdefault(str(node_data[key]), node_id)
+
+def _workflow_from_json(workflow_json: Dict[str, Any], description: str, user_id: str) -> WorkflowModel:
+    """
+    Build a workflow with fresh node IDs from generated or cached workflow JSON
+    """
+    # Generate IDs for nodes
+    action_ids = {}
+    condition_ids = {}
+    # The model refers to nodes by the id or name it gave them, map those to the new IDs
+    node_refs = {}
+    
+    # Process actions
+    actions = []
+    for i, action_data in enumerate(workflow_json.get("actions", [])):
+        action_id = str(uuid.uuid4())
+        action_ids[i] = action_id
+        _add_node_refs(node_refs, action_data, action_id)
+        actions.append(
+            WorkflowAction(
+                id=action_id,
+                name=action_data.get("name", f"Action {i+1}"),
+                type=action_data.get("type", "http_request"),
+                config=action_data.get("config", {}),
+                position=action_data.get("position", {"x": 100 * (i+1), "y": 100})
+            )
+        )
+    
+    # Process conditions
+    conditions = []
+    for i, condition_data in enumerate(workflow_json.get("conditions", [])):
+        condition_id = str(uuid.uuid4())
+        condition_ids[i] = condition_id
+        _add_node_refs(node_refs, condition_data, condition_id)
+    for i, condition_data in enumerate(workflow_json.get("conditions", [])):
+        true_path = condition_data.get("true_path", "")
+        false_path = condition_data.get("false_path", "")
+        conditions.append(
+            WorkflowCondition(
+                id=condition_ids[i],
+                name=condition_data.get("name", f"Condition {i+1}"),
+                condition=condition_data.get("condition", "true"),
+                true_path=node_refs.get(str(true_path), true_path),
+                false_path=node_refs.get(str(false_path), false_path),
+                position=condition_data.get("position", {"x": 100 * (i+1), "y": 200})
+            )
+        )
+    
+    # Process trigger
+    trigger_data = workflow_json.get("trigger", {"type": "manual", "config": {}})
+    trigger = WorkflowTrigger(
+        type=trigger_data.get("type", "manual"),
+        config=trigger_data.get("config", {})
+    )
+    
+    # Process edges, dropping those whose ends cannot be resolved
+    edges = []
+    for edge_data in workflow_json.get("edges", []):
+        source = node_refs.get(str(edge_data.get("source", "")))
+        target = node_refs.get(str(edge_data.get("target", "")))
+        if source is None or target is None:
+            continue
+        edge_id = str(uuid.uuid4())
+        edges.append(
+            WorkflowEdge(
+                id=edge_id,
+                source=source,
+                target=target
+            )
+        )
+    
+    # If no edge connects two actions, run the actions in sequence. Actions
+    # without edges would otherwise all run in parallel on the input data.
+    action_id_set = set(action_ids.values())
+    if len(actions) > 1 and not any(edge.source in action_id_set and edge.target in action_id_set for edge in edges):
+        for i in range(len(actions) - 1):
+            edge_id = str(uuid.uuid4())
+            edges.append(
+                WorkflowEdge(
+                    id=edge_id,
+                    source=actions[i].id,
+                    target=actions[i+1].id
+                )
+            )
+    
+    # Create workflow model
+    workflow = WorkflowModel(
+        id=str(uuid.uuid4()),
+        name=workflow_json.get("name", "Generated Workflow"),
+        description=workflow_json.get("description", description),
+        status=WorkflowStatus.DRAFT,
+        trigger=trigger,
+        actions=actions,
+        conditions=conditions,
+        edges=edges,
+        created_by=user_id,
+        created_at=datetime.now(),
+        updated_at=datetime.now()
+    )
+    
+    return workflow
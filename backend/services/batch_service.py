@@ -0,0 +1,197 @@
+from typing import Dict, Any, List, Optional, AsyncIterator, Tuple
+from collections import deque
+from datetime import datetime
+import asyncio
+import logging
+from ..core.config import settings
+from ..models.workflow import WorkflowModel, WorkflowBatch
+from ..database.mongodb import get_workflow, create_batch, get_batch, update_batch, count_batch_executions, touch_batch_executions
+from ..utils.json_stream import JSONItemParser
+from .workflow_service import WorkflowGraph, create_batch_executions, run_execution
+
+logger = logging.getLogger(__name__)
+
+async def read_batch_inputs(chunks: AsyncIterator[bytes]) -> List[Dict[str, Any]]:
+    """
+    Parse batch inputs from a JSON array or NDJSON body as it arrives
+
+    Raises ValueError on malformed input, an input that is not an object, or
+    more than BATCH_MAX_ITEMS inputs.
+    """
+    parser = JSONItemParser(settings.BATCH_MAX_ITEM_BYTES)
+    inputs: List[Dict[str, Any]] = []
+
+    def add(items):
+        for item, _ in items:
+            if not isinstance(item, dict):
+                raise ValueError(f"Input {len(inputs) + 1} is not a JSON object")
+            if len(inputs) >= settings.BATCH_MAX_ITEMS:
+                raise ValueError(f"A batch can have at most {settings.BATCH_MAX_ITEMS} inputs")
+            inputs.append(item)
+
+    async for chunk in chunks:
+        add(parser.feed(chunk))
+    add(parser.close())
+    if not inputs:
+        raise ValueError("A batch needs at least one input")
+    return inputs
+
+class BatchRun:
+    """
+    Executions of one batch that have not started yet
+    """
+    __slots__ = ("batch", "workflow", "graph", "pending", "task")
+
+    def __init__(self, batch: WorkflowBatch, workflow: WorkflowModel, graph: WorkflowGraph, pending: deque):
+        self.batch = batch
+        self.workflow = workflow
+        self.graph = graph
+        self.pending = pending
+        self.task: Optional[asyncio.Task] = None
+
+class BatchRunner:
+    """
+    Runs one workflow over many inputs
+
+    The workflow is loaded and its graph built once per batch, and the
+    executions are written with a few bulk inserts. Each batch runs on its own
+    pool of at most BATCH_CONCURRENCY workers, so a large batch cannot starve
+    the shared execution queue. Progress is counted from the executions
+    themselves, so it stays correct when executions of a batch are recovered
+    by another process.
+    """
+
+    def __init__(self):
+        self._runs: Dict[str, BatchRun] = {}
+        # Batches whose executions are still being written
+        self._submitting = 0
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._accepting = False
+        self._stats = {"submitted": 0, "executions": 0}
+
+    async def start(self):
+        self._accepting = True
+        self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+
+    async def submit(
+        self,
+        workflow_id: str,
+        user_id: str,
+        inputs: List[Dict[str, Any]],
+        concurrency: Optional[int] = None
+    ) -> WorkflowBatch:
+        """
+        Persist a batch and its pending executions and start running them
+
+        Raises ValueError if the workflow does not exist or cannot be run and
+        RuntimeError if the runner is stopped or BATCH_MAX_RUNNING batches are
+        already running.
+        """
+        if not self._accepting:
+            raise RuntimeError("Batch runner is not accepting new batches")
+        if len(self._runs) + self._submitting >= settings.BATCH_MAX_RUNNING:
+            raise RuntimeError(f"{settings.BATCH_MAX_RUNNING} batches are already running")
+
+        self._submitting += 1
+        try:
+            batch, run = await self._create(workflow_id, user_id, inputs)
+        finally:
+            self._submitting -= 1
+
+        self._runs[batch.id] = run
+        concurrency = max(1, min(concurrency or settings.BATCH_CONCURRENCY, settings.BATCH_CONCURRENCY))
+        run.task = asyncio.create_task(self._run(run, concurrency))
+        self._stats["submitted"] += 1
+        self._stats["executions"] += len(run.pending)
+        return batch
+
+    async def _create(self, workflow_id: str, user_id: str, inputs: List[Dict[str, Any]]) -> Tuple[WorkflowBatch, BatchRun]:
+        workflow_dict = await get_workflow(workflow_id)
+        if not workflow_dict:
+            raise ValueError(f"Workflow with ID {workflow_id} not found")
+        workflow = WorkflowModel(**workflow_dict)
+        graph = WorkflowGraph(workflow)
+
+        batch = WorkflowBatch(workflow_id=workflow_id, created_by=user_id, total=len(inputs))
+        # The batch is only recorded once all of its executions exist, so its total is never
+        # larger than what was written. Executions of a failed submit are run by recovery.
+        executions = await create_batch_executions(workflow_id, batch.id, inputs)
+        await create_batch(batch.dict(exclude={"counts"}))
+
+        return batch, BatchRun(batch, workflow, graph, deque(executions))
+
+    async def get_progress(self, batch_id: str) -> Optional[WorkflowBatch]:
+        """
+        Get a batch with the number of its executions in each status
+        """
+        batch_dict = await get_batch(batch_id)
+        if not batch_dict:
+            return None
+        batch = WorkflowBatch(**batch_dict)
+        batch.counts = await count_batch_executions(batch_id)
+        # The process that ran the batch may have died before marking it completed
+        unfinished = batch.counts.get("pending", 0) + batch.counts.get("running", 0)
+        if batch.status == "running" and not unfinished and sum(batch.counts.values()) >= batch.total:
+            batch.status = "completed"
+        return batch
+
+    async def _run(self, run: BatchRun, concurrency: int):
+        async def worker():
+            while run.pending and self._accepting:
+                execution = run.pending.popleft()
+                try:
+                    await run_execution(run.workflow, execution, graph=run.graph)
+                except Exception as e:
+                    logger.error(f"Failed to run execution {execution.id} of batch {run.batch.id}: {str(e)}")
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(min(concurrency, len(run.pending)))))
+            if not run.pending:
+                await update_batch(run.batch.id, {"status": "completed", "completed_at": datetime.now()})
+                logger.info(f"Batch {run.batch.id} of workflow {run.workflow.id} completed")
+        except Exception as e:
+            logger.error(f"Error running batch {run.batch.id}: {str(e)}")
+        finally:
+            self._runs.pop(run.batch.id, None)
+
+    async def _heartbeat_loop(self):
+        while True:
+            await asyncio.sleep(settings.EXECUTION_HEARTBEAT_INTERVAL)
+            try:
+                await touch_batch_executions(list(self._runs))
+            except Exception as e:
+                logger.error(f"Error refreshing batch execution heartbeats: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "running_batches": len(self._runs),
+            "pending_executions": sum(len(run.pending) for run in self._runs.values())
+        }
+
+    async def stop(self, timeout: Optional[float] = None):
+        """
+        Stop starting executions and wait for running ones to finish
+
+        Executions that never started stay pending and are picked up by the
+        execution queue's recovery once their heartbeat expires.
+        """
+        self._accepting = False
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            await asyncio.gather(self._heartbeat_task, return_exceptions=True)
+            self._heartbeat_task = None
+
+        tasks = [run.task for run in self._runs.values() if run.task is not None]
+        if not tasks:
+            return
+        timeout = settings.EXECUTION_SHUTDOWN_TIMEOUT if timeout is None else timeout
+        _, unfinished = await asyncio.wait(tasks, timeout=timeout)
+        if unfinished:
+            logger.warning(f"{len(unfinished)} batches did not finish within {timeout}s")
+            for task in unfinished:
+                task.cancel()
+            await asyncio.gather(*unfinished, return_exceptions=True)
+
+# Create singleton instance
+batch_runner = BatchRunner()
@@ -0,0 +1,93 @@
+from typing import Dict, Any, List, Optional
+from datetime import datetime, timedelta
+import asyncio
+import logging
+from ..core.config import settings
+from ..database.mongodb import open_blob_upload, read_blob, retain_blobs, delete_blobs_before
+
+logger = logging.getLogger(__name__)
+
+# How often expired blobs are deleted
+PURGE_INTERVAL = 3600
+
+class BlobWriter:
+    """
+    Streams one payload into the blob store chunk by chunk
+    """
+
+    def __init__(self, store: "BlobStore", filename: str, content_type: Optional[str]):
+        self._store = store
+        self._upload = open_blob_upload(filename, {"content_type": content_type})
+        self.content_type = content_type
+        self.size = 0
+
+    async def write(self, data: bytes):
+        await self._upload.write(data)
+        self.size += len(data)
+
+    async def close(self) -> Dict[str, Any]:
+        """
+        Finish the upload and return the reference stored in the execution context
+        """
+        await self._upload.close()
+        self._store._stats["written"] += 1
+        self._store._stats["bytes_written"] += self.size
+        return {"blob_id": str(self._upload._id), "size": self.size, "content_type": self.content_type}
+
+    async def abort(self):
+        try:
+            await self._upload.abort()
+        except Exception as e:
+            logger.error(f"Error aborting blob upload: {str(e)}")
+
+class BlobStore:
+    """
+    GridFS store for payloads too large to keep in an execution context
+
+    Actions keep a small reference instead of the payload. Blobs are deleted
+    BLOB_TTL_DAYS after they were written unless they were retained because
+    stored data such as an execution's output_data refers to them.
+    """
+
+    def __init__(self):
+        self._purge_task: Optional[asyncio.Task] = None
+        self._stats = {"written": 0, "bytes_written": 0, "purged": 0}
+
+    async def start(self):
+        self._purge_task = asyncio.create_task(self._purge_loop())
+
+    async def stop(self):
+        if self._purge_task is not None:
+            self._purge_task.cancel()
+            await asyncio.gather(self._purge_task, return_exceptions=True)
+            self._purge_task = None
+
+    def create(self, filename: str, content_type: Optional[str] = None) -> BlobWriter:
+        return BlobWriter(self, filename, content_type)
+
+    async def read(self, blob_ref: Dict[str, Any]) -> bytes:
+        return await read_blob(blob_ref["blob_id"])
+
+    async def retain(self, blob_refs: List[Dict[str, Any]]):
+        await retain_blobs([blob_ref["blob_id"] for blob_ref in blob_refs])
+
+    async def purge_expired(self) -> int:
+        deleted = await delete_blobs_before(datetime.utcnow() - timedelta(days=settings.BLOB_TTL_DAYS))
+        self._stats["purged"] += deleted
+        return deleted
+
+    async def _purge_loop(self):
+        while True:
+            try:
+                deleted = await self.purge_expired()
+                if deleted:
+                    logger.info(f"Deleted {deleted} expired blobs")
+            except Exception as e:
+                logger.error(f"Error deleting expired blobs: {str(e)}")
+            await asyncio.sleep(PURGE_INTERVAL)
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self._stats)
+
+# Create singleton instance
+blob_store = BlobStore()
@@ -0,0 +1,146 @@
+from typing import Dict, Any, List, Optional, Tuple
+from collections import ChainMap
+import json
+import logging
+from ..core.config import settings
+from .blob_store import blob_store
+
+logger = logging.getLogger(__name__)
+
+# Key of a persisted value that was moved to the blob store
+BLOB_REF_KEY = "$blob"
+
+def approx_size(value: Any, limit: int) -> int:
+    """
+    Rough serialized size of a value in bytes, counting stops once it passes limit
+    """
+    stack = [value]
+    size = 0
+    while stack and size <= limit:
+        item = stack.pop()
+        if isinstance(item, (str, bytes)):
+            size += len(item) + 2
+        elif isinstance(item, dict):
+            size += 2
+            for key, child in item.items():
+                size += len(str(key)) + 4
+                stack.append(child)
+        elif isinstance(item, (list, tuple)):
+            size += 2
+            stack.extend(item)
+        else:
+            size += 8
+    return size
+
+def is_blob_ref(value: Any) -> bool:
+    return isinstance(value, dict) and len(value) == 1 and BLOB_REF_KEY in value
+
+class ExecutionContext:
+    """
+    Input data and per-action results of one execution
+
+    Results are never merged into one big dict. Each action reads a ChainMap
+    over its own ancestors' results and the input data, with an empty dict in
+    front as its copy-on-write overlay, so starting an action copies nothing
+    and parallel branches cannot see each other's writes.
+
+    Every result is measured once when it is added. Top-level values larger
+    than CONTEXT_SPILL_THRESHOLD_BYTES are serialized once to the blob store,
+    and checkpoints and output_data refer to them as {"$blob": ref} instead of
+    embedding them. Results that no pending action and no declared output
+    needs are released, and the peak of the live size is reported per execution.
+    """
+
+    def __init__(self, input_data: Dict[str, Any], spill_threshold: Optional[int] = None):
+        self.input_data = input_data
+        self.spill_threshold = spill_threshold or settings.CONTEXT_SPILL_THRESHOLD_BYTES
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self._persisted: Dict[str, Dict[str, Any]] = {}
+        self._sizes: Dict[str, int] = {}
+        self.size = approx_size(input_data, float("inf"))
+        self.peak_size = self.size
+
+    def view(self, ancestors: List[str]) -> ChainMap:
+        """
+        Read view for an action, later ancestors in topological order take precedence
+        """
+        return ChainMap({}, *[self.results[ancestor_id] for ancestor_id in reversed(ancestors)], self.input_data)
+
+    async def add(self, action_id: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Record an action's result and return the form that is persisted for it
+        """
+        persisted = {}
+        sizes = {}
+        for key, value in result.items():
+            persisted[key], sizes[key] = await self._persist(key, value)
+        self._record(action_id, result, persisted, sizes)
+        return persisted
+
+    async def restore(self, action_id: str, persisted: Dict[str, Any]):
+        """
+        Record a result loaded from a checkpoint, reading back values moved to the blob store
+        """
+        result = {}
+        sizes = {}
+        for key, value in persisted.items():
+            if is_blob_ref(value):
+                data = await blob_store.read(value[BLOB_REF_KEY])
+                result[key] = json.loads(data)
+                sizes[key] = len(data)
+            else:
+                result[key] = value
+                sizes[key] = approx_size(value, float("inf"))
+        self._record(action_id, result, persisted, sizes)
+
+    def release(self, action_id: str, outputs: Optional[List[str]] = None):
+        """
+        Drop a result no pending action reads, keeping only what output needs
+        """
+        self.results.pop(action_id, None)
+        persisted = self._persisted.get(action_id)
+        if persisted is None:
+            return
+        if outputs is not None:
+            persisted = self._persisted[action_id] = {key: value for key, value in persisted.items() if key in outputs}
+        sizes = self._sizes[action_id]
+        # Values moved to the blob store are no longer held once the result is dropped
+        kept = sum(sizes[key] for key, value in persisted.items() if not is_blob_ref(value))
+        self.size -= sum(sizes.values()) - kept
+        self._sizes[action_id] = {key: sizes[key] for key, value in persisted.items() if not is_blob_ref(value)}
+
+    async def output(self, order: List[str], outputs: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        The data stored as output_data, every context value unless outputs are declared
+
+        Values moved to the blob store stay references, so output_data stays
+        small. Their blobs are retained instead of expiring after BLOB_TTL_DAYS.
+        """
+        persisted = ChainMap(*[self._persisted[action_id] for action_id in reversed(order) if action_id in self._persisted], self.input_data)
+        data = {key: persisted[key] for key in (persisted if outputs is None else outputs) if key in persisted}
+        blob_refs = [value[BLOB_REF_KEY] for value in data.values() if is_blob_ref(value)]
+        if blob_refs:
+            await blob_store.retain(blob_refs)
+        return data
+
+    def _record(self, action_id: str, result: Dict[str, Any], persisted: Dict[str, Any], sizes: Dict[str, int]):
+        self.results[action_id] = result
+        self._persisted[action_id] = persisted
+        self._sizes[action_id] = sizes
+        self.size += sum(sizes.values())
+        self.peak_size = max(self.peak_size, self.size)
+
+    async def _persist(self, key: str, value: Any) -> Tuple[Any, int]:
+        size = approx_size(value, self.spill_threshold)
+        if size <= self.spill_threshold:
+            return value, size
+
+        data = json.dumps(value, default=str).encode("utf-8")
+        writer = blob_store.create(f"context/{key}", "application/json")
+        try:
+            await writer.write(data)
+            return {BLOB_REF_KEY: await writer.close()}, len(data)
+        except Exception as e:
+            await writer.abort()
+            logger.error(f"Error moving context value {key} to the blob store, keeping it inline: {str(e)}")
+            return value, len(data)
@@ -0,0 +1,261 @@
+from typing import Dict, Any, List, Optional, Set, Tuple, NamedTuple, Callable, Awaitable
+from datetime import datetime
+import asyncio
+import logging
+import uuid
+from ..core.config import settings
+from ..models.workflow import WorkflowModel, WorkflowExecution, WorkflowStatus, WorkflowTriggerType
+from ..database.mongodb import get_workflows_by_trigger
+
+logger = logging.getLogger(__name__)
+
+# Events under this prefix are published by the backend itself
+RESERVED_EVENT_PREFIX = "execution."
+
+def event_names_for(trigger_config: Dict[str, Any]) -> List[str]:
+    """
+    The event names a workflow subscribes to, from trigger config event (a name or a list of names)
+    """
+    names = trigger_config.get("event")
+    if isinstance(names, str):
+        names = [names]
+    return [name for name in names or [] if isinstance(name, str) and name]
+
+def validate_event_config(config: Dict[str, Any]):
+    """
+    Raise ValueError if an event trigger config does not subscribe to anything
+    """
+    if not event_names_for(config):
+        raise ValueError("Event trigger requires an event name or a list of event names")
+    source = config.get("source_workflow_id")
+    if source is not None and not isinstance(source, str):
+        raise ValueError("source_workflow_id must be a workflow ID")
+
+class Event(NamedTuple):
+    id: str
+    name: str
+    owner: str
+    payload: Dict[str, Any]
+    source: Optional[str]
+    depth: int
+    published_at: datetime
+
+class EventBus:
+    """
+    In-process event bus that starts the event-triggered workflows subscribed to each event
+
+    Subscriptions are kept in a precomputed (owner, event name) -> workflow IDs
+    index, so matching an event is a dict lookup regardless of how many
+    workflows exist. Events are only delivered to workflows of the user who
+    published them. Published events wait in a bounded buffer; when it is full
+    publish raises asyncio.QueueFull so callers can back off. Matching
+    workflows are dispatched to the execution queue in batches, and the
+    dispatcher stalls while the execution queue is saturated so the pressure
+    reaches publishers instead of piling up in memory.
+
+    Finished executions are published as execution.completed and
+    execution.failed, with the workflow as source, so workflows can chain.
+    Trigger config:
+    - event: Event name or list of event names
+    - source_workflow_id: Optional, only react to events from this workflow
+    """
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._dispatch_many: Optional[Callable[[List[str], Dict[str, Any]], Awaitable[Any]]] = None
+        self._index: Dict[Tuple[str, str], Set[str]] = {}
+        self._subscriptions: Dict[str, Tuple[str, List[str], Optional[str]]] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._accepting = False
+        self._counters = {"published": 0, "rejected": 0, "dropped": 0, "unmatched": 0, "dispatched": 0}
+
+    async def start(self, dispatch_many: Callable[[List[str], Dict[str, Any]], Awaitable[Any]], max_size: Optional[int] = None):
+        self._dispatch_many = dispatch_many
+        self._queue = asyncio.Queue(maxsize=max_size or settings.EVENT_BUS_QUEUE_MAX_SIZE)
+        await self.warm()
+        self._tasks = [
+            asyncio.create_task(self._dispatch_loop()),
+            asyncio.create_task(self._refresh_loop())
+        ]
+        self._accepting = True
+
+    async def stop(self, timeout: Optional[float] = None):
+        """
+        Stop accepting events and give buffered ones a chance to be dispatched
+        """
+        if self._queue is None:
+            return
+
+        self._accepting = False
+        timeout = settings.EXECUTION_SHUTDOWN_TIMEOUT if timeout is None else timeout
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Event bus did not drain within {timeout}s, {self._queue.qsize()} events abandoned")
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def warm(self):
+        """
+        Rebuild the subscription index from every active event workflow
+        """
+        workflows = await get_workflows_by_trigger(
+            WorkflowTriggerType.EVENT.value,
+            WorkflowStatus.ACTIVE.value,
+            {"_id": 0, "id": 1, "created_by": 1, "trigger": 1}
+        )
+        self._index, self._subscriptions = {}, {}
+        for workflow in workflows:
+            self._subscribe(workflow["id"], workflow.get("created_by") or "", workflow["trigger"].get("config") or {})
+        logger.info(f"Event index loaded with {len(self._subscriptions)} subscribed workflows")
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(settings.TRIGGER_INDEX_REFRESH_INTERVAL)
+            try:
+                await self.warm()
+            except Exception as e:
+                logger.error(f"Error refreshing event index: {str(e)}")
+
+    def register(self, workflow_id: str, workflow: WorkflowModel):
+        """
+        Add, change or remove a workflow's subscriptions after it was saved
+        """
+        self.unregister(workflow_id)
+        if workflow.status == WorkflowStatus.ACTIVE and workflow.trigger.type == WorkflowTriggerType.EVENT:
+            self._subscribe(workflow_id, workflow.created_by or "", workflow.trigger.config)
+
+    def unregister(self, workflow_id: str):
+        subscription = self._subscriptions.pop(workflow_id, None)
+        if subscription is None:
+            return
+        owner, names, _ = subscription
+        for name in names:
+            subscribers = self._index.get((owner, name))
+            if subscribers is not None:
+                subscribers.discard(workflow_id)
+                if not subscribers:
+                    del self._index[(owner, name)]
+
+    def _subscribe(self, workflow_id: str, owner: str, config: Dict[str, Any]):
+        names = event_names_for(config)
+        self._subscriptions[workflow_id] = (owner, names, config.get("source_workflow_id"))
+        for name in names:
+            self._index.setdefault((owner, name), set()).add(workflow_id)
+
+    def match(self, owner: str, name: str, source: Optional[str] = None) -> List[str]:
+        """
+        IDs of the workflows an event is delivered to
+        """
+        subscribers = self._index.get((owner, name))
+        if not subscribers:
+            return []
+        return [
+            workflow_id for workflow_id in subscribers
+            if self._subscriptions[workflow_id][2] in (None, source)
+        ]
+
+    def publish(self, owner: str, name: str, payload: Dict[str, Any], source: Optional[str] = None, depth: int = 0) -> str:
+        """
+        Buffer an event for dispatch and return its ID
+
+        Raises asyncio.QueueFull if the buffer is at capacity and RuntimeError if
+        the bus is not running.
+        """
+        if not self._accepting:
+            raise RuntimeError("Event bus is not accepting events")
+
+        event = Event(str(uuid.uuid4()), name, owner, payload, source, depth, datetime.now())
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self._counters["rejected"] += 1
+            raise
+        self._counters["published"] += 1
+        return event.id
+
+    def publish_execution_event(self, workflow: WorkflowModel, execution: WorkflowExecution):
+        """
+        Publish the outcome of a finished execution, never raising
+        """
+        trigger_event = execution.input_data.get("event")
+        depth = trigger_event.get("depth", 0) if isinstance(trigger_event, dict) else 0
+        try:
+            self.publish(
+                workflow.created_by or "",
+                f"{RESERVED_EVENT_PREFIX}{execution.status}",
+                {
+                    "workflow_id": workflow.id,
+                    "execution_id": execution.id,
+                    "status": execution.status,
+                    "output_data": execution.output_data
+                },
+                source=workflow.id,
+                depth=depth + 1
+            )
+        except (asyncio.QueueFull, RuntimeError):
+            self._counters["dropped"] += 1
+            logger.warning(f"Dropped completion event of execution {execution.id}")
+
+    async def _dispatch_loop(self):
+        while True:
+            event = await self._queue.get()
+            try:
+                await self._deliver(event)
+            except Exception as e:
+                logger.error(f"Error dispatching event {event.name} ({event.id}): {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(self, event: Event):
+        workflow_ids = self.match(event.owner, event.name, event.source)
+        if not workflow_ids:
+            self._counters["unmatched"] += 1
+            return
+        if event.depth > settings.EVENT_MAX_CHAIN_DEPTH:
+            # Stop workflows that trigger each other from looping forever
+            self._counters["dropped"] += 1
+            logger.warning(f"Event {event.name} ({event.id}) exceeded the maximum chain depth")
+            return
+
+        input_data = {
+            **event.payload,
+            "event": {
+                "id": event.id,
+                "name": event.name,
+                "source": event.source,
+                "depth": event.depth,
+                "published_at": event.published_at.isoformat()
+            }
+        }
+        batch_size = min(settings.EVENT_DISPATCH_BATCH_SIZE, settings.EXECUTION_QUEUE_MAX_SIZE)
+        for start in range(0, len(workflow_ids), batch_size):
+            batch = workflow_ids[start:start + batch_size]
+            await self._dispatch_batch(batch, input_data)
+            self._counters["dispatched"] += len(batch)
+
+    async def _dispatch_batch(self, workflow_ids: List[str], input_data: Dict[str, Any]):
+        delay = 0.05
+        while True:
+            try:
+                await self._dispatch_many(workflow_ids, input_data)
+                return
+            except asyncio.QueueFull:
+                # Raised before any execution was written, so retrying cannot duplicate runs.
+                # Wait for the workers to catch up, leaving later events buffered
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 1.0)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._counters,
+            "buffered": self._queue.qsize() if self._queue else 0,
+            "subscribed_workflows": len(self._subscriptions),
+            "index_keys": len(self._index)
+        }
+
+# Create singleton instance
+event_bus = EventBus()
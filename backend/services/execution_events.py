@@ -0,0 +1,61 @@
+from typing import Dict, Any, Set
+from datetime import datetime
+import asyncio
+import logging
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+class ExecutionEventHub:
+    """
+    In-process pub/sub of live execution progress
+
+    Each subscriber gets its own bounded queue. A subscriber that falls behind
+    loses its oldest events rather than slowing down the execution or growing
+    without bound. Terminal status events are always delivered, since they are
+    the newest event. Publishing to an execution nobody watches is a single
+    dict lookup.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._stats = {"published": 0, "delivered": 0, "dropped": 0}
+
+    def subscribe(self, execution_id: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=settings.EXECUTION_EVENTS_QUEUE_SIZE)
+        self._subscribers.setdefault(execution_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, execution_id: str, queue: asyncio.Queue):
+        subscribers = self._subscribers.get(execution_id)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            del self._subscribers[execution_id]
+
+    def publish(self, execution_id: str, event_type: str, **data):
+        subscribers = self._subscribers.get(execution_id)
+        if not subscribers:
+            return
+
+        event = {"type": event_type, "execution_id": execution_id, "timestamp": datetime.now().isoformat(), **data}
+        self._stats["published"] += 1
+        for queue in subscribers:
+            if queue.full():
+                queue.get_nowait()
+                self._stats["dropped"] += 1
+            queue.put_nowait(event)
+            self._stats["delivered"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "watched_executions": len(self._subscribers),
+            "subscribers": sum(len(subscribers) for subscribers in self._subscribers.values())
+        }
+
+# Create singleton instance
+execution_events = ExecutionEventHub()
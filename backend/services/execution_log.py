@@ -0,0 +1,73 @@
+from typing import Dict, Any, List, Optional, Set
+from datetime import datetime
+import asyncio
+import logging
+from ..core.config import settings
+from ..models.workflow import WorkflowExecution
+from ..database.mongodb import append_execution_logs
+
+logger = logging.getLogger(__name__)
+
+class ExecutionLogWriter:
+    """
+    Write-behind buffer that appends execution log entries to the database
+    
+    Entries are kept on the in-memory execution and inserted into the
+    execution_logs collection in batches, either once batch_size entries are
+    pending or flush_interval_ms after the first pending entry, so progress is
+    visible while a run is in flight. Each entry gets a per-execution seq.
+    """
+    
+    def __init__(self, execution: WorkflowExecution, batch_size: Optional[int] = None, flush_interval_ms: Optional[int] = None, next_seq: Optional[int] = None):
+        self.execution = execution
+        # A resumed execution continues after the entries already in the database
+        self.next_seq = len(execution.logs) if next_seq is None else next_seq
+        self.batch_size = batch_size or settings.EXECUTION_LOG_BATCH_SIZE
+        self.flush_interval = (flush_interval_ms or settings.EXECUTION_LOG_FLUSH_INTERVAL_MS) / 1000
+        self._buffer: List[Dict[str, Any]] = []
+        self._lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+    
+    def add(self, message: str, **fields):
+        entry = {"seq": self.next_seq, "timestamp": datetime.now().isoformat(), "message": message, **fields}
+        self.next_seq += 1
+        self.execution.logs.append(entry)
+        self._buffer.append(entry)
+        
+        if len(self._buffer) >= self.batch_size:
+            task = asyncio.create_task(self.flush())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+    
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        self._timer = None
+        await self.flush()
+    
+    async def flush(self):
+        async with self._lock:
+            if not self._buffer:
+                return
+            batch, self._buffer = self._buffer, []
+            created_at = datetime.utcnow()
+            try:
+                await append_execution_logs([
+                    {**entry, "execution_id": self.execution.id, "created_at": created_at}
+                    for entry in batch
+                ])
+            except Exception as e:
+                logger.error(f"Error writing logs for execution {self.execution.id}: {str(e)}")
+    
+    async def close(self):
+        """
+        Flush every pending entry and stop the background timer
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self.flush()
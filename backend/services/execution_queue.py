@@ -0,0 +1,194 @@
+from typing import Dict, Any, List, Optional, Set
+import asyncio
+import logging
+from ..core.config import settings
+from ..models.workflow import WorkflowModel, WorkflowExecution
+from ..database.mongodb import touch_executions, find_orphaned_executions, claim_orphaned_execution
+from .workflow_service import create_pending_execution, create_pending_executions, run_execution, recover_orphaned_execution, fail_legacy_executions
+
+logger = logging.getLogger(__name__)
+
+class ExecutionQueue:
+    """
+    In-process job queue that runs workflow executions on a pool of background workers
+    
+    Queued and running executions get a heartbeat in the database. Executions
+    whose heartbeat stopped, because the process that owned them died, are
+    claimed by a recovery pass at startup and then periodically, and resumed
+    from their last checkpoint. Executions left by a version without
+    heartbeats have no checkpoints and are failed instead.
+    """
+    
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._background: List[asyncio.Task] = []
+        self._inflight: Set[str] = set()
+        # Slots held for jobs whose execution document is still being written
+        self._reserved = 0
+        self._accepting = False
+        self._recovered = 0
+    
+    async def start(self, num_workers: Optional[int] = None, max_size: Optional[int] = None):
+        """
+        Create the queue and spawn the worker tasks
+        """
+        num_workers = num_workers or settings.EXECUTION_WORKERS
+        self._queue = asyncio.Queue(maxsize=max_size or settings.EXECUTION_QUEUE_MAX_SIZE)
+        self._workers = [
+            asyncio.create_task(self._worker(index), name=f"execution-worker-{index}")
+            for index in range(num_workers)
+        ]
+        self._accepting = True
+        self._background = [
+            asyncio.create_task(self._heartbeat_loop()),
+            asyncio.create_task(self._recovery_loop())
+        ]
+        logger.info(f"Execution queue started with {num_workers} workers")
+    
+    async def enqueue(self, workflow_id: str, input_data: Dict[str, Any]) -> WorkflowExecution:
+        """
+        Persist a pending execution and schedule it on the worker pool
+        
+        Raises ValueError if the workflow does not exist, asyncio.QueueFull if the
+        queue is at capacity and RuntimeError if the queue is not running.
+        """
+        self._reserve(1)
+        try:
+            workflow, execution = await create_pending_execution(workflow_id, input_data)
+            self._put(workflow, execution, resume=False)
+        finally:
+            self._reserved -= 1
+        return execution
+    
+    async def enqueue_many(self, workflow_ids: List[str], input_data: Dict[str, Any]) -> List[WorkflowExecution]:
+        """
+        Persist pending executions of several workflows in one batch and schedule them
+        
+        The whole batch is rejected with asyncio.QueueFull unless the queue has
+        room for all of it. QueueFull is only ever raised before anything was
+        written, so callers can safely retry it. Workflows that no longer exist
+        are skipped.
+        """
+        self._reserve(len(workflow_ids))
+        try:
+            jobs = await create_pending_executions(workflow_ids, input_data)
+            for workflow, execution in jobs:
+                self._put(workflow, execution, resume=False)
+        finally:
+            self._reserved -= len(workflow_ids)
+        return [execution for _, execution in jobs]
+    
+    def _reserve(self, count: int):
+        """
+        Hold queue slots before an execution document is written
+        
+        Once the document exists the job must be queued, so capacity is claimed
+        up front rather than checked before and used after an await.
+        """
+        if not self._accepting:
+            raise RuntimeError("Execution queue is not accepting new jobs")
+        if self._queue.maxsize - self._queue.qsize() - self._reserved < count:
+            raise asyncio.QueueFull()
+        self._reserved += count
+    
+    def _put(self, workflow: WorkflowModel, execution: WorkflowExecution, resume: bool):
+        self._queue.put_nowait((workflow, execution, resume))
+        self._inflight.add(execution.id)
+    
+    async def recover(self) -> int:
+        """
+        Claim orphaned executions and queue them to resume, returning how many were queued
+        
+        Executions without a heartbeat are failed rather than resumed.
+        """
+        if not self._accepting:
+            return 0
+        await fail_legacy_executions(self._queue.maxsize)
+        
+        capacity = self._queue.maxsize - self._queue.qsize() - self._reserved
+        if capacity <= 0:
+            return 0
+        
+        queued = 0
+        for orphan in await find_orphaned_executions(settings.EXECUTION_ORPHAN_TIMEOUT, capacity):
+            try:
+                self._reserve(1)
+            except (asyncio.QueueFull, RuntimeError):
+                break
+            try:
+                # Another process may claim the same execution first
+                claimed = await claim_orphaned_execution(orphan["id"], orphan.get("heartbeat_at"))
+                if claimed is None:
+                    continue
+                job = await recover_orphaned_execution(claimed)
+                if job is None:
+                    continue
+                workflow, execution = job
+                logger.info(f"Recovering orphaned execution {execution.id} of workflow {workflow.id}")
+                self._put(workflow, execution, resume=True)
+                queued += 1
+            finally:
+                self._reserved -= 1
+        self._recovered += queued
+        return queued
+    
+    async def _recovery_loop(self):
+        while True:
+            try:
+                await self.recover()
+            except Exception as e:
+                logger.error(f"Error recovering orphaned executions: {str(e)}")
+            await asyncio.sleep(settings.EXECUTION_RECOVERY_INTERVAL)
+    
+    async def _heartbeat_loop(self):
+        while True:
+            await asyncio.sleep(settings.EXECUTION_HEARTBEAT_INTERVAL)
+            try:
+                await touch_executions(list(self._inflight))
+            except Exception as e:
+                logger.error(f"Error refreshing execution heartbeats: {str(e)}")
+    
+    def stats(self) -> Dict[str, Any]:
+        return {"size": self.size(), "in_flight": len(self._inflight), "recovered": self._recovered}
+    
+    def size(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+    
+    async def _worker(self, index: int):
+        while True:
+            workflow, execution, resume = await self._queue.get()
+            try:
+                await run_execution(workflow, execution, resume=resume)
+            except Exception as e:
+                logger.error(f"Worker {index} failed to run execution {execution.id}: {str(e)}")
+            finally:
+                self._inflight.discard(execution.id)
+                self._queue.task_done()
+    
+    async def shutdown(self, timeout: Optional[float] = None):
+        """
+        Stop accepting jobs, wait for queued executions to drain and stop the workers
+        """
+        if self._queue is None:
+            return
+        
+        self._accepting = False
+        for task in self._background:
+            task.cancel()
+        await asyncio.gather(*self._background, return_exceptions=True)
+        self._background = []
+        timeout = settings.EXECUTION_SHUTDOWN_TIMEOUT if timeout is None else timeout
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Execution queue did not drain within {timeout}s, {self.size()} jobs abandoned")
+        
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        logger.info("Execution queue stopped")
+
+# Create singleton instance
+execution_queue = ExecutionQueue()
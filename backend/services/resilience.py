@@ -0,0 +1,195 @@
+from typing import Dict, Any, List, Optional, Callable, Awaitable, TypeVar
+import asyncio
+import logging
+import time
+from tenacity import (
+    AsyncRetrying,
+    retry_if_exception,
+    stop_after_attempt,
+    stop_after_delay,
+    wait_exponential_jitter
+)
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Methods that can be sent twice without changing the outcome
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+DEFAULT_RETRY_STATUSES = [429, 502, 503, 504]
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling a host whose circuit breaker is open
+    """
+
+class RetryableError(Exception):
+    """
+    A failed attempt that may succeed when retried
+    """
+
+    def __init__(self, message: str, result: Any = None, safe_to_resend: bool = False):
+        super().__init__(message)
+        # Returned as is once the retries are exhausted
+        self.result = result
+        # The request never reached the server, so even non-idempotent calls can be retried
+        self.safe_to_resend = safe_to_resend
+
+class RetryPolicy:
+    """
+    Retry, deadline and idempotency settings declared in an action config
+
+    Config parameters:
+    - retry: number of attempts, or a dict with attempts, backoff (initial
+      delay in seconds), max_backoff, jitter (seconds) and on_status (HTTP
+      status codes that are retried)
+    - deadline: Optional total time in seconds for all attempts
+    - idempotent: whether the action may be repeated, by default derived from
+      the HTTP method
+    - idempotency_key: Optional key sent as Idempotency-Key, makes the action idempotent
+
+    Without a retry setting an action gets a single attempt.
+    """
+    __slots__ = ("attempts", "backoff", "max_backoff", "jitter", "on_status", "deadline", "idempotent")
+
+    def __init__(self, config: Dict[str, Any]):
+        retry = config.get("retry") or {}
+        if isinstance(retry, bool) or not isinstance(retry, (int, dict)):
+            raise ValueError("retry must be a number of attempts or an object")
+        if isinstance(retry, int):
+            retry = {"attempts": retry}
+
+        self.attempts = int(retry.get("attempts", 1 if not retry else 3))
+        self.backoff = float(retry.get("backoff", 0.5))
+        self.max_backoff = float(retry.get("max_backoff", 10.0))
+        self.jitter = float(retry.get("jitter", self.backoff))
+        self.on_status: List[int] = [int(code) for code in retry.get("on_status", DEFAULT_RETRY_STATUSES)]
+        deadline = config.get("deadline")
+        self.deadline: Optional[float] = float(deadline) if deadline is not None else None
+        idempotent = config.get("idempotent")
+        self.idempotent: Optional[bool] = bool(idempotent) if idempotent is not None else (True if config.get("idempotency_key") else None)
+
+        if not 1 <= self.attempts <= settings.ACTION_RETRY_MAX_ATTEMPTS:
+            raise ValueError(f"retry attempts must be between 1 and {settings.ACTION_RETRY_MAX_ATTEMPTS}")
+        if self.backoff < 0 or self.max_backoff < 0 or self.jitter < 0:
+            raise ValueError("retry backoff and jitter must not be negative")
+        if self.deadline is not None and self.deadline <= 0:
+            raise ValueError("deadline must be positive")
+
+    def is_idempotent(self, method: Optional[str] = None) -> bool:
+        if self.idempotent is not None:
+            return self.idempotent
+        return method is None or method.upper() in IDEMPOTENT_METHODS
+
+    async def call(self, attempt: Callable[[], Awaitable[T]], idempotent: bool = True) -> T:
+        """
+        Run attempt until it succeeds, stops raising RetryableError or the policy is exhausted
+
+        Non-idempotent calls are only retried when the failed attempt never
+        reached the server. Once retries are exhausted the last RetryableError
+        is raised. asyncio.TimeoutError is raised when the deadline passes.
+        """
+        def should_retry(error: BaseException) -> bool:
+            return isinstance(error, RetryableError) and (idempotent or error.safe_to_resend)
+
+        stop = stop_after_attempt(self.attempts)
+        if self.deadline is not None:
+            stop = stop | stop_after_delay(self.deadline)
+        retrying = AsyncRetrying(
+            stop=stop,
+            wait=wait_exponential_jitter(initial=self.backoff, max=self.max_backoff, jitter=self.jitter),
+            retry=retry_if_exception(should_retry),
+            reraise=True
+        )
+
+        async def run() -> T:
+            return await retrying(attempt)
+
+        if self.deadline is None:
+            return await run()
+        return await asyncio.wait_for(run(), timeout=self.deadline)
+
+class CircuitBreaker:
+    """
+    Consecutive failure counter for one host
+
+    After failure_threshold consecutive failures the circuit opens and calls
+    fail fast for reset_timeout seconds. Then a single trial call is let
+    through: success closes the circuit, failure opens it again. A trial that
+    never reports back, for example because it was cancelled, is replaced by a
+    new one after another reset_timeout.
+    """
+    __slots__ = ("failures", "opened_at", "trial_started_at")
+
+    def __init__(self):
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_started_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= settings.CIRCUIT_BREAKER_RESET_TIMEOUT:
+            return "half_open"
+        return "open"
+
+class CircuitBreakerRegistry:
+    """
+    Circuit breakers shared by every execution, keyed by host
+
+    Only hosts with recent failures are tracked, a success forgets the host.
+    """
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._rejected = 0
+
+    def before_call(self, host: str):
+        """
+        Raise CircuitOpenError if calls to host should fail fast
+        """
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            return
+        state = breaker.state
+        now = time.monotonic()
+        trial_running = (
+            breaker.trial_started_at is not None
+            and now - breaker.trial_started_at < settings.CIRCUIT_BREAKER_RESET_TIMEOUT
+        )
+        if state == "open" or (state == "half_open" and trial_running):
+            self._rejected += 1
+            raise CircuitOpenError(f"Circuit breaker for {host} is open, failing fast")
+        if state == "half_open":
+            breaker.trial_started_at = now
+
+    def record_success(self, host: str):
+        self._breakers.pop(host, None)
+
+    def record_failure(self, host: str):
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = CircuitBreaker()
+        breaker.failures += 1
+        if breaker.opened_at is None and breaker.failures >= settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD:
+            logger.warning(f"Circuit breaker for {host} opened after {breaker.failures} consecutive failures")
+            breaker.opened_at = time.monotonic()
+        elif breaker.opened_at is not None and breaker.trial_started_at is not None:
+            # The trial call failed, keep failing fast for another reset_timeout
+            breaker.opened_at = time.monotonic()
+            breaker.trial_started_at = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rejected": self._rejected,
+            "hosts": {
+                host: {"state": breaker.state, "failures": breaker.failures}
+                for host, breaker in self._breakers.items()
+            }
+        }
+
+# Create singleton instance
+circuit_breakers = CircuitBreakerRegistry()
@@ -0,0 +1,255 @@
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Tuple
+from collections import deque
+from datetime import datetime, timedelta
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import uuid
+from ..core.config import settings
+from ..models.workflow import WorkflowModel, WorkflowStatus, WorkflowTriggerType
+from ..database.mongodb import (
+    get_workflows_by_trigger,
+    get_schedule_states,
+    claim_scheduled_run,
+    acquire_lease,
+    release_lease
+)
+from ..utils.schedule import parse_schedule, IntervalSchedule
+
+logger = logging.getLogger(__name__)
+
+LEASE_NAME = "workflow_scheduler"
+
+CATCH_UP_POLICIES = ("skip", "once", "all")
+
+def schedule_jitter(config: Dict[str, Any]) -> float:
+    """
+    Maximum random delay in seconds of a scheduled trigger config, raising ValueError if invalid
+    """
+    jitter = config.get("jitter") or 0
+    if isinstance(jitter, bool) or not isinstance(jitter, (int, float)) or jitter < 0:
+        raise ValueError("jitter must be a non-negative number of seconds")
+    return float(jitter)
+
+def validate_schedule_config(config: Dict[str, Any]):
+    """
+    Raise ValueError if a scheduled trigger config cannot be scheduled
+    """
+    schedule = parse_schedule(config)
+    now = datetime.utcnow()
+    # Also rejects cron expressions that parse but never fire, such as 30 February
+    first = schedule.next_after(now)
+    if isinstance(schedule, IntervalSchedule) and first - now < timedelta(seconds=settings.SCHEDULER_MIN_INTERVAL):
+        raise ValueError(f"interval must be at least {settings.SCHEDULER_MIN_INTERVAL} seconds")
+    schedule_jitter(config)
+    if config.get("catch_up", "skip") not in CATCH_UP_POLICIES:
+        raise ValueError(f"catch_up must be one of {', '.join(CATCH_UP_POLICIES)}")
+    if config.get("input") is not None and not isinstance(config["input"], dict):
+        raise ValueError("input must be an object")
+
+class WorkflowScheduler:
+    """
+    Fires active scheduled workflows from a min-heap of next fire times
+
+    The run loop sleeps until the earliest entry is due instead of scanning
+    every schedule on each tick. Schedule changes bump a per-workflow version
+    so superseded heap entries are dropped lazily. Only the replica holding the
+    Mongo lease dispatches runs, and each run is also claimed in
+    workflow_schedules so a leadership handover cannot fire it twice.
+
+    Trigger config:
+    - cron or interval: see utils.schedule, intervals are at least SCHEDULER_MIN_INTERVAL seconds
+    - jitter: Optional random delay in seconds added to each run
+    - catch_up: skip (default), once or all, for runs missed while no replica was leading
+    - input: Optional input data for each run
+    """
+
+    def __init__(self):
+        self.instance_id = str(uuid.uuid4())
+        self.is_leader = False
+        self._dispatch: Optional[Callable[[str, Dict[str, Any]], Awaitable[Any]]] = None
+        self._schedules: Dict[str, Tuple[Any, Dict[str, Any]]] = {}
+        self._versions: Dict[str, int] = {}
+        self._heap: List[Tuple[datetime, int, str, int, datetime]] = []
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self, dispatch: Callable[[str, Dict[str, Any]], Awaitable[Any]]):
+        self._dispatch = dispatch
+        self.is_leader = await acquire_lease(LEASE_NAME, self.instance_id, settings.SCHEDULER_LEASE_TTL)
+        await self.load()
+        self._tasks = [
+            asyncio.create_task(self._run_loop()),
+            asyncio.create_task(self._lease_loop()),
+            asyncio.create_task(self._refresh_loop())
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self.is_leader:
+            await release_lease(LEASE_NAME, self.instance_id)
+            self.is_leader = False
+
+    async def load(self):
+        """
+        Rebuild every schedule from the database, applying each catch-up policy
+        """
+        workflows = await get_workflows_by_trigger(
+            WorkflowTriggerType.SCHEDULED.value,
+            WorkflowStatus.ACTIVE.value,
+            {"_id": 0, "id": 1, "trigger": 1}
+        )
+        states = await get_schedule_states([workflow["id"] for workflow in workflows])
+        last_runs = {state["workflow_id"]: state.get("last_run_at") for state in states}
+
+        # Keep pending fire times of unchanged schedules that have never run,
+        # otherwise every reload would push their first run further out
+        pending = {
+            workflow_id: (fire_at, self._schedules[workflow_id][1])
+            for _, _, workflow_id, version, fire_at in self._heap
+            if version == self._versions.get(workflow_id) and workflow_id in self._schedules
+        }
+
+        self._schedules = {}
+        self._heap = []
+        for workflow in workflows:
+            workflow_id = workflow["id"]
+            config = workflow["trigger"].get("config") or {}
+            last_run = last_runs.get(workflow_id)
+            if last_run is None and workflow_id in pending and pending[workflow_id][1] == config:
+                self._add(workflow_id, config, None, pending[workflow_id][0])
+            else:
+                self._add(workflow_id, config, last_run)
+        self._wakeup.set()
+        logger.info(f"Scheduler loaded {len(self._schedules)} workflows (leader: {self.is_leader})")
+
+    def register(self, workflow_id: str, workflow: WorkflowModel):
+        """
+        Add, reschedule or remove a workflow after it was saved
+        """
+        self.unregister(workflow_id)
+        if workflow.status == WorkflowStatus.ACTIVE and workflow.trigger.type == WorkflowTriggerType.SCHEDULED:
+            self._add(workflow_id, workflow.trigger.config, None)
+            self._wakeup.set()
+
+    def unregister(self, workflow_id: str):
+        self._versions[workflow_id] = self._versions.get(workflow_id, 0) + 1
+        self._schedules.pop(workflow_id, None)
+
+    def _add(self, workflow_id: str, config: Dict[str, Any], last_run: Optional[datetime], fire_at: Optional[datetime] = None):
+        # Configs saved before they were validated must not stop the other schedules from loading
+        try:
+            schedule = parse_schedule(config)
+            fire_at = fire_at or self._first_fire(schedule, config, last_run)
+            self._versions[workflow_id] = self._versions.get(workflow_id, 0) + 1
+            self._schedules[workflow_id] = (schedule, config)
+            self._push(workflow_id, fire_at)
+        except (ValueError, TypeError) as e:
+            self._schedules.pop(workflow_id, None)
+            logger.error(f"Invalid schedule for workflow {workflow_id}: {str(e)}")
+
+    def _first_fire(self, schedule, config: Dict[str, Any], last_run: Optional[datetime]) -> datetime:
+        now = datetime.utcnow()
+        if last_run is None:
+            return schedule.next_after(now)
+
+        missed = schedule.next_after(last_run)
+        if missed > now:
+            return missed
+
+        policy = config.get("catch_up", "skip")
+        if policy == "once":
+            return now
+        if policy == "all":
+            # Replay at most SCHEDULER_MAX_CATCH_UP of the most recent missed runs
+            recent = deque(maxlen=settings.SCHEDULER_MAX_CATCH_UP)
+            while missed <= now:
+                recent.append(missed)
+                missed = schedule.next_after(missed)
+            return recent[0]
+        return schedule.next_after(now)
+
+    def _push(self, workflow_id: str, fire_at: datetime):
+        jitter = schedule_jitter(self._schedules[workflow_id][1])
+        due = fire_at + timedelta(seconds=random.uniform(0, jitter)) if jitter > 0 else fire_at
+        heapq.heappush(self._heap, (due, next(self._counter), workflow_id, self._versions[workflow_id], fire_at))
+
+    async def _run_loop(self):
+        while True:
+            self._wakeup.clear()
+
+            try:
+                # Drop entries superseded by a reschedule or removal
+                while self._heap and self._heap[0][3] != self._versions.get(self._heap[0][2]):
+                    heapq.heappop(self._heap)
+
+                timeout = None
+                if self._heap:
+                    timeout = (self._heap[0][0] - datetime.utcnow()).total_seconds()
+                    if timeout <= 0:
+                        _, _, workflow_id, version, fire_at = heapq.heappop(self._heap)
+                        await self._fire(workflow_id, version, fire_at)
+                        continue
+            except Exception as e:
+                logger.error(f"Error in scheduler run loop: {str(e)}")
+                continue
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _fire(self, workflow_id: str, version: int, fire_at: datetime):
+        schedule, config = self._schedules[workflow_id]
+
+        if self.is_leader:
+            try:
+                if await claim_scheduled_run(workflow_id, fire_at):
+                    await self._dispatch(workflow_id, {**(config.get("input") or {}), "scheduled_at": fire_at.isoformat()})
+            except Exception as e:
+                logger.error(f"Error dispatching scheduled run of workflow {workflow_id}: {str(e)}")
+
+        # The workflow may have been removed or rescheduled while the run was dispatched
+        if workflow_id not in self._schedules or self._versions.get(workflow_id) != version:
+            return
+
+        next_fire = schedule.next_after(fire_at)
+        now = datetime.utcnow()
+        if next_fire <= now and config.get("catch_up", "skip") != "all":
+            next_fire = schedule.next_after(now)
+        self._push(workflow_id, next_fire)
+
+    async def _lease_loop(self):
+        while True:
+            await asyncio.sleep(settings.SCHEDULER_LEASE_TTL / 3)
+            try:
+                was_leader = self.is_leader
+                self.is_leader = await acquire_lease(LEASE_NAME, self.instance_id, settings.SCHEDULER_LEASE_TTL)
+            except Exception as e:
+                logger.error(f"Error renewing scheduler lease: {str(e)}")
+                self.is_leader = False
+                continue
+            if self.is_leader and not was_leader:
+                # Pick up runs missed while another replica was leading
+                logger.info("Scheduler acquired leadership")
+                await self.load()
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(settings.TRIGGER_INDEX_REFRESH_INTERVAL)
+            try:
+                await self.load()
+            except Exception as e:
+                logger.error(f"Error reloading schedules: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"leader": self.is_leader, "schedules": len(self._schedules), "heap_size": len(self._heap)}
+
+# Create singleton instance
+workflow_scheduler = WorkflowScheduler()
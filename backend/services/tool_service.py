@@ -1,17 +1,250 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import asyncio
+import functools
 import logging
 import httpx
 import json
+import time
 from datetime import datetime
-import re
+from ..core.config import settings
+from .ai_cache import ai_result_cache
+from .resilience import RetryPolicy, RetryableError, circuit_breakers
+from .blob_store import blob_store
+from ..utils.template import compile_template, compile_config
+from ..utils.json_stream import JSONItemParser
 
 logger = logging.getLogger(__name__)
 
+# Circuit breaker key shared by every AI task
+AI_CIRCUIT = "gemini"
+
+@lru_cache(maxsize=settings.JMESPATH_CACHE_SIZE)
+def compile_jmespath(expression: str):
+    """
+    Compile a JMESPath expression, reusing the parsed form across executions
+    """
+    import jmespath
+    return jmespath.compile(expression)
+
 class ToolService:
     """
     Service for executing various tools that can be used in workflows
     """
     
+    def __init__(self):
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        # Requests waiting for or holding each host's semaphore
+        self._host_users: Dict[str, int] = {}
+        self._host_in_flight: Dict[str, int] = {}
+        self._http_stats = {"requests": 0, "in_flight": 0, "waiting": 0, "host_waits": 0, "pool_timeouts": 0}
+        self._genai_client = None
+        self._ai_executor: Optional[ThreadPoolExecutor] = None
+        self._ai_semaphore = asyncio.Semaphore(settings.AI_MAX_CONCURRENCY)
+        self._ai_stats = {"requests": 0, "in_flight": 0, "timeouts": 0, "streamed": 0}
+        self._first_token_ms_total = 0.0
+    
+    async def startup(self):
+        """
+        Create the shared HTTP client used by http_request actions
+        """
+        if self._http_client is None:
+            self._http_client = self._create_http_client()
+    
+    async def shutdown(self):
+        """
+        Close the shared HTTP client and its pooled connections
+        """
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+        if self._genai_client is not None and hasattr(self._genai_client, "aio"):
+            await self._genai_client.aio.aclose()
+        self._genai_client = None
+        if self._ai_executor is not None:
+            self._ai_executor.shutdown(wait=False)
+            self._ai_executor = None
+    
+    def _create_http_client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+        )
+        http2 = settings.HTTP2_ENABLED
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("HTTP2_ENABLED is set but the h2 package is not installed, falling back to HTTP/1.1")
+                http2 = False
+        return httpx.AsyncClient(limits=limits, http2=http2)
+    
+    def _get_http_client(self) -> httpx.AsyncClient:
+        # Lazily create the client when used outside the application lifecycle
+        if self._http_client is None:
+            self._http_client = self._create_http_client()
+        return self._http_client
+    
+    @asynccontextmanager
+    async def _host_slot(self, host: str):
+        """
+        Limit the number of concurrent requests to a single host
+
+        A host's semaphore is dropped once no request waits for or holds it,
+        so hosts called once do not accumulate.
+        """
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._host_semaphores[host] = asyncio.Semaphore(settings.HTTP_MAX_CONNECTIONS_PER_HOST)
+        self._host_users[host] = self._host_users.get(host, 0) + 1
+        try:
+            if semaphore.locked():
+                self._http_stats["host_waits"] += 1
+            
+            self._http_stats["waiting"] += 1
+            try:
+                await semaphore.acquire()
+            finally:
+                self._http_stats["waiting"] -= 1
+            
+            self._http_stats["in_flight"] += 1
+            self._host_in_flight[host] = self._host_in_flight.get(host, 0) + 1
+            try:
+                yield
+            finally:
+                self._http_stats["in_flight"] -= 1
+                self._host_in_flight[host] -= 1
+                if not self._host_in_flight[host]:
+                    del self._host_in_flight[host]
+                semaphore.release()
+        finally:
+            self._host_users[host] -= 1
+            if not self._host_users[host]:
+                del self._host_users[host]
+                del self._host_semaphores[host]
+    
+    def http_pool_stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of HTTP connection pool usage
+        """
+        return {
+            **self._http_stats,
+            "max_connections": settings.HTTP_MAX_CONNECTIONS,
+            "max_connections_per_host": settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+            "saturation": self._http_stats["in_flight"] / settings.HTTP_MAX_CONNECTIONS,
+            "hosts": dict(self._host_in_flight)
+        }
+    
+    def ai_stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of in-flight and timed out AI requests
+        """
+        streamed = self._ai_stats["streamed"]
+        return {
+            **self._ai_stats,
+            "avg_time_to_first_token_ms": self._first_token_ms_total / streamed if streamed else None,
+            "max_concurrency": settings.AI_MAX_CONCURRENCY
+        }
+    
+    def _get_genai_client(self):
+        if self._genai_client is None:
+            from google import genai
+            self._genai_client = genai.Client(api_key=settings.GEMINI_API_KEY)
+        return self._genai_client
+    
+    async def _generate_content(self, prompt: str, timeout: float) -> str:
+        """
+        Run a Gemini completion without blocking the event loop
+        
+        Uses the client's async API when available and otherwise runs the
+        synchronous call on a dedicated thread pool. At most AI_MAX_CONCURRENCY
+        requests run at once per process.
+        """
+        client = self._get_genai_client()
+        self._ai_stats["requests"] += 1
+        async with self._ai_semaphore:
+            self._ai_stats["in_flight"] += 1
+            try:
+                if hasattr(client, "aio"):
+                    call = client.aio.models.generate_content(model=settings.AI_MODEL, contents=prompt)
+                else:
+                    if self._ai_executor is None:
+                        self._ai_executor = ThreadPoolExecutor(max_workers=settings.AI_MAX_CONCURRENCY, thread_name_prefix="ai")
+                    call = asyncio.get_running_loop().run_in_executor(
+                        self._ai_executor,
+                        functools.partial(client.models.generate_content, model=settings.AI_MODEL, contents=prompt)
+                    )
+                response = await asyncio.wait_for(call, timeout=timeout)
+            except asyncio.TimeoutError:
+                self._ai_stats["timeouts"] += 1
+                raise TimeoutError(f"AI request timed out after {timeout}s")
+            finally:
+                self._ai_stats["in_flight"] -= 1
+        return response.text
+    
+    async def _generate_content_stream(self, prompt: str, timeout: float, on_chunk: Callable[[str], None]) -> str:
+        """
+        Stream a Gemini completion, passing each text chunk to on_chunk as it arrives
+        
+        Returns the full text. Without the client's async API the completion is
+        generated as a whole and passed on as a single chunk.
+        """
+        client = self._get_genai_client()
+        if not hasattr(client, "aio"):
+            text = await self._generate_content(prompt, timeout)
+            on_chunk(text)
+            return text
+        
+        self._ai_stats["requests"] += 1
+        parts: List[str] = []
+        
+        async def consume():
+            started = time.perf_counter()
+            stream = await client.aio.models.generate_content_stream(model=settings.AI_MODEL, contents=prompt)
+            async for chunk in stream:
+                text = chunk.text
+                if not text:
+                    continue
+                if not parts:
+                    self._ai_stats["streamed"] += 1
+                    self._first_token_ms_total += (time.perf_counter() - started) * 1000
+                parts.append(text)
+                on_chunk(text)
+        
+        async with self._ai_semaphore:
+            self._ai_stats["in_flight"] += 1
+            try:
+                await asyncio.wait_for(consume(), timeout=timeout)
+            except asyncio.TimeoutError:
+                self._ai_stats["timeouts"] += 1
+                raise TimeoutError(f"AI request timed out after {timeout}s")
+            finally:
+                self._ai_stats["in_flight"] -= 1
+        return "".join(parts)
+    
+    def validate_config(self, action_type: str, config: Dict[str, Any]):
+        """
+        Check an action config when a workflow is saved
+        
+        Raises ValueError for configs that would fail on every run.
+        """
+        if action_type == "data_transformation" and config.get("type", "jmespath") == "jmespath":
+            expression = config.get("expression")
+            if not isinstance(expression, str) or not expression:
+                raise ValueError("JMESPath transformation requires an expression")
+            try:
+                compile_jmespath(expression)
+            except Exception as e:
+                raise ValueError(f"Invalid JMESPath expression {expression!r}: {str(e)}")
+        try:
+            RetryPolicy(config)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid retry policy: {str(e)}")
+    
     async def execute_http_request(self, config: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
         """
         Execute an HTTP request
@@ -22,7 +255,16 @@ class ToolService:
         - headers: Optional headers
         - params: Optional query parameters
         - body: Optional request body
-        - timeout: Optional timeout in seconds
+        - timeout: Optional timeout in seconds for each attempt
+        - retry, deadline, idempotent, idempotency_key: see RetryPolicy
+        - max_response_size: Optional number of body bytes kept in the context
+        - max_download_size: Optional number of body bytes accepted at all
+        - spill: set to false to truncate large bodies instead of storing them as a blob
+        - stream_json: set to true to parse a JSON array or JSON Lines body item by item
+        - response_headers: Optional list of response header names to keep
+        
+        Connection errors and 5xx responses count towards the host's circuit
+        breaker, and requests to a host with an open circuit fail immediately.
         """
         method = config.get("method", "GET").upper()
         url = config.get("url")
@@ -30,6 +272,7 @@ class ToolService:
         params = config.get("params", {})
         body = config.get("body")
         timeout = config.get("timeout", 30)
+        keep_headers = config.get("response_headers")
         
         # Replace variables in URL, headers, params, and body
         url = self._replace_variables(url, context)
@@ -39,40 +282,171 @@ class ToolService:
             body = self._replace_variables(body, context)
         elif isinstance(body, dict):
             body = self._replace_variables_in_dict(body, context)
+        if config.get("idempotency_key"):
+            headers = {**headers, "Idempotency-Key": self._replace_variables(str(config["idempotency_key"]), context)}
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.request(
-                    method=method,
-                    url=url,
-                    headers=headers,
-                    params=params,
-                    json=body if isinstance(body, dict) else None,
-                    content=body if isinstance(body, str) else None,
-                    timeout=timeout
-                )
-                
-                # Try to parse response as JSON
+            policy = RetryPolicy(config)
+            client = self._get_http_client()
+            host = httpx.URL(url).host
+            
+            async def attempt() -> Dict[str, Any]:
+                circuit_breakers.before_call(host)
+                self._http_stats["requests"] += 1
+                started = time.perf_counter()
                 try:
-                    response_data = response.json()
-                except:
-                    response_data = response.text
+                    async with self._host_slot(host):
+                        async with client.stream(
+                            method=method,
+                            url=url,
+                            headers=headers,
+                            params=params,
+                            json=body if isinstance(body, dict) else None,
+                            content=body if isinstance(body, str) else None,
+                            timeout=timeout
+                        ) as response:
+                            if response.status_code >= 500:
+                                circuit_breakers.record_failure(host)
+                            else:
+                                circuit_breakers.record_success(host)
+                            retryable = response.status_code in policy.on_status
+                            result = {
+                                "status_code": response.status_code,
+                                "headers": {
+                                    name: value for name, value in response.headers.items()
+                                    if keep_headers is None or name in keep_headers
+                                },
+                                # Bodies of responses that will be retried are never spilled
+                                **await self._read_response_body(response, config, spill=not retryable)
+                            }
+                except httpx.PoolTimeout as e:
+                    # Local pool saturation says nothing about the host
+                    self._http_stats["pool_timeouts"] += 1
+                    raise RetryableError(str(e) or "Timed out waiting for a pooled connection", safe_to_resend=True) from e
+                except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+                    circuit_breakers.record_failure(host)
+                    raise RetryableError(str(e), safe_to_resend=True) from e
+                except httpx.TransportError as e:
+                    circuit_breakers.record_failure(host)
+                    raise RetryableError(str(e)) from e
                 
-                return {
-                    "status_code": response.status_code,
-                    "headers": dict(response.headers),
-                    "body": response_data,
-                    "elapsed_ms": response.elapsed.total_seconds() * 1000
-                }
+                result["elapsed_ms"] = (time.perf_counter() - started) * 1000
+                if retryable:
+                    raise RetryableError(f"HTTP {result['status_code']}", result=result)
+                return result
+            
+            try:
+                return await policy.call(attempt, idempotent=policy.is_idempotent(method))
+            except RetryableError as e:
+                # Out of retries on a retryable status, report the last response as usual
+                if e.result is None:
+                    raise
+                return e.result
         except Exception as e:
-            logger.error(f"Error executing HTTP request: {str(e)}")
+            error = f"Deadline of {config.get('deadline')}s exceeded" if isinstance(e, asyncio.TimeoutError) and not str(e) else str(e)
+            logger.error(f"Error executing HTTP request: {error}")
             return {
-                "error": str(e),
+                "error": error,
                 "status_code": None,
                 "headers": {},
                 "body": None
             }
     
+    async def _read_response_body(self, response: httpx.Response, config: Dict[str, Any], spill: bool) -> Dict[str, Any]:
+        """
+        Read a streamed response body without holding more than max_response_size bytes
+        
+        Bodies up to max_response_size are parsed as JSON or kept as text, as
+        before. Larger bodies are written to the blob store as they arrive and
+        only a body_ref is returned, or with spill disabled the body is cut off
+        and marked truncated. With stream_json the items that fit into
+        max_response_size are returned as the body. Bodies over
+        max_download_size raise ValueError.
+        """
+        max_inline = int(config.get("max_response_size") or settings.HTTP_MAX_INLINE_RESPONSE_BYTES)
+        max_total = int(config.get("max_download_size") or settings.HTTP_MAX_RESPONSE_BYTES)
+        spill = spill and config.get("spill", True)
+        
+        content_length = response.headers.get("content-length", "")
+        if content_length.isdigit() and int(content_length) > max_total:
+            raise ValueError(f"Response of {content_length} bytes exceeds the {max_total} byte limit")
+        
+        parser = JSONItemParser(max_inline) if config.get("stream_json") else None
+        items: List[Any] = []
+        items_size = 0
+        json_error = None
+        buffer = bytearray()
+        writer = None
+        size = 0
+        truncated = False
+        cut_off = False
+        
+        def keep_items(parsed):
+            nonlocal items_size, truncated
+            for item, item_size in parsed:
+                if items_size + item_size <= max_inline:
+                    items.append(item)
+                    items_size += item_size
+                else:
+                    truncated = True
+        
+        try:
+            async for chunk in response.aiter_bytes():
+                size += len(chunk)
+                if size > max_total:
+                    raise ValueError(f"Response exceeds the {max_total} byte limit")
+                
+                if parser is not None:
+                    try:
+                        keep_items(parser.feed(chunk))
+                    except ValueError as e:
+                        parser, json_error = None, str(e)
+                
+                if writer is not None:
+                    await writer.write(chunk)
+                elif len(buffer) + len(chunk) <= max_inline:
+                    buffer += chunk
+                elif spill:
+                    # The URL may carry credentials in its query string, so it is not used as the name
+                    writer = blob_store.create("http_response", response.headers.get("content-type"))
+                    await writer.write(bytes(buffer))
+                    await writer.write(chunk)
+                    buffer = bytearray()
+                else:
+                    buffer += chunk[:max_inline - len(buffer)]
+                    truncated = cut_off = True
+                    break
+            
+            if parser is not None and not cut_off:
+                try:
+                    keep_items(parser.close())
+                except ValueError as e:
+                    json_error = str(e)
+            body_ref = await writer.close() if writer is not None else None
+        except BaseException:
+            if writer is not None:
+                await writer.abort()
+            raise
+        
+        result: Dict[str, Any] = {"size": size, "truncated": truncated}
+        if config.get("stream_json"):
+            result["body"] = items
+            if json_error:
+                result["json_error"] = json_error
+        elif body_ref is not None:
+            result["body"] = None
+        else:
+            # Try to parse response as JSON
+            try:
+                if cut_off:
+                    raise ValueError("Truncated body")
+                result["body"] = json.loads(bytes(buffer))
+            except ValueError:
+                result["body"] = bytes(buffer).decode(response.encoding or "utf-8", errors="replace")
+        if body_ref is not None:
+            result["body_ref"] = body_ref
+        return result
+    
     async def execute_data_transformation(self, config: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
         """
         Transform data using JMESPath or simple templates
@@ -88,12 +462,12 @@ class ToolService:
         expression = config.get("expression")
         output_var = config.get("output", "result")
         
-        input_data = context.get(input_var) if input_var else context
+        # The context may be a layered view, JMESPath needs a plain dict
+        input_data = context.get(input_var) if input_var else dict(context)
         
         try:
             if transform_type == "jmespath":
-                import jmespath
-                result = jmespath.search(expression, input_data)
+                result = compile_jmespath(expression).search(input_data)
             elif transform_type == "template":
                 # Simple template with variable substitution
                 result = self._replace_variables(expression, context)
@@ -132,7 +506,7 @@ class ToolService:
             "timestamp": datetime.now().isoformat()
         }
     
-    async def execute_ai_task(self, config: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+    async def execute_ai_task(self, config: Dict[str, Any], context: Dict[str, Any], on_chunk: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
         """
         Execute an AI task using Gemini
         
@@ -141,15 +515,20 @@ class ToolService:
         - input: input variable name
         - prompt: additional prompt instructions
         - output: output variable name
-        """
-        from google import genai
-        from ..core.config import settings
+        - timeout: Optional timeout in seconds for each attempt
+        - cache: set to false to always call the model
+        - stream: set to true to pass the output to on_chunk as it is generated
+        - retry, deadline: see RetryPolicy
         
-        client = genai.Client(api_key=settings.GEMINI_API_KEY)
+        The full text is returned either way. A streamed attempt that fails
+        after its first chunk is not retried, so listeners never see output twice.
+        """
         task_type = config.get("task_type", "generate")
         input_var = config.get("input")
         prompt = config.get("prompt", "")
         output_var = config.get("output", "ai_result")
+        timeout = config.get("timeout", settings.AI_REQUEST_TIMEOUT)
+        stream = bool(config.get("stream")) and on_chunk is not None
         
         input_text = context.get(input_var, "") if input_var else ""
         
@@ -168,15 +547,51 @@ class ToolService:
             
             full_prompt = f"{system_message}\n\n{prompt}\n\n{input_text}"
             
-            response = client.models.generate_content(
-                model='gemini-2.5-flash',
-                contents=full_prompt
-            )
+            use_cache = settings.AI_CACHE_ENABLED and config.get("cache", True)
+            if use_cache:
+                cache_key = ai_result_cache.make_key(settings.AI_MODEL, task_type, system_message, prompt, input_text)
+                result = await ai_result_cache.get(cache_key)
+                if result is not None:
+                    if stream:
+                        on_chunk(result)
+                    return {output_var: result}
+            
+            emitted = False
+            
+            def forward(text: str):
+                nonlocal emitted
+                emitted = True
+                on_chunk(text)
             
-            result = response.text
+            async def attempt() -> str:
+                circuit_breakers.before_call(AI_CIRCUIT)
+                try:
+                    if stream:
+                        text = await self._generate_content_stream(full_prompt, timeout, forward)
+                    else:
+                        text = await self._generate_content(full_prompt, timeout)
+                except Exception as e:
+                    code = getattr(e, "code", None)
+                    if isinstance(code, int) and 400 <= code < 500 and code != 429:
+                        # The request itself was rejected, the service is up
+                        circuit_breakers.record_success(AI_CIRCUIT)
+                        raise
+                    circuit_breakers.record_failure(AI_CIRCUIT)
+                    if emitted:
+                        raise
+                    raise RetryableError(str(e)) from e
+                circuit_breakers.record_success(AI_CIRCUIT)
+                return text
+            
+            result = await RetryPolicy(config).call(attempt)
+            
+            if use_cache and result is not None:
+                await ai_result_cache.set(cache_key, result)
             
             return {output_var: result}
         except Exception as e:
+            if isinstance(e, asyncio.TimeoutError) and not str(e):
+                e = TimeoutError(f"Deadline of {config.get('deadline')}s exceeded")
             logger.error(f"Error executing AI task: {str(e)}")
             return {output_var: None, "error": str(e)}
     
@@ -188,23 +603,7 @@ class ToolService:
         if not text or not isinstance(text, str):
             return text
         
-        def replace_var(match):
-            var_name = match.group(1).strip()
-            if "." in var_name:
-                # Handle nested attributes
-                parts = var_name.split(".")
-                value = context
-                for part in parts:
-                    if isinstance(value, dict) and part in value:
-                        value = value[part]
-                    else:
-                        # If path doesn't exist, return original placeholder
-                        return match.group(0)
-                return str(value)
-            else:
-                return str(context.get(var_name, match.group(0)))
-        
-        return re.sub(r'{{(.*?)}}', replace_var, text)
+        return compile_template(text).render(context)
     
     def _replace_variables_in_dict(self, data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -213,23 +612,7 @@ class ToolService:
         if not data or not isinstance(data, dict):
             return data
         
-        result = {}
-        for key, value in data.items():
-            if isinstance(value, str):
-                result[key] = self._replace_variables(value, context)
-            elif isinstance(value, dict):
-                result[key] = self._replace_variables_in_dict(value, context)
-            elif isinstance(value, list):
-                result[key] = [
-                    self._replace_variables_in_dict(item, context) if isinstance(item, dict)
-                    else self._replace_variables(item, context) if isinstance(item, str)
-                    else item
-                    for item in value
-                ]
-            else:
-                result[key] = value
-        
-        return result
+        return compile_config(data).render(context)
 
 # Create singleton instance
 tool_service = ToolService()
\ No newline at end of file
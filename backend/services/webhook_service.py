@@ -0,0 +1,103 @@
+from typing import Dict, Any, Optional
+import asyncio
+import logging
+import secrets
+from ..core.config import settings
+from ..models.workflow import WorkflowModel, WorkflowStatus, WorkflowTriggerType
+from ..database.mongodb import get_workflows_by_trigger
+
+logger = logging.getLogger(__name__)
+
+def webhook_id_for(workflow_id: str, trigger_config: Dict[str, Any]) -> str:
+    """
+    The webhook ID a workflow listens on
+
+    Workflows get a random webhook_id when they are saved. Workflows saved
+    before that listen on their own ID.
+    """
+    return str(trigger_config.get("webhook_id") or workflow_id)
+
+def new_webhook_id() -> str:
+    return secrets.token_urlsafe(16)
+
+class WebhookRouter:
+    """
+    In-memory webhook_id -> workflow_id index of active webhook workflows
+    
+    Warmed from the database at startup, kept current by workflow create,
+    update and delete, and periodically reloaded so changes made by other
+    backend processes are picked up.
+    """
+    
+    def __init__(self):
+        self._routes: Dict[str, str] = {}
+        self._webhooks: Dict[str, str] = {}
+        self._refresh_task: Optional[asyncio.Task] = None
+    
+    async def start(self):
+        await self.warm()
+        self._refresh_task = asyncio.create_task(self._refresh_loop())
+    
+    async def stop(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            await asyncio.gather(self._refresh_task, return_exceptions=True)
+            self._refresh_task = None
+    
+    async def warm(self):
+        """
+        Rebuild the index from every active webhook workflow
+        """
+        workflows = await get_workflows_by_trigger(
+            WorkflowTriggerType.WEBHOOK.value,
+            WorkflowStatus.ACTIVE.value,
+            {"_id": 0, "id": 1, "trigger": 1}
+        )
+        routes, webhooks = {}, {}
+        for workflow in workflows:
+            webhook_id = webhook_id_for(workflow["id"], workflow["trigger"].get("config") or {})
+            if webhook_id in routes:
+                logger.warning(f"Webhook {webhook_id} of workflow {workflow['id']} is already routed to workflow {routes[webhook_id]}")
+                continue
+            routes[webhook_id] = workflow["id"]
+            webhooks[workflow["id"]] = webhook_id
+        self._routes, self._webhooks = routes, webhooks
+        logger.info(f"Webhook index loaded with {len(routes)} routes")
+    
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(settings.TRIGGER_INDEX_REFRESH_INTERVAL)
+            try:
+                await self.warm()
+            except Exception as e:
+                logger.error(f"Error refreshing webhook index: {str(e)}")
+    
+    def register(self, workflow_id: str, workflow: WorkflowModel):
+        """
+        Add, update or remove a workflow's route after it was saved
+        
+        A webhook ID routed to another workflow is never taken over; saving
+        already rejects duplicate webhook IDs.
+        """
+        self.unregister(workflow_id)
+        if workflow.status != WorkflowStatus.ACTIVE or workflow.trigger.type != WorkflowTriggerType.WEBHOOK:
+            return
+        
+        webhook_id = webhook_id_for(workflow_id, workflow.trigger.config)
+        existing = self._routes.get(webhook_id)
+        if existing is not None and existing != workflow_id:
+            logger.warning(f"Webhook {webhook_id} of workflow {workflow_id} is already routed to workflow {existing}")
+            return
+        self._routes[webhook_id] = workflow_id
+        self._webhooks[workflow_id] = webhook_id
+    
+    def unregister(self, workflow_id: str):
+        webhook_id = self._webhooks.pop(workflow_id, None)
+        if webhook_id is not None and self._routes.get(webhook_id) == workflow_id:
+            del self._routes[webhook_id]
+    
+    def resolve(self, webhook_id: str) -> Optional[str]:
+        return self._routes.get(webhook_id)
+
+# Create singleton instance
+webhook_router = WebhookRouter()
@@ -1,29 +1,89 @@
-from ..models.workflow import WorkflowModel, WorkflowExecution
+from ..models.workflow import WorkflowModel, WorkflowExecution, WorkflowTriggerType, ExecutionLogEntry
 from ..database.mongodb import (
+    get_execution_logs,
     create_workflow,
     get_workflow,
+    get_workflows_by_ids,
+    webhook_id_taken,
     get_workflows_by_user,
     update_workflow,
     delete_workflow,
     create_execution,
+    create_executions,
+    append_execution_logs,
     get_execution,
+    get_execution_status,
     get_executions_by_workflow,
-    update_execution
+    update_execution,
+    save_execution_checkpoint,
+    get_execution_checkpoints,
+    delete_execution_checkpoints,
+    get_next_execution_log_seq,
+    find_legacy_executions,
+    fail_legacy_execution
 )
+from ..core.config import settings
+from ..utils.pagination import Cursor
 from datetime import datetime
+from collections import deque
+import asyncio
+import json
 import logging
-from typing import List, Dict, Any, Optional
+import time
+from typing import List, Dict, Any, Optional, Tuple, Callable
 import uuid
 from .tool_service import tool_service
+from .execution_log import ExecutionLogWriter
+from .webhook_service import webhook_router, webhook_id_for, new_webhook_id
+from .scheduler_service import workflow_scheduler, validate_schedule_config
+from .event_bus import event_bus, validate_event_config
+from .execution_events import execution_events
+from .context_store import ExecutionContext, is_blob_ref, BLOB_REF_KEY
+from .blob_store import blob_store
 
 logger = logging.getLogger(__name__)
 
+async def validate_workflow(workflow_id: str, workflow: WorkflowModel):
+    """
+    Validate trigger and action configs before a workflow is saved
+    """
+    if workflow.trigger.type == WorkflowTriggerType.WEBHOOK:
+        webhook_id = workflow.trigger.config.get("webhook_id")
+        if not isinstance(webhook_id, str) or not webhook_id:
+            raise ValueError("Trigger: webhook_id must be a non-empty string")
+        if await webhook_id_taken(webhook_id, workflow_id):
+            raise ValueError("Trigger: webhook_id is already used by another workflow")
+    if workflow.trigger.type == WorkflowTriggerType.SCHEDULED:
+        try:
+            validate_schedule_config(workflow.trigger.config)
+        except ValueError as e:
+            raise ValueError(f"Trigger: {str(e)}")
+    if workflow.trigger.type == WorkflowTriggerType.EVENT:
+        try:
+            validate_event_config(workflow.trigger.config)
+        except ValueError as e:
+            raise ValueError(f"Trigger: {str(e)}")
+    for action in workflow.actions:
+        try:
+            tool_service.validate_config(action.type, action.config)
+        except ValueError as e:
+            raise ValueError(f"Action {action.name}: {str(e)}")
+
 async def create_new_workflow(workflow: WorkflowModel) -> WorkflowModel:
     """
     Create a new workflow in the database
+    
+    Webhook workflows without a webhook_id get a random one, so the webhook URL
+    cannot be derived from the workflow ID.
     """
+    if workflow.trigger.type == WorkflowTriggerType.WEBHOOK and not workflow.trigger.config.get("webhook_id"):
+        workflow.trigger.config["webhook_id"] = new_webhook_id()
+    await validate_workflow(workflow.id, workflow)
     workflow_dict = workflow.dict()
     workflow_id = await create_workflow(workflow_dict)
+    webhook_router.register(workflow.id, workflow)
+    workflow_scheduler.register(workflow.id, workflow)
+    event_bus.register(workflow.id, workflow)
     return workflow
 
 async def get_workflow_by_id(workflow_id: str) -> Optional[WorkflowModel]:
@@ -35,32 +95,60 @@ async def get_workflow_by_id(workflow_id: str) -> Optional[WorkflowModel]:
         return None
     return WorkflowModel(**workflow_dict)
 
-async def get_user_workflows(user_id: str, skip: int = 0, limit: int = 100) -> List[WorkflowModel]:
+async def get_user_workflows(user_id: str, skip: int = 0, limit: int = 100, after: Optional[Cursor] = None) -> List[WorkflowModel]:
     """
-    Get all workflows created by a specific user
+    Get all workflows created by a specific user, most recently updated first
     """
-    workflows_dict = await get_workflows_by_user(user_id, skip, limit)
+    workflows_dict = await get_workflows_by_user(user_id, skip, limit, after)
     return [WorkflowModel(**workflow) for workflow in workflows_dict]
 
+async def get_user_workflow_fields(user_id: str, fields: List[str], skip: int = 0, limit: int = 100, after: Optional[Cursor] = None) -> List[Dict[str, Any]]:
+    """
+    Get selected fields of a user's workflows, projected in the database
+
+    id and updated_at are always included so the caller can build a cursor.
+    """
+    projection = {"_id": 0, "id": 1, "updated_at": 1, **{field: 1 for field in fields}}
+    return await get_workflows_by_user(user_id, skip, limit, after, projection)
+
 async def update_existing_workflow(workflow_id: str, workflow: WorkflowModel) -> Optional[WorkflowModel]:
     """
     Update an existing workflow
+    
+    A webhook workflow saved without a webhook_id keeps the webhook URL it
+    already had, other workflows get a random one.
     """
+    if workflow.trigger.type == WorkflowTriggerType.WEBHOOK and not workflow.trigger.config.get("webhook_id"):
+        existing_trigger = (await get_workflow(workflow_id) or {}).get("trigger") or {}
+        if existing_trigger.get("type") == WorkflowTriggerType.WEBHOOK.value:
+            webhook_id = webhook_id_for(workflow_id, existing_trigger.get("config") or {})
+        else:
+            webhook_id = new_webhook_id()
+        workflow.trigger.config["webhook_id"] = webhook_id
+    await validate_workflow(workflow_id, workflow)
     workflow_dict = workflow.dict()
     success = await update_workflow(workflow_id, workflow_dict)
     if not success:
         return None
+    webhook_router.register(workflow_id, workflow)
+    workflow_scheduler.register(workflow_id, workflow)
+    event_bus.register(workflow_id, workflow)
     return workflow
 
 async def delete_workflow_by_id(workflow_id: str) -> bool:
     """
     Delete a workflow by its ID
     """
-    return await delete_workflow(workflow_id)
+    deleted = await delete_workflow(workflow_id)
+    if deleted:
+        webhook_router.unregister(workflow_id)
+        workflow_scheduler.unregister(workflow_id)
+        event_bus.unregister(workflow_id)
+    return deleted
 
-async def execute_workflow(workflow_id: str, input_data: Dict[str, Any]) -> WorkflowExecution:
+async def create_pending_execution(workflow_id: str, input_data: Dict[str, Any]) -> Tuple[WorkflowModel, WorkflowExecution]:
     """
-    Execute a workflow with the given input data
+    Load a workflow and persist a pending execution record for it
     """
     workflow_dict = await get_workflow(workflow_id)
     if not workflow_dict:
@@ -69,97 +157,397 @@ async def execute_workflow(workflow_id: str, input_data: Dict[str, Any]) -> Work
     workflow = WorkflowModel(**workflow_dict)
     
     # Create execution record
-    execution_id = str(uuid.uuid4())
-    execution = WorkflowExecution(
-        id=execution_id,
+    execution = _new_execution(workflow_id, input_data)
+    
+    # Logs are stored in their own collection, keep the execution document small
+    await create_execution(_execution_document(execution))
+    log_writer = ExecutionLogWriter(execution)
+    log_writer.add("Execution queued")
+    await log_writer.close()
+    
+    return workflow, execution
+
+async def create_pending_executions(workflow_ids: List[str], input_data: Dict[str, Any]) -> List[Tuple[WorkflowModel, WorkflowExecution]]:
+    """
+    Persist pending executions of several workflows with the same input data
+    
+    Workflows are loaded with one query and executions and their first log
+    entries are written with one insert each. Workflows that no longer exist
+    are skipped.
+    """
+    workflows = [WorkflowModel(**workflow_dict) for workflow_dict in await get_workflows_by_ids(workflow_ids)]
+    if not workflows:
+        return []
+    
+    jobs = [(workflow, _new_execution(workflow.id, input_data)) for workflow in workflows]
+    await _create_queued_executions([execution for _, execution in jobs])
+    return jobs
+
+async def create_batch_executions(workflow_id: str, batch_id: str, inputs: List[Dict[str, Any]]) -> List[WorkflowExecution]:
+    """
+    Persist pending executions of one workflow for each input of a batch
+    
+    Executions are written BATCH_INSERT_SIZE at a time with one insert each.
+    """
+    executions = []
+    for start in range(0, len(inputs), settings.BATCH_INSERT_SIZE):
+        chunk = [_new_execution(workflow_id, input_data, batch_id) for input_data in inputs[start:start + settings.BATCH_INSERT_SIZE]]
+        await _create_queued_executions(chunk)
+        executions.extend(chunk)
+    return executions
+
+async def _create_queued_executions(executions: List[WorkflowExecution]):
+    await create_executions([_execution_document(execution) for execution in executions])
+    
+    created_at = datetime.utcnow()
+    log_entries = []
+    for execution in executions:
+        entry = {"seq": 0, "timestamp": datetime.now().isoformat(), "message": "Execution queued"}
+        execution.logs.append(entry)
+        log_entries.append({**entry, "execution_id": execution.id, "created_at": created_at})
+    try:
+        await append_execution_logs(log_entries)
+    except Exception as e:
+        logger.error(f"Error writing queued logs for {len(executions)} executions: {str(e)}")
+
+def _new_execution(workflow_id: str, input_data: Dict[str, Any], batch_id: Optional[str] = None) -> WorkflowExecution:
+    return WorkflowExecution(
+        id=str(uuid.uuid4()),
         workflow_id=workflow_id,
-        status="running",
+        status="pending",
         started_at=datetime.now(),
         input_data=input_data,
         output_data={},
-        logs=[{"timestamp": datetime.now().isoformat(), "message": "Execution started"}]
+        batch_id=batch_id
     )
+
+def _execution_document(execution: WorkflowExecution) -> Dict[str, Any]:
+    # Logs are stored in their own collection. heartbeat_at is refreshed by the
+    # execution queue and lets another process recover the run if this one dies.
+    return {**execution.dict(exclude={"logs"}), "heartbeat_at": datetime.utcnow()}
+
+async def recover_orphaned_execution(execution_dict: Dict[str, Any]) -> Optional[Tuple[WorkflowModel, WorkflowExecution]]:
+    """
+    Prepare a claimed orphaned execution to be resumed, or fail it
     
-    await create_execution(execution.dict())
+    Returns None and marks the execution failed if its workflow was deleted or
+    it was already recovered EXECUTION_MAX_RECOVERIES times, which usually means
+    the run itself keeps taking the process down.
+    """
+    execution = WorkflowExecution(**execution_dict)
+    workflow_dict = await get_workflow(execution.workflow_id)
+    
+    reason = None
+    if not workflow_dict:
+        reason = "workflow no longer exists"
+    elif execution_dict.get("recovery_attempts", 0) > settings.EXECUTION_MAX_RECOVERIES:
+        reason = f"recovered {settings.EXECUTION_MAX_RECOVERIES} times without finishing"
+    
+    if reason is None:
+        return WorkflowModel(**workflow_dict), execution
+    
+    await _log_failure(execution, reason)
+    await update_execution(execution.id, {"status": "failed", "completed_at": datetime.now()})
+    await delete_execution_checkpoints(execution.id)
+    return None
+
+async def fail_legacy_executions(limit: int) -> int:
+    """
+    Fail executions left pending or running by a version without heartbeats
+    
+    Those runs wrote no checkpoints, so resuming them would start over and
+    repeat every side effect of their actions. Returns how many were failed.
+    """
+    failed = 0
+    for execution_dict in await find_legacy_executions(settings.EXECUTION_ORPHAN_TIMEOUT, limit):
+        # Another process may fail it first, or an old process may still finish it
+        if not await fail_legacy_execution(execution_dict["id"]):
+            continue
+        await _log_failure(WorkflowExecution(**execution_dict), "interrupted before upgrade")
+        failed += 1
+    if failed:
+        logger.warning(f"Marked {failed} executions interrupted before upgrade as failed")
+    return failed
+
+async def _log_failure(execution: WorkflowExecution, reason: str):
+    log_writer = ExecutionLogWriter(execution, next_seq=await get_next_execution_log_seq(execution.id))
+    log_writer.add(f"Execution failed: {reason}")
+    await log_writer.close()
+
+async def run_execution(
+    workflow: WorkflowModel,
+    execution: WorkflowExecution,
+    resume: bool = False,
+    graph: Optional["WorkflowGraph"] = None
+) -> WorkflowExecution:
+    """
+    Run a previously created execution to completion and persist the result
+    
+    Log entries are appended to the execution document in batches while the run
+    is in flight, and status transitions only $set the fields that changed.
+    Each completed action is checkpointed, so with resume the run continues from
+    the checkpoints of an earlier, interrupted attempt. Callers running the same
+    workflow many times can pass its graph so it is only built once.
+    """
+    completed: Dict[str, Dict[str, Any]] = {}
+    if resume:
+        completed = await get_execution_checkpoints(execution.id)
+        log_writer = ExecutionLogWriter(execution, next_seq=await get_next_execution_log_seq(execution.id))
+        execution.status = "running"
+        await update_execution(execution.id, {"status": execution.status})
+        resumed = sum(1 for action in workflow.actions if action.id in completed)
+        log_writer.add(f"Execution resumed with {resumed} completed actions")
+        execution_events.publish(execution.id, "status", status=execution.status)
+    else:
+        log_writer = ExecutionLogWriter(execution)
+        execution.status = "running"
+        execution.started_at = datetime.now()
+        await update_execution(execution.id, {"status": execution.status, "started_at": execution.started_at})
+        log_writer.add("Execution started")
+        execution_events.publish(execution.id, "status", status=execution.status)
     
     try:
         # Process workflow nodes
-        output_data = await process_workflow(workflow, input_data, execution)
+        output_data = await process_workflow(
+            workflow,
+            execution.input_data,
+            execution,
+            log_writer=log_writer,
+            completed=completed,
+            checkpoint=True,
+            graph=graph
+        )
         
         # Update execution record
         execution.status = "completed"
         execution.completed_at = datetime.now()
         execution.output_data = output_data
-        execution.logs.append({"timestamp": datetime.now().isoformat(), "message": "Execution completed successfully"})
+        log_writer.add("Execution completed successfully")
         
     except Exception as e:
-        logger.error(f"Error executing workflow {workflow_id}: {str(e)}")
+        logger.error(f"Error executing workflow {workflow.id}: {str(e)}")
         execution.status = "failed"
         execution.completed_at = datetime.now()
-        execution.logs.append({"timestamp": datetime.now().isoformat(), "message": f"Execution failed: {str(e)}"})
+        log_writer.add(f"Execution failed: {str(e)}")
     
     # Update execution in database
-    await update_execution(execution_id, execution.dict())
+    await log_writer.close()
+    try:
+        await update_execution(execution.id, {
+            "status": execution.status,
+            "completed_at": execution.completed_at,
+            "output_data": execution.output_data,
+            "peak_context_bytes": execution.peak_context_bytes
+        })
+    except Exception as e:
+        # Usually output_data too large for one document. Failing the run here
+        # keeps it from staying running and being recovered again and again.
+        logger.error(f"Error saving result of execution {execution.id}: {str(e)}")
+        execution.status = "failed"
+        execution.output_data = {}
+        await _log_failure(execution, f"could not save result: {str(e)}")
+        await update_execution(execution.id, {
+            "status": execution.status,
+            "completed_at": execution.completed_at,
+            "output_data": execution.output_data,
+            "peak_context_bytes": execution.peak_context_bytes
+        })
+    execution_events.publish(execution.id, "status", status=execution.status)
+    try:
+        await delete_execution_checkpoints(execution.id)
+    except Exception as e:
+        logger.error(f"Error deleting checkpoints of execution {execution.id}: {str(e)}")
+    
+    # Let event-triggered workflows chain off this run
+    event_bus.publish_execution_event(workflow, execution)
     
     return execution
 
-async def process_workflow(workflow: WorkflowModel, input_data: Dict[str, Any], execution: WorkflowExecution) -> Dict[str, Any]:
+class WorkflowGraph:
     """
-    Process a workflow by executing its actions in topological order
+    Dependency graph of a workflow's actions, built once per execution
     """
-    context = {**input_data}  # Start with input data
-    
-    # Build graph
-    adj_list = {}
-    in_degree = {}
-    action_map = {action.id: action for action in workflow.actions}
-    
-    # Initialize in-degree for all actions
-    for action in workflow.actions:
-        in_degree[action.id] = 0
-        adj_list[action.id] = []
-        
-    # Build adjacency list and calculate in-degrees
-    for edge in workflow.edges:
-        if edge.source in action_map and edge.target in action_map:
-            adj_list[edge.source].append(edge.target)
-            in_degree[edge.target] += 1
-            
-    # Find start nodes (in-degree 0)
-    queue = [action_id for action_id, degree in in_degree.items() if degree == 0]
-    
-    execution_order = []
-    
-    while queue:
-        current_id = queue.pop(0)
-        execution_order.append(current_id)
-        
-        for neighbor in adj_list[current_id]:
-            in_degree[neighbor] -= 1
-            if in_degree[neighbor] == 0:
-                queue.append(neighbor)
-                
-    if len(execution_order) != len(workflow.actions):
-        raise ValueError("Cycle detected in workflow graph")
-        
-    # Execute actions in order
-    for action_id in execution_order:
-        action = action_map[action_id]
-        execution.logs.append({"timestamp": datetime.now().isoformat(), "message": f"Executing action: {action.name} ({action.type})"})
-        
-        try:
-            action_result = await execute_action(action.type, action.config, context)
-            context.update(action_result)
-            execution.logs.append({"timestamp": datetime.now().isoformat(), "message": f"Action {action.name} completed"})
-        except Exception as e:
-            execution.logs.append({"timestamp": datetime.now().isoformat(), "message": f"Action {action.name} failed: {str(e)}"})
-            raise e
-            
-    return context
 
-async def execute_action(action_type: str, config: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+    def __init__(self, workflow: WorkflowModel):
+        self.action_map = {action.id: action for action in workflow.actions}
+        self.adj_list: Dict[str, List[str]] = {action_id: [] for action_id in self.action_map}
+        self.in_degree: Dict[str, int] = {action_id: 0 for action_id in self.action_map}
+        parents: Dict[str, List[str]] = {action_id: [] for action_id in self.action_map}
+
+        # Build adjacency list and calculate in-degrees
+        for edge in workflow.edges:
+            if edge.source in self.action_map and edge.target in self.action_map:
+                self.adj_list[edge.source].append(edge.target)
+                self.in_degree[edge.target] += 1
+                parents[edge.target].append(edge.source)
+
+        # Kahn's algorithm gives a deterministic topological order used for merging results
+        in_degree = dict(self.in_degree)
+        queue = deque(action_id for action_id, degree in in_degree.items() if degree == 0)
+        self.order: List[str] = []
+        while queue:
+            current_id = queue.popleft()
+            self.order.append(current_id)
+            for neighbor in self.adj_list[current_id]:
+                in_degree[neighbor] -= 1
+                if in_degree[neighbor] == 0:
+                    queue.append(neighbor)
+
+        if len(self.order) != len(self.action_map):
+            raise ValueError("Cycle detected in workflow graph")
+
+        self.position = {action_id: index for index, action_id in enumerate(self.order)}
+
+        # Transitive upstream actions of every node, sorted in topological order
+        ancestors: Dict[str, set] = {}
+        for action_id in self.order:
+            upstream = set()
+            for parent_id in parents[action_id]:
+                upstream.add(parent_id)
+                upstream |= ancestors[parent_id]
+            ancestors[action_id] = upstream
+        self.ancestors: Dict[str, List[str]] = {
+            action_id: sorted(upstream, key=self.position.__getitem__)
+            for action_id, upstream in ancestors.items()
+        }
+
+        # Number of downstream actions that read each action's result
+        self.dependents: Dict[str, int] = {action_id: 0 for action_id in self.action_map}
+        for upstream in ancestors.values():
+            for ancestor_id in upstream:
+                self.dependents[ancestor_id] += 1
+
+async def process_workflow(
+    workflow: WorkflowModel,
+    input_data: Dict[str, Any],
+    execution: WorkflowExecution,
+    max_concurrency: Optional[int] = None,
+    log_writer: Optional[ExecutionLogWriter] = None,
+    completed: Optional[Dict[str, Dict[str, Any]]] = None,
+    checkpoint: bool = False,
+    graph: Optional[WorkflowGraph] = None
+) -> Dict[str, Any]:
+    """
+    Process a workflow by executing its actions as a dependency graph
+
+    An action starts as soon as all of its upstream actions have completed, with
+    at most max_concurrency actions running at once. Each action sees the input
+    data layered under the results of its own ancestors, so parallel branches
+    never overwrite each other. The returned context merges every result in
+    topological order and does not depend on completion order; when the workflow
+    declares outputs, only those keys are returned.
+
+    completed maps action IDs to the results of an earlier attempt; those actions
+    are not run again. With checkpoint, each action's own result is saved as it
+    completes. The context is rebuilt from these per-action results, so a
+    checkpoint never has to copy the accumulated context. Large values are kept
+    by reference, see ExecutionContext, and the peak context size is recorded on
+    the execution.
+    """
+    graph = graph or WorkflowGraph(workflow)
+    owns_log_writer = log_writer is None
+    if owns_log_writer:
+        log_writer = ExecutionLogWriter(execution)
+    semaphore = asyncio.Semaphore(max_concurrency or settings.WORKFLOW_MAX_CONCURRENCY)
+    store = ExecutionContext(input_data)
+    finished = set()
+    pending_dependents = dict(graph.dependents)
+
+    def finish(action_id: str):
+        # Results are released once every action that reads them has finished
+        finished.add(action_id)
+        for ancestor_id in graph.ancestors[action_id]:
+            pending_dependents[ancestor_id] -= 1
+            if pending_dependents[ancestor_id] == 0:
+                store.release(ancestor_id, workflow.outputs)
+        if pending_dependents[action_id] == 0:
+            store.release(action_id, workflow.outputs)
+
+    # Checkpoints of actions removed from the workflow since the first attempt are ignored
+    for action_id in graph.order:
+        if completed and action_id in completed:
+            await store.restore(action_id, completed[action_id])
+            finish(action_id)
+
+    async def run_action(action_id: str) -> Dict[str, Any]:
+        action = graph.action_map[action_id]
+        context = store.view(graph.ancestors[action_id])
+
+        async with semaphore:
+            log_writer.add(f"Executing action: {action.name} ({action.type})")
+            execution_events.publish(execution.id, "action_started", action_id=action_id, name=action.name, action_type=action.type)
+            started = time.perf_counter()
+            try:
+                action_result = await execute_action(
+                    action.type,
+                    action.config,
+                    context,
+                    on_chunk=lambda text: execution_events.publish(execution.id, "action_output", action_id=action_id, delta=text)
+                )
+            except Exception as e:
+                log_writer.add(f"Action {action.name} failed: {str(e)}")
+                execution_events.publish(execution.id, "action_failed", action_id=action_id, name=action.name, error=str(e))
+                raise e
+
+        persisted = await store.add(action_id, action_result)
+        if checkpoint:
+            try:
+                await save_execution_checkpoint(execution.id, action_id, persisted)
+            except Exception as e:
+                logger.error(f"Error checkpointing action {action.name} of execution {execution.id}: {str(e)}")
+        log_writer.add(f"Action {action.name} completed")
+        execution_events.publish(
+            execution.id,
+            "action_completed",
+            action_id=action_id,
+            name=action.name,
+            duration_ms=round((time.perf_counter() - started) * 1000, 1)
+        )
+        return persisted
+
+    remaining = dict(graph.in_degree)
+    for action_id in finished:
+        for neighbor in graph.adj_list[action_id]:
+            remaining[neighbor] -= 1
+    running = {
+        asyncio.create_task(run_action(action_id)): action_id
+        for action_id in graph.order
+        if remaining[action_id] == 0 and action_id not in finished
+    }
+
+    try:
+        while running:
+            done, _ = await asyncio.wait(running.keys(), return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(done, key=lambda t: graph.position[running[t]]):
+                action_id = running.pop(task)
+                task.result()
+                finish(action_id)
+                for neighbor in graph.adj_list[action_id]:
+                    remaining[neighbor] -= 1
+                    if remaining[neighbor] == 0:
+                        running[asyncio.create_task(run_action(neighbor))] = neighbor
+    finally:
+        # A failed action aborts the run, so stop any sibling branches still in flight
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+        if owns_log_writer:
+            await log_writer.close()
+        execution.peak_context_bytes = store.peak_size
+
+    return await store.output(graph.order, workflow.outputs)
+
+async def execute_action(
+    action_type: str,
+    config: Dict[str, Any],
+    context: Dict[str, Any],
+    on_chunk: Optional[Callable[[str], None]] = None
+) -> Dict[str, Any]:
     """
     Execute a single action based on its type using ToolService
+
+    on_chunk receives partial output of actions that stream it.
     """
     if action_type == "http_request":
         return await tool_service.execute_http_request(config, context)
@@ -174,7 +562,7 @@ async def execute_action(action_type: str, config: Dict[str, Any], context: Dict
         # Map generic ai_task or specific types to execute_ai_task
         if action_type != "ai_task":
             config["task_type"] = action_type
-        return await tool_service.execute_ai_task(config, context)
+        return await tool_service.execute_ai_task(config, context, on_chunk=on_chunk)
     
     else:
         # Fallback for unknown types or simulation
@@ -190,9 +578,52 @@ async def get_workflow_execution(execution_id: str) -> Optional[WorkflowExecutio
         return None
     return WorkflowExecution(**execution_dict)
 
-async def get_workflow_executions(workflow_id: str, skip: int = 0, limit: int = 20) -> List[WorkflowExecution]:
+async def get_workflow_execution_output(execution: WorkflowExecution, key: str) -> bytes:
+    """
+    Get one value of an execution's output_data as JSON, reading it from the blob store if it was moved there
+
+    Raises ValueError if the execution has no output with that key.
+    """
+    if key not in execution.output_data:
+        raise ValueError(f"Execution {execution.id} has no output {key}")
+    value = execution.output_data[key]
+    if is_blob_ref(value):
+        return await blob_store.read(value[BLOB_REF_KEY])
+    return json.dumps(value, default=str).encode("utf-8")
+
+async def get_workflow_execution_status(execution_id: str) -> Optional[str]:
+    """
+    Get only the status of a workflow execution
+    """
+    execution_dict = await get_execution_status(execution_id)
+    return execution_dict["status"] if execution_dict else None
+
+async def get_workflow_id_of_execution(execution_id: str) -> Optional[str]:
+    """
+    Get only the ID of the workflow an execution belongs to
+    """
+    execution_dict = await get_execution_status(execution_id)
+    return execution_dict["workflow_id"] if execution_dict else None
+
+async def get_workflow_executions(workflow_id: str, skip: int = 0, limit: int = 20, after: Optional[Cursor] = None) -> List[WorkflowExecution]:
+    """
+    Get all executions for a specific workflow, most recently started first
+    """
+    executions_dict = await get_executions_by_workflow(workflow_id, skip, limit, after)
+    return [WorkflowExecution(**execution) for execution in executions_dict]
+
+async def get_workflow_execution_fields(workflow_id: str, fields: List[str], skip: int = 0, limit: int = 20, after: Optional[Cursor] = None) -> List[Dict[str, Any]]:
+    """
+    Get selected fields of a workflow's executions, projected in the database
+
+    id and started_at are always included so the caller can build a cursor.
+    """
+    projection = {"_id": 0, "id": 1, "started_at": 1, **{field: 1 for field in fields}}
+    return await get_executions_by_workflow(workflow_id, skip, limit, after, projection)
+
+async def get_workflow_execution_logs(execution_id: str, after_seq: int = -1, limit: int = 100) -> List[ExecutionLogEntry]:
     """
-    Get all executions for a specific workflow
+    Get a page of log entries for an execution, ordered by seq
     """
-    executions_dict = await get_executions_by_workflow(workflow_id, skip, limit)
-    return [WorkflowExecution(**execution) for execution in executions_dict]
\ No newline at end of file
+    entries = await get_execution_logs(execution_id, after_seq, limit)
+    return [ExecutionLogEntry(**entry) for entry in entries]
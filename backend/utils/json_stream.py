@@ -0,0 +1,87 @@
+"""
+Incremental parsing of JSON arrays and JSON Lines.
+
+Bytes are fed as they arrive from the network and every complete item is
+returned as soon as it has been read, so a large response never has to be
+held in memory as a whole. Only the item being read is buffered.
+"""
+
+from typing import Any, List, Optional, Tuple
+import codecs
+import json
+import re
+
+_WHITESPACE = " \t\r\n"
+
+# Characters that can still follow the digits read so far
+_NUMBER_TAIL = re.compile(r"[0-9.eE+\-]*\Z")
+
+class JSONItemParser:
+    """
+    Parser for a top-level JSON array, or for JSON Lines when the input does not start with [
+
+    feed returns (item, size) pairs where size is the item's length in characters.
+    Raises ValueError on malformed input or when one item exceeds max_item_size.
+    """
+
+    def __init__(self, max_item_size: int):
+        self.max_item_size = max_item_size
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._mode: Optional[str] = None
+        self._done = False
+
+    def feed(self, data: bytes) -> List[Tuple[Any, int]]:
+        self._buffer += self._text.decode(data)
+        return self._parse(final=False)
+
+    def close(self) -> List[Tuple[Any, int]]:
+        self._buffer += self._text.decode(b"", final=True)
+        items = self._parse(final=True)
+        if self._mode == "array" and not self._done:
+            raise ValueError("Unterminated JSON array")
+        return items
+
+    def _parse(self, final: bool) -> List[Tuple[Any, int]]:
+        items = []
+        buffer = self._buffer
+        position = 0
+        while not self._done:
+            # Skip separators between items
+            while position < len(buffer) and (buffer[position] in _WHITESPACE or (buffer[position] == "," and self._mode == "array")):
+                position += 1
+            if position >= len(buffer):
+                break
+
+            if self._mode is None:
+                if buffer[position] == "[":
+                    self._mode = "array"
+                    position += 1
+                    continue
+                self._mode = "lines"
+            if self._mode == "array" and buffer[position] == "]":
+                self._done = True
+                position += 1
+                break
+
+            try:
+                item, end = self._decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as e:
+                if final:
+                    raise ValueError(f"Invalid JSON: {e.msg}")
+                if len(buffer) - position > self.max_item_size:
+                    raise ValueError(f"JSON item larger than {self.max_item_size} characters")
+                break
+            if not final and (end == len(buffer) or (type(item) in (int, float) and _NUMBER_TAIL.match(buffer, end))):
+                # A number or literal at the end of the buffer may continue in the next
+                # chunk, e.g. "-0" followed by ".5"
+                break
+            if end - position > self.max_item_size:
+                raise ValueError(f"JSON item larger than {self.max_item_size} characters")
+            items.append((item, end - position))
+            position = end
+
+        # Drop consumed text so the buffer only holds the current item
+        self._buffer = buffer[position:]
+        return items
@@ -0,0 +1,42 @@
+"""
+Opaque cursor tokens for keyset pagination.
+
+A cursor encodes the (timestamp, id) of the last item on a page. The next
+page starts strictly after that position in (timestamp desc, id desc) order.
+"""
+
+from typing import Optional, Tuple
+from datetime import datetime
+import base64
+import json
+
+Cursor = Tuple[datetime, str]
+
+def encode_cursor(timestamp: datetime, item_id: str) -> str:
+    payload = json.dumps([timestamp.isoformat(), item_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(token: Optional[str]) -> Optional[Cursor]:
+    """
+    Decode a cursor token, raising ValueError if it is malformed
+    """
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        timestamp, item_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(timestamp), str(item_id)
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+
+def keyset_filter(field: str, cursor: Optional[Cursor]) -> dict:
+    """
+    Mongo filter selecting documents after the cursor in (field desc, id desc) order
+    """
+    if cursor is None:
+        return {}
+    timestamp, item_id = cursor
+    return {"$or": [
+        {field: {"$lt": timestamp}},
+        {field: timestamp, "id": {"$lt": item_id}}
+    ]}
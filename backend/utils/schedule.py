@@ -0,0 +1,107 @@
+"""
+Schedule specs for scheduled workflow triggers.
+
+A scheduled trigger config holds either a 5-field cron expression
+({"cron": "0 9 * * 1-5"}) or an interval ({"interval": "15m"} or
+{"interval": 900}). Times are naive UTC datetimes.
+"""
+
+from typing import Any, Dict, List, Set, Union
+from datetime import datetime, timedelta
+import re
+
+INTERVAL_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+def _parse_field(field: str, low: int, high: int) -> Set[int]:
+    values = set()
+    for part in field.split(","):
+        match = re.fullmatch(r"(\*|\d+(?:-\d+)?)(?:/(\d+))?", part)
+        if not match:
+            raise ValueError(f"Invalid cron field {field!r}")
+        span, step = match.group(1), int(match.group(2) or 1)
+        if span == "*":
+            start, end = low, high
+        elif "-" in span:
+            start, end = (int(value) for value in span.split("-"))
+        else:
+            start = end = int(span)
+            if match.group(2):
+                end = high
+        if start < low or end > high or start > end or step < 1:
+            raise ValueError(f"Cron field {field!r} out of range {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return values
+
+class CronSchedule:
+    """
+    Standard 5-field cron expression: minute hour day-of-month month day-of-week
+    """
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression {expression!r} must have 5 fields")
+        self.minutes: List[int] = sorted(_parse_field(fields[0], 0, 59))
+        self.hours: List[int] = sorted(_parse_field(fields[1], 0, 23))
+        self.days = _parse_field(fields[2], 1, 31)
+        self.months = _parse_field(fields[3], 1, 12)
+        # Both 0 and 7 mean Sunday
+        self.weekdays = {day % 7 for day in _parse_field(fields[4], 0, 7)}
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    def _day_matches(self, day: datetime) -> bool:
+        weekday = (day.weekday() + 1) % 7
+        if self.any_day and self.any_weekday:
+            return True
+        if self.any_day:
+            return weekday in self.weekdays
+        if self.any_weekday:
+            return day.day in self.days
+        # Like cron, a restricted day-of-month and day-of-week match either
+        return day.day in self.days or weekday in self.weekdays
+
+    def next_after(self, after: datetime) -> datetime:
+        start = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = start.replace(hour=0, minute=0)
+        for _ in range(366 * 5):
+            if day.month in self.months and self._day_matches(day):
+                for hour in self.hours:
+                    for minute in self.minutes:
+                        candidate = day.replace(hour=hour, minute=minute)
+                        if candidate >= start:
+                            return candidate
+            day += timedelta(days=1)
+        raise ValueError("Cron expression never fires")
+
+class IntervalSchedule:
+    """
+    Fires every fixed number of seconds
+    """
+
+    def __init__(self, interval: Union[int, float, str]):
+        if isinstance(interval, str):
+            match = re.fullmatch(r"\s*(\d+)\s*([smhd]?)\s*", interval)
+            if not match:
+                raise ValueError(f"Invalid interval {interval!r}")
+            seconds = int(match.group(1)) * INTERVAL_UNITS[match.group(2) or "s"]
+        elif isinstance(interval, (int, float)) and not isinstance(interval, bool):
+            seconds = interval
+        else:
+            raise ValueError(f"Invalid interval {interval!r}")
+        if seconds <= 0:
+            raise ValueError("Interval must be positive")
+        self.interval = timedelta(seconds=seconds)
+
+    def next_after(self, after: datetime) -> datetime:
+        return after + self.interval
+
+def parse_schedule(config: Dict[str, Any]) -> Union[CronSchedule, IntervalSchedule]:
+    """
+    Build the schedule described by a scheduled trigger config, raising ValueError if invalid
+    """
+    if config.get("cron"):
+        return CronSchedule(str(config["cron"]))
+    if config.get("interval"):
+        return IntervalSchedule(config["interval"])
+    raise ValueError("Scheduled trigger requires a cron or interval setting")
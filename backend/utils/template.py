@@ -0,0 +1,138 @@
+"""
+Compiled {{variable}} templates used to render action configs.
+
+Templates are parsed once into literal segments and pre-split variable paths,
+so rendering is a join over resolved segments instead of a regex pass with a
+Python callback on every execution.
+"""
+
+from typing import Dict, Any, List, Optional, Tuple, Union
+from functools import lru_cache
+import re
+from ..core.config import settings
+
+VARIABLE_PATTERN = re.compile(r'{{(.*?)}}')
+
+_MISSING = object()
+
+class Placeholder:
+    """
+    A single {{variable}} reference with its dotted path already split
+    """
+    __slots__ = ("raw", "name", "path")
+
+    def __init__(self, raw: str, name: str):
+        self.raw = raw
+        self.name = name
+        self.path: Optional[Tuple[str, ...]] = tuple(name.split(".")) if "." in name else None
+
+    def resolve(self, context: Dict[str, Any]) -> str:
+        if self.path is None:
+            value = context.get(self.name, _MISSING)
+            return self.raw if value is _MISSING else str(value)
+
+        # The root lookup goes through get so any mapping works as the context
+        value = context.get(self.path[0], _MISSING)
+        if value is _MISSING:
+            return self.raw
+        for part in self.path[1:]:
+            if isinstance(value, dict) and part in value:
+                value = value[part]
+            else:
+                # If path doesn't exist, keep the original placeholder
+                return self.raw
+        return str(value)
+
+class Template:
+    """
+    A string compiled into literal segments and placeholders
+    """
+    __slots__ = ("source", "segments", "is_literal")
+
+    def __init__(self, source: str):
+        self.source = source
+        self.segments: List[Union[str, Placeholder]] = []
+        position = 0
+        for match in VARIABLE_PATTERN.finditer(source):
+            if match.start() > position:
+                self.segments.append(source[position:match.start()])
+            self.segments.append(Placeholder(match.group(0), match.group(1).strip()))
+            position = match.end()
+        if position < len(source):
+            self.segments.append(source[position:])
+        self.is_literal = not any(isinstance(segment, Placeholder) for segment in self.segments)
+
+    def render(self, context: Dict[str, Any]) -> str:
+        if self.is_literal:
+            return self.source
+        return "".join([
+            segment if segment.__class__ is str else segment.resolve(context)
+            for segment in self.segments
+        ])
+
+@lru_cache(maxsize=settings.TEMPLATE_CACHE_SIZE)
+def compile_template(text: str) -> Template:
+    """
+    Compile a template string, reusing the result for identical strings
+    """
+    return Template(text)
+
+class CompiledDict:
+    """
+    A nested config dict with every string value compiled
+
+    Mirrors the replacement rules of ToolService._replace_variables_in_dict:
+    dicts are rendered recursively, lists render their dict and string items,
+    and every other value is copied as is.
+    """
+    __slots__ = ("items",)
+
+    def __init__(self, data: Dict[str, Any]):
+        self.items = [(key, _compile_value(value, in_list=False)) for key, value in data.items()]
+
+    def render(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            key: value if value.__class__ is str else value.render(context)
+            for key, value in self.items
+        }
+
+class _CompiledList:
+    __slots__ = ("items",)
+
+    def __init__(self, data: List[Any]):
+        self.items = [_compile_value(item, in_list=True) for item in data]
+
+    def render(self, context: Dict[str, Any]) -> List[Any]:
+        return [item if item.__class__ is str else item.render(context) for item in self.items]
+
+class _Constant:
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def render(self, context: Dict[str, Any]) -> Any:
+        return self.value
+
+def _compile_value(value: Any, in_list: bool):
+    if isinstance(value, str):
+        template = compile_template(value)
+        return template.source if template.is_literal else template
+    if isinstance(value, dict):
+        # Empty dicts are returned unchanged rather than copied
+        return CompiledDict(value) if value else _Constant(value)
+    if isinstance(value, list) and not in_list:
+        return _CompiledList(value)
+    return _Constant(value)
+
+def compile_config(data: Dict[str, Any]) -> CompiledDict:
+    """
+    Compile a config dict
+
+    Configs are not cached: they are reloaded with their workflow on every
+    execution and may be changed in place, so an identity cache can return a
+    stale tree, and hashing a config by content costs as much as compiling
+    it. Their strings go through the compile_template cache, so compiling a
+    config only builds the small tree.
+    """
+    return CompiledDict(data)
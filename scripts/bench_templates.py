@@ -0,0 +1,93 @@
+"""
+Micro-benchmark for rendering action configs with compiled templates.
+
+Compares the compiled renderer used by ToolService against the previous
+regex-per-call implementation on a large nested request body. Configs are
+compiled on every render, strings come from the compile_template cache;
+"render only" shows what caching whole compiled configs would add.
+
+Usage: python -m scripts.bench_templates
+"""
+
+import re
+import timeit
+from typing import Dict, Any
+
+from backend.services.tool_service import tool_service
+from backend.utils.template import compile_config
+
+def regex_replace_variables(text: str, context: Dict[str, Any]) -> str:
+    if not text or not isinstance(text, str):
+        return text
+
+    def replace_var(match):
+        var_name = match.group(1).strip()
+        if "." in var_name:
+            parts = var_name.split(".")
+            value = context
+            for part in parts:
+                if isinstance(value, dict) and part in value:
+                    value = value[part]
+                else:
+                    return match.group(0)
+            return str(value)
+        else:
+            return str(context.get(var_name, match.group(0)))
+
+    return re.sub(r'{{(.*?)}}', replace_var, text)
+
+def regex_replace_variables_in_dict(data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+    if not data or not isinstance(data, dict):
+        return data
+
+    result = {}
+    for key, value in data.items():
+        if isinstance(value, str):
+            result[key] = regex_replace_variables(value, context)
+        elif isinstance(value, dict):
+            result[key] = regex_replace_variables_in_dict(value, context)
+        elif isinstance(value, list):
+            result[key] = [
+                regex_replace_variables_in_dict(item, context) if isinstance(item, dict)
+                else regex_replace_variables(item, context) if isinstance(item, str)
+                else item
+                for item in value
+            ]
+        else:
+            result[key] = value
+    return result
+
+def build_body(fan_out: int = 8, depth: int = 3) -> Dict[str, Any]:
+    if depth == 0:
+        return {
+            "user": "{{user.name}} <{{user.email}}>",
+            "greeting": "Hello {{ user.name }}, your order {{order.id}} has shipped",
+            "static": "no variables here",
+            "missing": "{{does.not.exist}}",
+            "count": 3,
+            "tags": ["{{order.status}}", "fixed", {"nested": "{{order.id}}"}],
+        }
+    return {f"section_{i}": build_body(fan_out, depth - 1) for i in range(fan_out)}
+
+def main():
+    body = build_body()
+    context = {
+        "user": {"name": "Ada", "email": "ada@example.com"},
+        "order": {"id": "A-1001", "status": "shipped"},
+    }
+
+    assert tool_service._replace_variables_in_dict(body, context) == regex_replace_variables_in_dict(body, context)
+
+    runs = 200
+    regex_time = timeit.timeit(lambda: regex_replace_variables_in_dict(body, context), number=runs)
+    compiled_time = timeit.timeit(lambda: tool_service._replace_variables_in_dict(body, context), number=runs)
+    compiled = compile_config(body)
+    render_time = timeit.timeit(lambda: compiled.render(context), number=runs)
+
+    print(f"regex:       {regex_time / runs * 1000:.3f} ms per render")
+    print(f"compiled:    {compiled_time / runs * 1000:.3f} ms per render")
+    print(f"render only: {render_time / runs * 1000:.3f} ms per render")
+    print(f"speedup:     {regex_time / compiled_time:.1f}x")
+
+if __name__ == "__main__":
+    main()
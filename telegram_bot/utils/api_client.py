@@ -1,4 +1,6 @@
+import asyncio
 import httpx
+import json
 import logging
 from typing import List, Dict, Any, Optional
 from ..config import settings
@@ -62,8 +64,9 @@ class APIClient:
         try:
             headers = self._get_headers(telegram_id)
             response = await self.client.get(
-                f"{self.base_url}/workflows",
-                headers=headers
+                f"{self.base_url}/workflows/",
+                headers=headers,
+                params={"view": "summary"}
             )
             response.raise_for_status()
             return response.json()
@@ -101,7 +104,7 @@ class APIClient:
             raise
 
     async def execute_workflow(self, telegram_id: str, workflow_id: str, input_data: Optional[Dict] = None) -> Dict[str, Any]:
-        """Execute a workflow."""
+        """Queue a workflow execution and wait for it to finish."""
         try:
             headers = self._get_headers(telegram_id)
             response = await self.client.post(
@@ -110,11 +113,48 @@ class APIClient:
                 json=input_data or {}
             )
             response.raise_for_status()
-            return response.json()
+            execution = await self.wait_for_execution(telegram_id, response.json())
+            execution["logs"] = await self.get_execution_logs(telegram_id, execution["id"])
+            return execution
         except Exception as e:
             logger.error(f"Error executing workflow: {e}")
             raise
 
+    async def wait_for_execution(self, telegram_id: str, execution: Dict[str, Any], timeout: float = 60.0, interval: float = 1.0) -> Dict[str, Any]:
+        """Wait until a queued execution completes, fails or the timeout expires."""
+        if execution.get("status") not in ("pending", "running"):
+            return execution
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        try:
+            await asyncio.wait_for(self.follow_execution_events(telegram_id, execution["id"]), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        except Exception as e:
+            # Older backends have no event stream, fall back to polling
+            logger.warning(f"Execution event stream unavailable, polling instead: {e}")
+            while execution.get("status") in ("pending", "running") and loop.time() < deadline:
+                await asyncio.sleep(interval)
+                execution = await self.get_execution_status(telegram_id, execution["id"])
+            return execution
+        return await self.get_execution_status(telegram_id, execution["id"])
+
+    async def follow_execution_events(self, telegram_id: str, execution_id: str) -> List[Dict[str, Any]]:
+        """Read the execution's progress stream until it ends and return its events."""
+        headers = self._get_headers(telegram_id)
+        events = []
+        async with self.client.stream(
+            "GET",
+            f"{self.base_url}/execute/{execution_id}/events",
+            headers=headers,
+            timeout=httpx.Timeout(30.0, read=None)
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line.startswith("data:"):
+                    events.append(json.loads(line[5:]))
+        return events
+
     async def get_execution_status(self, telegram_id: str, execution_id: str) -> Dict[str, Any]:
         """Get execution status."""
         try:
@@ -129,6 +169,21 @@ class APIClient:
             logger.error(f"Error getting execution status: {e}")
             raise
 
+    async def get_execution_logs(self, telegram_id: str, execution_id: str, after_seq: int = -1, limit: int = 100) -> List[Dict[str, Any]]:
+        """Get a page of execution log entries."""
+        try:
+            headers = self._get_headers(telegram_id)
+            response = await self.client.get(
+                f"{self.base_url}/execute/{execution_id}/logs",
+                headers=headers,
+                params={"after_seq": after_seq, "limit": limit}
+            )
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            logger.error(f"Error getting execution logs: {e}")
+            raise
+
     async def delete_workflow(self, telegram_id: str, workflow_id: str) -> None:
         """Delete a workflow."""
         try:
@@ -0,0 +1,57 @@
+"""
+Tests for AI result and workflow skeleton caches.
+"""
+
+import pytest
+
+from backend.core.config import settings
+from backend.services.ai_cache import WorkflowSkeletonCache, normalize_description
+
+@pytest.mark.parametrize("first,second", [
+    ("Send an email from alice to bob", "send email to alice from bob"),
+    ("Post to Slack when it is on", "Post to Slack when it is off"),
+    ("Post to Slack when it is on", "Post to Slack when it is at"),
+    ("Post to Slack when it is on", "Post to Slack when it is"),
+    ("Notify me at 9am", "Notify me by 9am"),
+    ("Copy rows in sheet A to sheet B", "Copy rows to sheet A in sheet B"),
+    ("Email alice and bob", "Email alice or bob"),
+    ("Email alice every day", "Email alice day"),
+])
+def test_normalize_keeps_meaning(first, second):
+    """
+    Test that descriptions that differ in prepositions, direction or logic do not collide.
+    """
+    assert normalize_description(first) != normalize_description(second)
+
+@pytest.mark.parametrize("first,second", [
+    ("Send an email to bob", "send the email to bob"),
+    ("Could you please send an email to bob?", "Send email to Bob."),
+    ("I want a workflow that posts to Slack", "A workflow that posts to slack!"),
+])
+def test_normalize_drops_filler(first, second):
+    """
+    Test that articles, politeness filler, case and punctuation do not change the key.
+    """
+    assert normalize_description(first) == normalize_description(second)
+
+def test_skeleton_cache_no_swapped_hit(monkeypatch):
+    """
+    Test that a description with sender and recipient swapped misses the cache.
+    """
+    monkeypatch.setattr(settings, "WORKFLOW_CACHE_SIMILARITY_THRESHOLD", None)
+    cache = WorkflowSkeletonCache()
+    cache.set("Send an email from alice to bob", {"name": "alice to bob"})
+
+    assert cache.get("send the email from alice to bob") == {"name": "alice to bob"}
+    assert cache.get("send email to alice from bob") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+def test_skeleton_cache_returns_copies():
+    """
+    Test that changing a returned skeleton does not change the cached one.
+    """
+    cache = WorkflowSkeletonCache()
+    cache.set("Post to Slack", {"actions": [{"name": "post"}]})
+    cache.get("post to slack")["actions"].append({"name": "extra"})
+    assert cache.get("post to slack") == {"actions": [{"name": "post"}]}
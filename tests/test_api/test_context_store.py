@@ -0,0 +1,191 @@
+"""
+Tests for the per-execution context store.
+"""
+
+import asyncio
+import json
+import pytest
+
+from backend.services import context_store
+from backend.services.context_store import ExecutionContext, BLOB_REF_KEY, approx_size, is_blob_ref
+
+class FakeWriter:
+    def __init__(self, store, filename, fail):
+        self.store = store
+        self.filename = filename
+        self.fail = fail
+        self.chunks = []
+        self.aborted = False
+
+    async def write(self, data):
+        if self.fail:
+            raise IOError("disk full")
+        self.chunks.append(data)
+
+    async def close(self):
+        blob_id = str(len(self.store.blobs))
+        self.store.blobs[blob_id] = b"".join(self.chunks)
+        return {"id": blob_id, "filename": self.filename}
+
+    async def abort(self):
+        self.aborted = True
+
+class FakeBlobStore:
+    def __init__(self):
+        self.blobs = {}
+        self.writers = []
+        self.retained = []
+        self.fail = False
+
+    def create(self, filename, content_type=None):
+        writer = FakeWriter(self, filename, self.fail)
+        self.writers.append(writer)
+        return writer
+
+    async def read(self, blob_ref):
+        return self.blobs[blob_ref["id"]]
+
+    async def retain(self, blob_refs):
+        self.retained.extend(blob_ref["id"] for blob_ref in blob_refs)
+
+@pytest.fixture
+def blobs(monkeypatch):
+    store = FakeBlobStore()
+    monkeypatch.setattr(context_store, "blob_store", store)
+    return store
+
+def test_approx_size_stops_at_limit():
+    """
+    Test that measuring a large value stops once it passes the limit.
+    """
+    small = {"a": "xyz"}
+    assert approx_size(small, 1000) == approx_size(small, float("inf"))
+    big = ["x" * 100] * 1000
+    assert 100 < approx_size(big, 100) < 300
+
+def test_small_values_stay_inline(blobs):
+    """
+    Test that values below the threshold are persisted as they are.
+    """
+    store = ExecutionContext({"input": 1}, spill_threshold=1000)
+    persisted = asyncio.run(store.add("a1", {"small": "value"}))
+    assert persisted == {"small": "value"}
+    assert blobs.writers == []
+    assert store.size > approx_size({"input": 1}, float("inf"))
+
+def test_large_values_spill(blobs):
+    """
+    Test that a value above the threshold is written once to the blob store and referenced.
+    """
+    store = ExecutionContext({}, spill_threshold=100)
+    large = {"rows": ["x" * 50] * 10}
+    persisted = asyncio.run(store.add("a1", {"large": large, "small": 1}))
+
+    assert is_blob_ref(persisted["large"])
+    assert persisted["small"] == 1
+    assert len(blobs.writers) == 1
+    assert blobs.writers[0].filename == "context/large"
+    assert json.loads(blobs.blobs[persisted["large"][BLOB_REF_KEY]["id"]]) == large
+    # Running actions still read the value itself
+    assert store.view(["a1"])["large"] == large
+
+def test_spill_failure_keeps_value_inline(blobs):
+    """
+    Test that a value is kept inline when writing it to the blob store fails.
+    """
+    blobs.fail = True
+    store = ExecutionContext({}, spill_threshold=10)
+    persisted = asyncio.run(store.add("a1", {"large": "x" * 100}))
+    assert persisted == {"large": "x" * 100}
+    assert blobs.writers[0].aborted
+
+def test_view_precedence():
+    """
+    Test that later ancestors win over earlier ones and over the input data, and writes stay local.
+    """
+    store = ExecutionContext({"value": "input", "only_input": 1})
+    asyncio.run(store.add("a1", {"value": "a1"}))
+    asyncio.run(store.add("a2", {"value": "a2"}))
+
+    view = store.view(["a1", "a2"])
+    assert view["value"] == "a2"
+    assert view["only_input"] == 1
+    assert store.view(["a1"])["value"] == "a1"
+    assert store.view([])["value"] == "input"
+
+    view["value"] = "written"
+    assert store.results["a2"] == {"value": "a2"}
+    assert store.input_data["value"] == "input"
+
+def test_release_trims_and_updates_size():
+    """
+    Test that releasing a result drops it and keeps only the declared outputs.
+    """
+    store = ExecutionContext({})
+    start = store.size
+    asyncio.run(store.add("a1", {"keep": "x" * 100, "drop": "y" * 1000}))
+    peak = store.size
+    assert store.peak_size == peak
+
+    store.release("a1", ["keep"])
+    assert "a1" not in store.results
+    assert start < store.size < peak
+    assert store.peak_size == peak
+    assert asyncio.run(store.output(["a1"], ["keep", "drop"])) == {"keep": "x" * 100}
+
+    store.release("a1", [])
+    assert store.size == start
+
+def test_release_spilled_value(blobs):
+    """
+    Test that a spilled value no longer counts towards the live size once released.
+    """
+    store = ExecutionContext({}, spill_threshold=100)
+    start = store.size
+    asyncio.run(store.add("a1", {"large": "x" * 1000}))
+    assert store.size > start + 1000
+
+    store.release("a1")
+    assert store.size == start
+    # The reference is still stored in output_data
+    assert is_blob_ref(asyncio.run(store.output(["a1"]))["large"])
+
+def test_restore_reads_blobs(blobs):
+    """
+    Test that a checkpointed result with blob references is restored with the values themselves.
+    """
+    first = ExecutionContext({}, spill_threshold=100)
+    persisted = asyncio.run(first.add("a1", {"large": "x" * 1000, "small": 2}))
+    assert is_blob_ref(persisted["large"])
+
+    resumed = ExecutionContext({}, spill_threshold=100)
+    asyncio.run(resumed.restore("a1", persisted))
+    assert resumed.results["a1"] == {"large": "x" * 1000, "small": 2}
+    assert resumed.view(["a1"])["large"] == "x" * 1000
+    assert resumed.size == first.size
+    # Restoring does not write the values again
+    assert len(blobs.writers) == 1
+
+def test_output_keeps_blob_refs(blobs):
+    """
+    Test that output_data refers to spilled values and retains their blobs, later actions taking precedence.
+    """
+    store = ExecutionContext({"input": 1, "value": "input"}, spill_threshold=100)
+    asyncio.run(store.add("a1", {"value": "a1", "large": ["z" * 50] * 10, "unused": "y" * 200}))
+    asyncio.run(store.add("a2", {"value": "a2"}))
+
+    output = asyncio.run(store.output(["a1", "a2"], ["input", "value", "large"]))
+    assert output["input"] == 1
+    assert output["value"] == "a2"
+    blob_id = output["large"][BLOB_REF_KEY]["id"]
+    assert json.loads(blobs.blobs[blob_id]) == ["z" * 50] * 10
+    # Only blobs referenced from output_data outlive BLOB_TTL_DAYS
+    assert blobs.retained == [blob_id]
+
+def test_output_declared_only():
+    """
+    Test that only declared outputs are returned, skipping ones that were never produced.
+    """
+    store = ExecutionContext({"input": 1})
+    asyncio.run(store.add("a1", {"result": 2, "other": 3}))
+    assert asyncio.run(store.output(["a1"], ["result", "input", "missing"])) == {"result": 2, "input": 1}
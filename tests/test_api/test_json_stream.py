@@ -0,0 +1,107 @@
+"""
+Tests for incremental JSON array and JSON Lines parsing.
+"""
+
+import json
+import pytest
+
+from backend.utils.json_stream import JSONItemParser
+
+def parse_chunks(chunks, max_item_size=1000):
+    parser = JSONItemParser(max_item_size)
+    items = []
+    for chunk in chunks:
+        items.extend(item for item, _ in parser.feed(chunk))
+    items.extend(item for item, _ in parser.close())
+    return items
+
+def split_every(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+ITEMS = [{"id": 1, "name": "café"}, 12345, -0.5, "text, with ] and }", True, None, [1, [2, 3]], {"nested": {"a": []}}]
+
+def test_array_in_one_chunk():
+    """
+    Test parsing a complete JSON array.
+    """
+    assert parse_chunks([json.dumps(ITEMS).encode()]) == ITEMS
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7])
+def test_array_split_mid_token(size):
+    """
+    Test that items split across chunks anywhere, including inside numbers,
+    literals, strings and multi-byte characters, are parsed once complete.
+    """
+    data = json.dumps(ITEMS, ensure_ascii=False).encode("utf-8")
+    assert parse_chunks(split_every(data, size)) == ITEMS
+
+@pytest.mark.parametrize("size", [1, 5])
+def test_json_lines_split_mid_token(size):
+    """
+    Test JSON Lines input split across chunks.
+    """
+    data = "\n".join(json.dumps(item, ensure_ascii=False) for item in ITEMS).encode("utf-8")
+    assert parse_chunks(split_every(data, size)) == ITEMS
+
+def test_number_at_chunk_end_waits_for_more():
+    """
+    Test that a number at the end of a chunk is not returned before it is complete.
+    """
+    parser = JSONItemParser(100)
+    assert parser.feed(b"12") == []
+    assert parser.feed(b"34\n5") == [(1234, 4)]
+    assert parser.close() == [(5, 1)]
+
+    parser = JSONItemParser(100)
+    assert parser.feed(b"[-0") == []
+    assert parser.feed(b".5, 1e") == [(-0.5, 4)]
+    assert parser.feed(b"3]") == [(1000.0, 3)]
+
+def test_items_returned_as_they_complete():
+    """
+    Test that each item is returned from the feed call that completes it, with its size.
+    """
+    parser = JSONItemParser(100)
+    assert parser.feed(b'[{"a": 1}, {"b"') == [({"a": 1}, 8)]
+    assert parser.feed(b': 2}]') == [({"b": 2}, 8)]
+    assert parser.close() == []
+
+def test_empty_array_and_input():
+    """
+    Test empty arrays and empty input.
+    """
+    assert parse_chunks([b"[", b" ]"]) == []
+    assert parse_chunks([b""]) == []
+
+def test_oversized_item_split_across_chunks():
+    """
+    Test that an item growing past max_item_size raises before it is complete.
+    """
+    parser = JSONItemParser(10)
+    parser.feed(b'["short", "')
+    with pytest.raises(ValueError, match="larger than 10"):
+        parser.feed(b"x" * 20)
+
+def test_oversized_item_in_one_chunk():
+    """
+    Test that a complete item larger than max_item_size raises too.
+    """
+    parser = JSONItemParser(10)
+    with pytest.raises(ValueError, match="larger than 10"):
+        parser.feed(b'["' + b"x" * 20 + b'"]')
+
+def test_unterminated_array():
+    """
+    Test that an array without its closing bracket is an error.
+    """
+    parser = JSONItemParser(100)
+    assert parser.feed(b"[1, 2") == [(1, 1)]
+    with pytest.raises(ValueError, match="Unterminated"):
+        parser.close()
+
+def test_invalid_json():
+    """
+    Test that malformed input raises ValueError.
+    """
+    with pytest.raises(ValueError, match="Invalid JSON"):
+        parse_chunks([b'{"a": }'])
@@ -0,0 +1,53 @@
+"""
+Tests for keyset pagination cursors.
+"""
+
+import pytest
+from datetime import datetime
+
+from backend.utils.pagination import encode_cursor, decode_cursor, keyset_filter
+
+@pytest.mark.parametrize("timestamp,item_id", [
+    (datetime(2024, 1, 2, 3, 4, 5, 678901), "6f1c2b9e-0000-4000-8000-000000000000"),
+    (datetime(2024, 1, 2), "a"),
+    (datetime(1999, 12, 31, 23, 59, 59), "id with spaces/and+symbols=")
+])
+def test_cursor_round_trip(timestamp, item_id):
+    """
+    Test that a decoded cursor gives back the encoded position.
+    """
+    token = encode_cursor(timestamp, item_id)
+    assert decode_cursor(token) == (timestamp, item_id)
+
+def test_cursor_is_url_safe():
+    """
+    Test that cursor tokens can be used in a query string without escaping.
+    """
+    token = encode_cursor(datetime(2024, 1, 1), "?&=/+" * 10)
+    assert all(character.isalnum() or character in "-_" for character in token)
+
+def test_empty_cursor():
+    """
+    Test that a missing cursor means the first page.
+    """
+    assert decode_cursor(None) is None
+    assert decode_cursor("") is None
+
+@pytest.mark.parametrize("token", ["not a cursor", "e30", encode_cursor(datetime(2024, 1, 1), "a")[:-4] + "!!!!"])
+def test_invalid_cursor(token):
+    """
+    Test that malformed tokens raise ValueError.
+    """
+    with pytest.raises(ValueError, match="Invalid pagination cursor"):
+        decode_cursor(token)
+
+def test_keyset_filter():
+    """
+    Test that the filter selects documents strictly after the cursor in (field desc, id desc) order.
+    """
+    timestamp = datetime(2024, 1, 1)
+    assert keyset_filter("updated_at", None) == {}
+    assert keyset_filter("updated_at", (timestamp, "b")) == {"$or": [
+        {"updated_at": {"$lt": timestamp}},
+        {"updated_at": timestamp, "id": {"$lt": "b"}}
+    ]}
@@ -0,0 +1,161 @@
+"""
+Tests for retry policies and circuit breakers.
+"""
+
+import asyncio
+import pytest
+
+from backend.core.config import settings
+from backend.services import resilience
+from backend.services.resilience import CircuitBreakerRegistry, CircuitOpenError, RetryPolicy, RetryableError
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(resilience.time, "monotonic", fake)
+    monkeypatch.setattr(settings, "CIRCUIT_BREAKER_FAILURE_THRESHOLD", 3)
+    monkeypatch.setattr(settings, "CIRCUIT_BREAKER_RESET_TIMEOUT", 30.0)
+    return fake
+
+def test_breaker_opens_after_threshold(clock):
+    """
+    Test that consecutive failures open the circuit and calls then fail fast.
+    """
+    breakers = CircuitBreakerRegistry()
+    for _ in range(2):
+        breakers.record_failure("api.example.com")
+        breakers.before_call("api.example.com")
+    breakers.record_failure("api.example.com")
+
+    with pytest.raises(CircuitOpenError):
+        breakers.before_call("api.example.com")
+    # Other hosts are not affected
+    breakers.before_call("other.example.com")
+    stats = breakers.stats()
+    assert stats["rejected"] == 1
+    assert stats["hosts"]["api.example.com"] == {"state": "open", "failures": 3}
+
+def test_success_resets_failures(clock):
+    """
+    Test that a success forgets earlier failures.
+    """
+    breakers = CircuitBreakerRegistry()
+    breakers.record_failure("api.example.com")
+    breakers.record_failure("api.example.com")
+    breakers.record_success("api.example.com")
+    breakers.record_failure("api.example.com")
+    breakers.before_call("api.example.com")
+    assert breakers.stats()["hosts"]["api.example.com"]["failures"] == 1
+
+def test_half_open_trial_success_closes(clock):
+    """
+    Test that after reset_timeout one trial call is let through and its success closes the circuit.
+    """
+    breakers = CircuitBreakerRegistry()
+    for _ in range(3):
+        breakers.record_failure("api.example.com")
+    clock.now += 30
+    assert breakers.stats()["hosts"]["api.example.com"]["state"] == "half_open"
+
+    breakers.before_call("api.example.com")
+    # Only one trial at a time
+    with pytest.raises(CircuitOpenError):
+        breakers.before_call("api.example.com")
+    breakers.record_success("api.example.com")
+    breakers.before_call("api.example.com")
+    assert breakers.stats()["hosts"] == {}
+
+def test_half_open_trial_failure_reopens(clock):
+    """
+    Test that a failed trial call opens the circuit for another reset_timeout.
+    """
+    breakers = CircuitBreakerRegistry()
+    for _ in range(3):
+        breakers.record_failure("api.example.com")
+    clock.now += 30
+    breakers.before_call("api.example.com")
+    breakers.record_failure("api.example.com")
+
+    clock.now += 29
+    with pytest.raises(CircuitOpenError):
+        breakers.before_call("api.example.com")
+    clock.now += 1
+    breakers.before_call("api.example.com")
+
+def test_abandoned_trial_is_replaced(clock):
+    """
+    Test that a trial call that never reports back does not keep the circuit open forever.
+    """
+    breakers = CircuitBreakerRegistry()
+    for _ in range(3):
+        breakers.record_failure("api.example.com")
+    clock.now += 30
+    breakers.before_call("api.example.com")
+    clock.now += 30
+    breakers.before_call("api.example.com")
+
+@pytest.mark.parametrize("config", [{"retry": -1}, {"retry": 11}, {"retry": True}, {"retry": "3"}, {"retry": {"backoff": -1}}, {"deadline": 0}])
+def test_retry_policy_invalid(config):
+    """
+    Test that invalid retry settings are rejected.
+    """
+    with pytest.raises(ValueError):
+        RetryPolicy(config)
+
+def test_retry_policy_idempotency():
+    """
+    Test which calls are treated as idempotent.
+    """
+    assert RetryPolicy({}).is_idempotent("GET")
+    assert not RetryPolicy({}).is_idempotent("POST")
+    assert RetryPolicy({"idempotency_key": "k"}).is_idempotent("POST")
+    assert not RetryPolicy({"idempotent": False}).is_idempotent("GET")
+
+def test_retry_policy_retries_until_success():
+    """
+    Test that RetryableError is retried up to the number of attempts.
+    """
+    calls = []
+
+    async def attempt():
+        calls.append(1)
+        if len(calls) < 3:
+            raise RetryableError("try again")
+        return "ok"
+
+    policy = RetryPolicy({"retry": {"attempts": 3, "backoff": 0, "jitter": 0}})
+    assert asyncio.run(policy.call(attempt)) == "ok"
+    assert len(calls) == 3
+
+def test_retry_policy_non_idempotent_not_resent():
+    """
+    Test that a non-idempotent call is only retried when the request never reached the server.
+    """
+    calls = []
+
+    async def attempt():
+        calls.append(1)
+        raise RetryableError("server error", safe_to_resend=len(calls) == 1)
+
+    policy = RetryPolicy({"retry": {"attempts": 5, "backoff": 0, "jitter": 0}})
+    with pytest.raises(RetryableError):
+        asyncio.run(policy.call(attempt, idempotent=False))
+    assert len(calls) == 2
+
+def test_retry_policy_deadline():
+    """
+    Test that the deadline bounds all attempts together.
+    """
+    async def attempt():
+        await asyncio.sleep(1)
+
+    policy = RetryPolicy({"retry": 3, "deadline": 0.05})
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(policy.call(attempt))
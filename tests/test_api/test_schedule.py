@@ -0,0 +1,142 @@
+"""
+Tests for scheduled trigger specs.
+"""
+
+import pytest
+from datetime import datetime
+
+from backend.utils.schedule import CronSchedule, IntervalSchedule, parse_schedule
+from backend.services.scheduler_service import WorkflowScheduler, validate_schedule_config
+
+def test_cron_next_after():
+    """
+    Test that a cron expression fires at the next matching minute.
+    """
+    schedule = CronSchedule("30 9 * * *")
+    assert schedule.next_after(datetime(2024, 1, 1, 9, 0)) == datetime(2024, 1, 1, 9, 30)
+    assert schedule.next_after(datetime(2024, 1, 1, 9, 30)) == datetime(2024, 1, 2, 9, 30)
+
+def test_cron_steps_ranges_and_lists():
+    """
+    Test step, range and list fields.
+    """
+    schedule = CronSchedule("*/15 8-9 * * *")
+    assert schedule.next_after(datetime(2024, 1, 1, 8, 50)) == datetime(2024, 1, 1, 9, 0)
+    assert schedule.next_after(datetime(2024, 1, 1, 9, 45)) == datetime(2024, 1, 2, 8, 0)
+
+    schedule = CronSchedule("0 0 1,15 * *")
+    assert schedule.next_after(datetime(2024, 1, 2)) == datetime(2024, 1, 15)
+
+def test_cron_weekdays():
+    """
+    Test day-of-week fields, where both 0 and 7 mean Sunday.
+    """
+    # 2024-01-06 is a Saturday
+    weekdays = CronSchedule("0 9 * * 1-5")
+    assert weekdays.next_after(datetime(2024, 1, 6, 12, 0)) == datetime(2024, 1, 8, 9, 0)
+    assert CronSchedule("0 0 * * 7").next_after(datetime(2024, 1, 6)) == datetime(2024, 1, 7)
+    assert CronSchedule("0 0 * * 0").next_after(datetime(2024, 1, 6)) == datetime(2024, 1, 7)
+
+def test_cron_day_of_month_or_weekday():
+    """
+    Test that a restricted day-of-month and day-of-week match either, like cron.
+    """
+    schedule = CronSchedule("0 0 20 * 1")
+    # Monday 2024-01-08 comes before the 20th
+    assert schedule.next_after(datetime(2024, 1, 6)) == datetime(2024, 1, 8)
+
+def test_cron_leap_day():
+    """
+    Test a cron that only fires on 29 February.
+    """
+    schedule = CronSchedule("0 0 29 2 *")
+    assert schedule.next_after(datetime(2024, 3, 1)) == datetime(2028, 2, 29)
+
+def test_cron_never_fires():
+    """
+    Test that a cron expression that never matches raises ValueError.
+    """
+    schedule = CronSchedule("0 0 30 2 *")
+    with pytest.raises(ValueError, match="never fires"):
+        schedule.next_after(datetime(2024, 1, 1))
+
+@pytest.mark.parametrize("expression", ["* * * *", "60 * * * *", "* 24 * * *", "0 0 0 * *", "5-1 * * * *", "*/0 * * * *", "a * * * *"])
+def test_cron_invalid(expression):
+    """
+    Test that malformed or out of range cron expressions are rejected.
+    """
+    with pytest.raises(ValueError):
+        CronSchedule(expression)
+
+@pytest.mark.parametrize("interval,seconds", [(900, 900), ("15m", 900), ("2h", 7200), ("1d", 86400), ("45", 45), (" 30 s ", 30)])
+def test_interval(interval, seconds):
+    """
+    Test interval parsing in seconds and with units.
+    """
+    schedule = IntervalSchedule(interval)
+    assert (schedule.next_after(datetime(2024, 1, 1)) - datetime(2024, 1, 1)).total_seconds() == seconds
+
+@pytest.mark.parametrize("interval", [0, -5, "0m", "15x", "m", True, [60], {"minutes": 5}])
+def test_interval_invalid(interval):
+    """
+    Test that non-positive or malformed intervals are rejected.
+    """
+    with pytest.raises(ValueError):
+        IntervalSchedule(interval)
+
+def test_parse_schedule():
+    """
+    Test building a schedule from a trigger config.
+    """
+    assert isinstance(parse_schedule({"cron": "0 * * * *"}), CronSchedule)
+    assert isinstance(parse_schedule({"interval": "5m"}), IntervalSchedule)
+    with pytest.raises(ValueError):
+        parse_schedule({})
+
+def test_validate_schedule_config_rejects_never_firing_cron():
+    """
+    Test that saving a workflow with a cron that never fires is rejected.
+    """
+    validate_schedule_config({"cron": "0 0 29 2 *"})
+    with pytest.raises(ValueError, match="never fires"):
+        validate_schedule_config({"cron": "0 0 30 2 *"})
+    with pytest.raises(ValueError, match="catch_up"):
+        validate_schedule_config({"interval": 60, "catch_up": "sometimes"})
+
+@pytest.mark.parametrize("config", [
+    {"interval": "5m", "jitter": "abc"},
+    {"interval": "5m", "jitter": -1},
+    {"interval": "5m", "jitter": True},
+    {"interval": "5m", "input": "abc"},
+    {"interval": "5m", "input": [1, 2]},
+    {"interval": 30},
+    {"interval": "59s"},
+    {"interval": [60]},
+])
+def test_validate_schedule_config_invalid(config):
+    """
+    Test that invalid jitter, input and too short intervals are rejected.
+    """
+    with pytest.raises(ValueError):
+        validate_schedule_config(config)
+
+@pytest.mark.parametrize("config", [
+    {"interval": "5m", "jitter": 30, "input": {"report": "daily"}},
+    {"interval": 60, "jitter": 0.5},
+    {"cron": "* * * * *", "jitter": 0, "input": None},
+])
+def test_validate_schedule_config_valid(config):
+    """
+    Test that valid scheduled trigger configs are accepted.
+    """
+    validate_schedule_config(config)
+
+def test_add_skips_invalid_schedule():
+    """
+    Test that an invalid config saved before validation is skipped without affecting other schedules.
+    """
+    scheduler = WorkflowScheduler()
+    scheduler._add("bad", {"interval": "5m", "jitter": "abc"}, None)
+    scheduler._add("good", {"interval": "5m", "jitter": 10}, None)
+    assert list(scheduler._schedules) == ["good"]
+    assert [entry[2] for entry in scheduler._heap] == ["good"]
@@ -0,0 +1,96 @@
+"""
+Tests for compiled {{variable}} templates.
+"""
+
+from collections import ChainMap
+import pytest
+
+from backend.utils.template import compile_template, compile_config
+
+@pytest.mark.parametrize("text,expected", [
+    ("Hello {{name}}", "Hello Ada"),
+    ("{{ name }}!", "Ada!"),
+    ("{{user.email}}", "ada@example.com"),
+    ("{{user.address.city}}", "London"),
+    ("{{count}} items", "3 items"),
+    ("{{name}} and {{name}}", "Ada and Ada"),
+    ("no placeholders", "no placeholders"),
+    ("", ""),
+])
+def test_render(text, expected):
+    """
+    Test rendering of literals, simple names and dotted paths.
+    """
+    context = {"name": "Ada", "count": 3, "user": {"email": "ada@example.com", "address": {"city": "London"}}}
+    assert compile_template(text).render(context) == expected
+
+@pytest.mark.parametrize("text", ["{{missing}}", "{{user.missing}}", "{{name.first}}", "{{missing.path}}", "{{user.email.domain}}"])
+def test_unresolved_placeholder_kept(text):
+    """
+    Test that placeholders that cannot be resolved keep their original text.
+    """
+    context = {"name": "Ada", "user": {"email": "ada@example.com"}}
+    assert compile_template(f"a {text} b").render(context) == f"a {text} b"
+
+def test_literal_template():
+    """
+    Test that a template without placeholders is marked literal and returned unchanged.
+    """
+    template = compile_template("plain text")
+    assert template.is_literal
+    assert template.render({}) is template.source
+
+def test_compile_template_cached():
+    """
+    Test that identical strings share one compiled template.
+    """
+    assert compile_template("Hi {{name}}") is compile_template("Hi {{name}}")
+
+def test_render_chainmap_context():
+    """
+    Test that a ChainMap context is resolved front to back, including dotted paths.
+    """
+    context = ChainMap({}, {"name": "newer"}, {"name": "older", "user": {"id": 7}})
+    assert compile_template("{{name}} {{user.id}}").render(context) == "newer 7"
+
+def test_compile_config():
+    """
+    Test rendering of nested dicts and lists in a config.
+    """
+    config = {
+        "url": "https://api.example.com/users/{{user.id}}",
+        "method": "GET",
+        "timeout": 30,
+        "headers": {"Authorization": "Bearer {{token}}", "Accept": "application/json"},
+        "body": {"items": ["{{name}}", {"id": "{{user.id}}"}, 5, ["{{name}}"]], "empty": {}},
+        "flag": None,
+    }
+    context = {"name": "Ada", "token": "secret", "user": {"id": 7}}
+    assert compile_config(config).render(context) == {
+        "url": "https://api.example.com/users/7",
+        "method": "GET",
+        "timeout": 30,
+        "headers": {"Authorization": "Bearer secret", "Accept": "application/json"},
+        # Lists nested in lists are copied as is
+        "body": {"items": ["Ada", {"id": "7"}, 5, ["{{name}}"]], "empty": {}},
+        "flag": None,
+    }
+
+def test_compile_config_not_cached():
+    """
+    Test that a config changed in place is compiled again.
+    """
+    config = {"text": "Hi {{name}}"}
+    assert compile_config(config).render({"name": "Ada"}) == {"text": "Hi Ada"}
+    config["text"] = "Bye {{name}}"
+    assert compile_config(config).render({"name": "Ada"}) == {"text": "Bye Ada"}
+
+def test_render_does_not_share_output():
+    """
+    Test that each render returns new containers.
+    """
+    compiled = compile_config({"headers": {"a": "{{x}}"}, "items": ["{{x}}"]})
+    first = compiled.render({"x": 1})
+    first["headers"]["a"] = "changed"
+    first["items"].append("extra")
+    assert compiled.render({"x": 1}) == {"headers": {"a": "1"}, "items": ["1"]}
@@ -0,0 +1,155 @@
+"""
+Tests for running workflow actions as a dependency graph.
+"""
+
+import asyncio
+import pytest
+
+from backend.models.workflow import WorkflowModel, WorkflowExecution, WorkflowAction, WorkflowEdge
+from backend.services import execution_log, workflow_service
+from backend.services.workflow_service import WorkflowGraph, process_workflow
+
+def make_workflow(action_ids, edges, outputs=None):
+    return WorkflowModel(
+        name="Graph",
+        trigger={"type": "manual", "config": {}},
+        actions=[WorkflowAction(id=action_id, name=action_id, type="fake", config={"id": action_id}) for action_id in action_ids],
+        edges=[WorkflowEdge(source=source, target=target) for source, target in edges],
+        outputs=outputs,
+        created_by="user"
+    )
+
+class FakeActions:
+    """
+    Records which actions run at the same time and what context each one saw
+    """
+
+    def __init__(self):
+        self.delays = {}
+        self.fail = None
+        self.running = set()
+        self.overlaps = {}
+        self.contexts = {}
+        self.cancelled = []
+
+    async def __call__(self, action_type, config, context, on_chunk=None):
+        action_id = config["id"]
+        self.contexts[action_id] = dict(context)
+        self.overlaps[action_id] = set(self.running)
+        for other_id in self.running:
+            self.overlaps[other_id].add(action_id)
+        self.running.add(action_id)
+        try:
+            await asyncio.sleep(self.delays.get(action_id, 0.05))
+            if action_id == self.fail:
+                raise RuntimeError(f"{action_id} failed")
+            return {action_id: f"{action_id} done", "last": action_id}
+        except asyncio.CancelledError:
+            self.cancelled.append(action_id)
+            raise
+        finally:
+            self.running.discard(action_id)
+
+@pytest.fixture
+def actions(monkeypatch):
+    async def append_execution_logs(entries):
+        return None
+
+    monkeypatch.setattr(execution_log, "append_execution_logs", append_execution_logs)
+    fake = FakeActions()
+    monkeypatch.setattr(workflow_service, "execute_action", fake)
+    return fake
+
+def run(workflow, input_data=None):
+    execution = WorkflowExecution(workflow_id=workflow.id, status="running")
+    return asyncio.run(process_workflow(workflow, input_data or {}, execution))
+
+def test_graph_order_and_ancestors():
+    """
+    Test the topological order, ancestors and dependents of a diamond.
+    """
+    graph = WorkflowGraph(make_workflow(["a", "b", "c", "d"], [("a", "b"), ("a", "c"), ("b", "d"), ("c", "d")]))
+    assert graph.order == ["a", "b", "c", "d"]
+    assert graph.ancestors["d"] == ["a", "b", "c"]
+    assert graph.ancestors["a"] == []
+    assert graph.dependents == {"a": 3, "b": 1, "c": 1, "d": 0}
+
+def test_graph_ignores_unknown_edges():
+    """
+    Test that edges to nodes that are not actions do not change the graph.
+    """
+    graph = WorkflowGraph(make_workflow(["a", "b"], [("a", "condition"), ("missing", "b")]))
+    assert graph.in_degree == {"a": 0, "b": 0}
+
+def test_graph_cycle():
+    """
+    Test that a cycle is rejected.
+    """
+    with pytest.raises(ValueError, match="Cycle"):
+        WorkflowGraph(make_workflow(["a", "b"], [("a", "b"), ("b", "a")]))
+
+def test_diamond_runs_branches_in_parallel(actions):
+    """
+    Test that both branches of a diamond run at the same time and the join waits for them.
+    """
+    workflow = make_workflow(["a", "b", "c", "d"], [("a", "b"), ("a", "c"), ("b", "d"), ("c", "d")])
+    output = run(workflow, {"input": 1})
+
+    assert actions.overlaps["a"] == set()
+    assert actions.overlaps["b"] == {"c"}
+    assert actions.overlaps["c"] == {"b"}
+    assert actions.overlaps["d"] == set()
+    assert output == {"input": 1, "a": "a done", "b": "b done", "c": "c done", "d": "d done", "last": "d"}
+
+def test_branches_see_only_their_ancestors(actions):
+    """
+    Test that parallel branches do not see each other's results.
+    """
+    workflow = make_workflow(["a", "b", "c", "d"], [("a", "b"), ("a", "c"), ("b", "d"), ("c", "d")])
+    run(workflow, {"input": 1})
+
+    assert actions.contexts["a"] == {"input": 1}
+    assert actions.contexts["b"] == {"input": 1, "a": "a done", "last": "a"}
+    assert "b" not in actions.contexts["c"]
+    # The join sees both branches, the later one in topological order taking precedence
+    assert actions.contexts["d"]["last"] == "c"
+    assert {"a", "b", "c"} <= set(actions.contexts["d"])
+
+def test_chain_runs_in_sequence(actions):
+    """
+    Test that a chain runs one action at a time, each seeing every earlier result.
+    """
+    workflow = make_workflow(["a", "b", "c"], [("a", "b"), ("b", "c")])
+    run(workflow)
+
+    assert all(not overlap for overlap in actions.overlaps.values())
+    assert actions.contexts["c"] == {"a": "a done", "b": "b done", "last": "b"}
+
+def test_failure_cancels_siblings(actions):
+    """
+    Test that a failing action cancels sibling branches and downstream actions never start.
+    """
+    actions.delays = {"b": 0.01, "c": 1.0}
+    actions.fail = "b"
+    workflow = make_workflow(["a", "b", "c", "d"], [("a", "b"), ("a", "c"), ("b", "d"), ("c", "d")])
+
+    with pytest.raises(RuntimeError, match="b failed"):
+        run(workflow)
+    assert actions.cancelled == ["c"]
+    assert "d" not in actions.contexts
+
+def test_max_concurrency(actions):
+    """
+    Test that independent actions run at most max_concurrency at a time.
+    """
+    workflow = make_workflow(["a", "b", "c", "d"], [])
+    execution = WorkflowExecution(workflow_id=workflow.id, status="running")
+    asyncio.run(process_workflow(workflow, {}, execution, max_concurrency=2))
+    assert max(len(overlap) for overlap in actions.overlaps.values()) == 1
+
+def test_declared_outputs(actions):
+    """
+    Test that only declared outputs are returned when the workflow declares them.
+    """
+    workflow = make_workflow(["a", "b"], [("a", "b")], outputs=["a", "input"])
+    assert run(workflow, {"input": 1, "other": 2}) == {"a": "a done", "input": 1}